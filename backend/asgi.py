@@ -0,0 +1,163 @@
+# backend/asgi.py
+"""
+ASGI server mode.
+
+Serves the JSON API of backend/main.py with Starlette: the upload and job
+routes, /api/add-to-calendar, /api/health, /api/cache/stats and
+/api/metrics. Uploads run through process_meeting_async on the async OpenAI
+client and Motor, so a single process keeps hundreds of pipelines in flight
+(ASYNC_JOB_CONCURRENCY) instead of one per worker thread. Jobs live in
+memory, as with JOB_QUEUE_BACKEND=memory. The streaming upload route is
+only served by the Flask app. Google Calendar calls go through the blocking
+client on Starlette's thread pool.
+
+Run with:
+    uvicorn backend.asgi:app --port 8000
+    python -m backend.asgi
+"""
+import os
+import json
+import traceback
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from .routes import process_meeting_async, add_reminders_to_calendar, read_upload
+from .cache import cache_stats
+from .jobs import AsyncJobQueue, QueueFull, JOB_POLL_SECONDS
+from .uploads import UploadTooLarge, MAX_UPLOAD_BYTES
+from .metrics import render_metrics
+
+ASGI_HOST = os.getenv("ASGI_HOST", "127.0.0.1")
+ASGI_PORT = int(os.getenv("ASGI_PORT", "8000"))
+
+
+def _json_default(value):
+    # Same format as Flask's jsonify, so clients see identical job documents
+    if isinstance(value, datetime):
+        return format_datetime(value.replace(tzinfo=value.tzinfo or timezone.utc), usegmt=True)
+    return str(value)
+
+
+class _JSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return json.dumps(content, default=_json_default).encode("utf-8")
+
+
+async def _run_job(audio_file, on_stage):
+    """Job entry point: run the pipeline and keep only what clients need."""
+    result = await process_meeting_async(audio_file, on_stage=on_stage)
+    return {
+        'meeting_id': result['meeting_id'],
+        'summary': result['summary'],
+        'deadlines': result['deadlines'],
+        'timings': result['timings'],
+    }
+
+
+job_queue = AsyncJobQueue(_run_job)
+
+
+async def upload_audio(request):
+    """Queue an uploaded audio file for processing and return its job ID"""
+    try:
+        # Refuse oversized bodies before parsing them, like MAX_CONTENT_LENGTH
+        if int(request.headers.get('content-length') or 0) > MAX_UPLOAD_BYTES:
+            raise UploadTooLarge(f"Upload exceeds the maximum size of {MAX_UPLOAD_BYTES} bytes")
+
+        form = await request.form()
+        try:
+            audio_file = form.get('audio')
+            if audio_file is None or isinstance(audio_file, str):
+                return _JSONResponse({'success': False, 'error': 'No audio file provided'}, 400)
+            if not audio_file.filename:
+                return _JSONResponse({'success': False, 'error': 'No file selected'}, 400)
+            audio = await run_in_threadpool(read_upload, audio_file.file, audio_file.filename)
+        finally:
+            await form.close()
+
+        try:
+            job_id = job_queue.submit(audio.name, audio)
+        except Exception:
+            audio.close()
+            raise
+        return _JSONResponse({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}'
+        }, 202)
+
+    except UploadTooLarge as e:
+        return _JSONResponse({'success': False, 'error': str(e)}, 413)
+    except QueueFull as e:
+        return _JSONResponse({'success': False, 'error': str(e)}, 503,
+                             headers={'Retry-After': str(max(1, int(JOB_POLL_SECONDS * 5)))})
+    except ValueError as e:
+        return _JSONResponse({'success': False, 'error': str(e)}, 400)
+    except RuntimeError as e:
+        return _JSONResponse({'success': False, 'error': str(e)}, 502)
+    except Exception as e:
+        traceback.print_exc()
+        return _JSONResponse({'success': False, 'error': str(e)}, 500)
+
+
+async def get_job(request):
+    """Report the status and stage progress of an upload job"""
+    job = job_queue.get(request.path_params['job_id'])
+    if job is None:
+        return _JSONResponse({'success': False, 'error': 'Job not found'}, 404)
+    return _JSONResponse({'success': True, **job}, 200)
+
+
+async def add_to_calendar(request):
+    """Add deadlines to Google Calendar"""
+    try:
+        data = await request.json()
+        deadlines = data.get('deadlines', [])
+
+        if not deadlines:
+            return _JSONResponse({'error': 'No deadlines provided'}, 400)
+
+        result = await run_in_threadpool(add_reminders_to_calendar, deadlines, meeting_id=data.get('meeting_id'))
+        return _JSONResponse(result, 200)
+
+    except Exception as e:
+        return _JSONResponse({'success': False, 'error': str(e)}, 500)
+
+
+async def health_check(request):
+    """Health check endpoint"""
+    return _JSONResponse({'status': 'ok'}, 200)
+
+
+async def get_cache_stats(request):
+    """Pipeline cache hit/miss counters"""
+    return _JSONResponse(cache_stats(), 200)
+
+
+async def get_metrics(request):
+    """Per-stage latency, size and token histograms in Prometheus text format"""
+    return Response(render_metrics(), media_type='text/plain; version=0.0.4')
+
+
+app = Starlette(
+    routes=[
+        Route('/api/upload', upload_audio, methods=['POST']),
+        Route('/api/jobs/{job_id}', get_job, methods=['GET']),
+        Route('/api/add-to-calendar', add_to_calendar, methods=['POST']),
+        Route('/api/health', health_check, methods=['GET']),
+        Route('/api/cache/stats', get_cache_stats, methods=['GET']),
+        Route('/api/metrics', get_metrics, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=ASGI_HOST, port=ASGI_PORT)
@@ -0,0 +1,78 @@
+# backend/async_database.py
+"""
+Motor (asyncio MongoDB driver) versions of the writes the upload pipeline
+makes, for the ASGI server. Document layout, transcript offloading and the
+statistics update are shared with database.py, so meetings saved here are
+read back by the same functions as meetings saved by the Flask app.
+"""
+import asyncio
+import threading
+from bson.binary import Binary
+from .database import (
+    MONGODB_URI, DATABASE_NAME, STATS_DOC_ID,
+    TRANSCRIPT_INLINE_BYTES, TRANSCRIPT_GRIDFS_BYTES, TRANSCRIPT_CODEC,
+    _compress, _meeting_document, _statistics_inc, rebuild_meeting_statistics,
+)
+
+_client = None
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_async_db():
+    """Return the shared Motor database handle, connecting on first use."""
+    global _client, _db
+    if _db is not None:
+        return _db
+    with _db_lock:
+        if _db is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            _client = AsyncIOMotorClient(MONGODB_URI)
+            _db = _client[DATABASE_NAME]
+    return _db
+
+
+async def _store_transcript_async(transcript):
+    """_store_transcript through Motor."""
+    size = len(transcript.encode('utf-8'))
+    if size <= TRANSCRIPT_INLINE_BYTES:
+        return {'transcript': transcript, 'transcript_size': size}
+
+    db = get_async_db()
+    data = _compress(transcript)
+    if len(data) > TRANSCRIPT_GRIDFS_BYTES:
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+        file_id = await AsyncIOMotorGridFSBucket(db, bucket_name='transcripts').upload_from_stream('transcript', data)
+        ref = {'store': 'gridfs', 'id': file_id}
+    else:
+        result = await db['transcripts'].insert_one({'data': Binary(data)})
+        ref = {'store': 'collection', 'id': result.inserted_id}
+    ref.update(codec=TRANSCRIPT_CODEC, compressed_size=len(data))
+    return {'transcript_ref': ref, 'transcript_size': size}
+
+
+async def save_meeting_summary_async(filename, transcript, summary, deadlines, audio_sha256=None):
+    """save_meeting_summary through Motor. Returns the new ID, or None on failure."""
+    try:
+        db = get_async_db()
+        meeting_doc = _meeting_document(
+            filename, await _store_transcript_async(transcript), summary, deadlines, audio_sha256
+        )
+        result = await db['meetings'].insert_one(meeting_doc)
+        try:
+            stats = await db['stats'].update_one(
+                {'_id': STATS_DOC_ID},
+                _statistics_inc([(meeting_doc['created_at'], len(deadlines))], 1)
+            )
+            if stats.matched_count == 0:
+                # As in _update_statistics: count every meeting, never upsert a delta
+                await asyncio.to_thread(rebuild_meeting_statistics)
+        except Exception as e:
+            print(f"❌ Error updating statistics: {e}")
+        print(f"✅ Meeting saved to database with ID: {result.inserted_id}")
+        return str(result.inserted_id)
+    except Exception as e:
+        print(f"❌ Error saving to database: {e}")
+        return None
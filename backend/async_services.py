@@ -0,0 +1,78 @@
+# backend/async_services.py
+"""
+Coroutine versions of the pipeline calls in services.py, for the ASGI
+server. Prompts, models and response parsing are shared with services.py.
+
+Work that does not fit one request per call stays on threads: chunked
+transcription of long recordings (pydub/ffmpeg) and map-reduce summaries of
+transcripts longer than SUMMARY_SEGMENT_TOKENS run the threaded versions
+through asyncio.to_thread.
+"""
+import asyncio
+from .llm import async_chat_completion, async_create_transcription
+from .chunking import count_tokens
+from .metrics import log_payload
+from .routing import model_call
+from .services import (
+    transcribe_audio, generate_summary, merge_deadlines,
+    _file_size, _transcription_parts, _require_text, _summary_request, _summary_content, _summary_prompt,
+    _deadline_segments, _deadlines_request, _parse_deadlines, _combined_request, _parse_combined,
+    WHISPER_MODEL, SUMMARY_MODEL, DEADLINES_MODEL, TRANSCRIBE_CHUNK_THRESHOLD_BYTES, SUMMARY_SEGMENT_TOKENS,
+)
+
+
+async def transcribe_audio_async(file) -> str:
+    """transcribe_audio on the async client."""
+    file.seek(0)
+    size = _file_size(file)
+    if size > TRANSCRIBE_CHUNK_THRESHOLD_BYTES:
+        return await asyncio.to_thread(transcribe_audio, file)
+
+    print(f"DEBUG: Sending file {file.name}, size={size} bytes")
+    transcript = await async_create_transcription(model=WHISPER_MODEL, file=file)
+    log_payload("Whisper API raw response", transcript)
+    text, _ = _transcription_parts(transcript)
+    return _require_text(text)
+
+
+async def generate_summary_async(transcript: str, model=SUMMARY_MODEL, segments=None) -> str:
+    """generate_summary on the async client."""
+    if segments is None:
+        segments = [transcript] if count_tokens(transcript) <= SUMMARY_SEGMENT_TOKENS else None
+    if segments is None or len(segments) > 1:
+        return await asyncio.to_thread(generate_summary, transcript, model, segments)
+    prompt = _summary_prompt(transcript, model, segments)
+    with model_call("summary", model) as call:
+        call.tokens_in = count_tokens(prompt)
+        content = _summary_content(await async_chat_completion(**_summary_request(prompt, model)))
+        call.tokens_out = count_tokens(content)
+    return content
+
+
+async def summarize_with_deadlines_async(transcript: str, model) -> dict:
+    """summarize_with_deadlines on the async client."""
+    request = _combined_request(transcript, model)
+    with model_call("combined", model) as call:
+        call.tokens_in = count_tokens(request["messages"][1]["content"])
+        content = (await async_chat_completion(**request)).choices[0].message.content
+        call.tokens_out = count_tokens(content)
+    return _parse_combined(content)
+
+
+async def _extract_deadlines_segment_async(meeting_transcript, model=DEADLINES_MODEL):
+    with model_call("deadlines", model) as call:
+        call.tokens_in = count_tokens(meeting_transcript)
+        response = await async_chat_completion(**_deadlines_request(meeting_transcript, model))
+        content = response.choices[0].message.content
+        call.tokens_out = count_tokens(content)
+    return _parse_deadlines(content)
+
+
+async def extract_deadlines_async(meeting_transcript, model=DEADLINES_MODEL, segments=None):
+    """extract_deadlines_with_gpt on the async client; segments run concurrently."""
+    if segments is None:
+        segments = _deadline_segments(meeting_transcript)
+    if not segments:
+        return []
+    batches = await asyncio.gather(*(_extract_deadlines_segment_async(segment, model) for segment in segments))
+    return batches[0] if len(batches) == 1 else merge_deadlines(batches)
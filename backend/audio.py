@@ -0,0 +1,145 @@
+# backend/audio.py
+import os
+from io import BytesIO
+
+# Chunking parameters for long recordings (milliseconds)
+CHUNK_TARGET_MS = int(os.getenv("TRANSCRIBE_CHUNK_MS", str(10 * 60 * 1000)))
+CHUNK_OVERLAP_MS = int(os.getenv("TRANSCRIBE_CHUNK_OVERLAP_MS", "2000"))
+MIN_SILENCE_MS = int(os.getenv("TRANSCRIBE_MIN_SILENCE_MS", "700"))
+SILENCE_THRESH_DB = float(os.getenv("TRANSCRIBE_SILENCE_THRESH_DB", "16"))
+# Silence is only looked for in this much audio before each target boundary,
+# probing every SILENCE_SEEK_MS instead of every millisecond
+SILENCE_SEARCH_MS = int(os.getenv("TRANSCRIBE_SILENCE_SEARCH_MS", "60000"))
+SILENCE_SEEK_MS = int(os.getenv("TRANSCRIBE_SILENCE_SEEK_MS", "50"))
+CHUNK_EXPORT_FORMAT = os.getenv("TRANSCRIBE_CHUNK_FORMAT", "mp3")
+CHUNK_EXPORT_BITRATE = os.getenv("TRANSCRIBE_CHUNK_BITRATE", "64k")
+# Whisper works on 16 kHz mono, so recordings are decoded straight to that:
+# an hour is about 115 MB of PCM instead of over 600 MB at 44.1 kHz stereo
+DECODE_SAMPLE_RATE = 16000
+
+
+def _silence_cut_point(audio, lo, hi, silence_thresh):
+    """Midpoint (ms) of the latest silent stretch within audio[lo:hi], or None."""
+    from pydub.silence import detect_silence
+
+    silences = detect_silence(
+        audio[lo:hi],
+        min_silence_len=MIN_SILENCE_MS,
+        silence_thresh=silence_thresh,
+        seek_step=SILENCE_SEEK_MS,
+    )
+    if not silences:
+        return None
+    start, end = silences[-1]
+    return lo + (start + end) // 2
+
+
+def _choose_boundaries(length_ms, find_cut, target_ms):
+    """
+    Pick chunk end points close to target_ms, preferring silent gaps.
+    `find_cut(lo, hi)` returns a cut point in (lo, hi] or None.
+    """
+    boundaries = []
+    cursor = 0
+    while cursor < length_ms:
+        ideal = cursor + target_ms
+        if ideal >= length_ms:
+            boundaries.append(length_ms)
+            break
+        # Latest silence shortly before the target, within the second half
+        # of the window, else a hard cut
+        lo = max(cursor + target_ms // 2, ideal - SILENCE_SEARCH_MS)
+        end = find_cut(lo, ideal)
+        end = end if end is not None and lo < end <= ideal else ideal
+        boundaries.append(end)
+        cursor = end
+    return boundaries
+
+
+def split_audio(file, target_ms=CHUNK_TARGET_MS, overlap_ms=CHUNK_OVERLAP_MS):
+    """
+    Split a recording into chunks at silence boundaries.
+
+    Requires `pydub` (and ffmpeg) to decode the audio.
+
+    Returns:
+        List of (offset_seconds, BytesIO) tuples. Each chunk starts
+        `overlap_ms` before the previous boundary so that words cut at a
+        boundary are heard in full by at least one chunk.
+    """
+    from pydub import AudioSegment
+
+    file.seek(0)
+    audio = AudioSegment.from_file(file, parameters=["-ac", "1", "-ar", str(DECODE_SAMPLE_RATE)])
+    length_ms = len(audio)
+    silence_thresh = audio.dBFS - SILENCE_THRESH_DB
+
+    boundaries = _choose_boundaries(
+        length_ms, lambda lo, hi: _silence_cut_point(audio, lo, hi, silence_thresh), target_ms
+    )
+
+    chunks = []
+    start = 0
+    for i, end in enumerate(boundaries):
+        offset = max(0, start - overlap_ms)
+        buf = BytesIO()
+        audio[offset:end].export(buf, format=CHUNK_EXPORT_FORMAT, bitrate=CHUNK_EXPORT_BITRATE)
+        buf.name = f"chunk_{i:03d}.{CHUNK_EXPORT_FORMAT}"
+        buf.seek(0)
+        chunks.append((offset / 1000.0, buf))
+        start = end
+    return chunks
+
+
+def _dedupe_overlap_words(previous: str, current: str, max_words=25) -> str:
+    """Drop the leading words of `current` that repeat the tail of `previous`."""
+    prev_words = previous.split()
+    cur_words = current.split()
+
+    def norm(words):
+        return [w.strip(".,!?;:\"'").lower() for w in words]
+
+    prev_norm = norm(prev_words[-max_words:])
+    cur_norm = norm(cur_words[:max_words])
+    # Require at least two words so a single common word is not dropped
+    for size in range(min(len(prev_norm), len(cur_norm)), 1, -1):
+        if prev_norm[-size:] == cur_norm[:size]:
+            return " ".join(cur_words[size:])
+    return current
+
+
+def stitch_transcripts(parts) -> str:
+    """
+    Merge chunk transcripts into one text.
+
+    Args:
+        parts: list of (offset_seconds, text, segments) in chunk order, where
+            segments is a list of {'start', 'end', 'text'} dicts relative to
+            the chunk (may be empty if the API did not return them).
+
+    Segment timestamps are shifted by the chunk offset; segments that fall
+    inside audio already covered by the previous chunk are dropped. Words
+    repeated at the seam are removed as well, which also covers chunks that
+    came back without segments.
+    """
+    pieces = []
+    covered_until = 0.0
+    for offset, text, segments in parts:
+        if segments:
+            kept = []
+            for seg in segments:
+                start = offset + float(seg.get("start", 0))
+                end = offset + float(seg.get("end", 0))
+                if (start + end) / 2 < covered_until:
+                    continue
+                kept.append(seg.get("text", "").strip())
+                covered_until = max(covered_until, end)
+            chunk_text = " ".join(t for t in kept if t)
+        else:
+            chunk_text = (text or "").strip()
+
+        if pieces and chunk_text:
+            chunk_text = _dedupe_overlap_words(pieces[-1], chunk_text)
+        if chunk_text:
+            pieces.append(chunk_text)
+    return " ".join(pieces)
@@ -0,0 +1,190 @@
+# backend/batch_ingest.py
+"""
+Process a directory of meeting recordings in bulk.
+
+Files are analyzed concurrently on a bounded worker pool (transcription,
+summary and deadlines, as for an upload) and saved to MongoDB in batches with
+insert_many, then embedded for semantic search in the background. Progress
+is checkpointed to a JSON file after every batch, so an interrupted run picks
+up where it left off; recordings whose content hash already belongs to a
+saved meeting are skipped, even if renamed or copied.
+Work lost in a crash is cheap to redo: transcripts and summaries are served
+from the result cache on the next run.
+
+Usage:
+    python -m backend.batch_ingest /path/to/recordings --workers 4 --batch-size 20
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .routes import analyze_meeting
+from .uploads import spool_upload
+from .database import save_meeting_summaries, find_processed_audio
+from .output_store import save_meeting_outputs
+from .semantic_search import index_meeting_async
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".mp4", ".mpeg", ".mpga", ".webm", ".ogg", ".flac")
+CHECKPOINT_NAME = ".ingest_checkpoint.json"
+
+
+def find_recordings(directory, extensions=AUDIO_EXTENSIONS):
+    """Audio files under `directory`, as sorted paths relative to it."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in files:
+            if name.lower().endswith(extensions):
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(found)
+
+
+class Checkpoint:
+    """
+    Per-file progress, keyed by path relative to the ingested directory:
+    done entries hold size, mtime, sha256 and meeting_id; failed entries the
+    last error. Files that changed since they were recorded count as pending.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done, self.failed = {}, {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.done, self.failed = state.get("done", {}), state.get("failed", {})
+
+    def is_done(self, rel_path, stat):
+        entry = self.done.get(rel_path)
+        return bool(entry) and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+
+    def known_hashes(self):
+        return {entry["sha256"] for entry in self.done.values()}
+
+    def mark_done(self, rel_path, stat, sha256, meeting_id):
+        self.done[rel_path] = {"size": stat.st_size, "mtime": stat.st_mtime,
+                               "sha256": sha256, "meeting_id": meeting_id}
+        self.failed.pop(rel_path, None)
+
+    def mark_failed(self, rel_path, error):
+        self.failed[rel_path] = error
+
+    def save(self):
+        """Write atomically so a crash mid-write never loses the checkpoint."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": self.done, "failed": self.failed}, f, indent=1)
+        os.replace(temp_path, self.path)
+
+
+class BatchIngest:
+    def __init__(self, directory, checkpoint, workers=4, batch_size=20):
+        self.directory = directory
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.batch_size = batch_size
+        self._claimed = checkpoint.known_hashes()
+        self._claimed_lock = threading.Lock()
+        self._pending = []  # (rel_path, stat, analysis) waiting for insert_many
+        self.counts = {"processed": 0, "skipped": 0, "failed": 0}
+        self.bytes_read = 0
+
+    def _claim(self, sha256) -> bool:
+        """True if no other file with this content was seen in this run or checkpoint."""
+        with self._claimed_lock:
+            if sha256 in self._claimed:
+                return False
+            self._claimed.add(sha256)
+        return not find_processed_audio([sha256])
+
+    def _analyze(self, rel_path):
+        path = os.path.join(self.directory, rel_path)
+        with open(path, "rb") as f:
+            audio = spool_upload(f, os.path.basename(path), max_bytes=None)
+        try:
+            if not self._claim(audio.sha256):
+                return "skipped", audio.sha256, None
+            return "processed", audio.sha256, analyze_meeting(audio)
+        finally:
+            audio.close()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        meeting_ids = save_meeting_summaries([analysis for _, _, analysis in batch])
+        for (rel_path, stat, analysis), meeting_id in zip(batch, meeting_ids or [None] * len(batch)):
+            if meeting_id is None:
+                self.counts["processed"] -= 1
+                self.counts["failed"] += 1
+                self.checkpoint.mark_failed(rel_path, "database write failed")
+                with self._claimed_lock:
+                    self._claimed.discard(analysis["audio_sha256"])
+                continue
+            save_meeting_outputs(meeting_id, {"transcript": analysis["transcript"], "summary": analysis["summary"]})
+            index_meeting_async(meeting_id, analysis["transcript"], analysis["summary"])
+            self.checkpoint.mark_done(rel_path, stat, analysis["audio_sha256"], meeting_id)
+        self.checkpoint.save()
+
+    def run(self, files):
+        total = len(files)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._analyze, rel_path): rel_path for rel_path in files}
+            for done, future in enumerate(as_completed(futures), 1):
+                rel_path = futures[future]
+                stat = os.stat(os.path.join(self.directory, rel_path))
+                self.bytes_read += stat.st_size
+                try:
+                    status, sha256, analysis = future.result()
+                except Exception as e:
+                    status = "failed"
+                    self.checkpoint.mark_failed(rel_path, str(e))
+                    print(f"❌ {rel_path}: {e}")
+                else:
+                    if status == "skipped":
+                        self.checkpoint.mark_done(rel_path, stat, sha256, None)
+                    else:
+                        self._pending.append((rel_path, stat, analysis))
+                self.counts[status] += 1
+                if len(self._pending) >= self.batch_size:
+                    self._flush()
+                elif status != "processed":
+                    self.checkpoint.save()
+
+                elapsed = time.perf_counter() - started
+                rate = done / elapsed if elapsed else 0.0
+                eta = (total - done) / rate if rate else 0.0
+                print(f"[{done}/{total}] {status:<9} {rel_path}  "
+                      f"{rate:.2f} files/s  {self.bytes_read / 1e6 / elapsed if elapsed else 0:.1f} MB/s  "
+                      f"ETA {eta:.0f}s")
+            self._flush()
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--workers", type=int, default=4, help="files analyzed concurrently")
+    parser.add_argument("--batch-size", type=int, default=20, help="meetings per insert_many")
+    parser.add_argument("--checkpoint", help=f"checkpoint file (default: <directory>/{CHECKPOINT_NAME})")
+    args = parser.parse_args()
+
+    checkpoint = Checkpoint(args.checkpoint or os.path.join(args.directory, CHECKPOINT_NAME))
+    files = []
+    for rel_path in find_recordings(args.directory):
+        if not checkpoint.is_done(rel_path, os.stat(os.path.join(args.directory, rel_path))):
+            files.append(rel_path)
+    print(f"{len(files)} recordings to process ({len(checkpoint.done)} already done)")
+
+    ingest = BatchIngest(args.directory, checkpoint, args.workers, args.batch_size)
+    elapsed = ingest.run(files)
+    counts = ingest.counts
+    print(f"✅ {counts['processed']} processed, {counts['skipped']} skipped, {counts['failed']} failed "
+          f"in {elapsed:.1f}s ({len(files) / elapsed if elapsed else 0:.2f} files/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# backend/cache.py
+import os
+import json
+import asyncio
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from .metrics import CACHE_LOOKUPS
+
+# Cache configuration
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "disk")  # disk | mongo | none
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file) -> str:
+    """SHA-256 of a seekable file-like object, read in chunks."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def make_key(*parts) -> str:
+    """Build a cache key from its parts (content hash, model, prompt version...)."""
+    return hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """JSON files under CACHE_DIR with TTL and size/count-based LRU eviction.
+
+    A file's mtime is its last-access time; hits touch the file.
+    """
+
+    def __init__(self, folder=CACHE_DIR, ttl=CACHE_TTL_SECONDS,
+                 max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.folder = folder
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if entry.get("created_at", 0) + self.ttl < time.time():
+                self._remove(path)
+                return None
+            os.utime(path)
+            return entry
+
+    def set(self, key, stage, value):
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        entry = {"stage": stage, "created_at": time.time(), "value": value}
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+            self._evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        for e in os.scandir(self.folder):
+            if e.name.endswith(".json"):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+
+        now = time.time()
+        live = []
+        for mtime, size, path in entries:
+            if mtime + self.ttl < now:
+                self._remove(path)
+            else:
+                live.append((mtime, size, path))
+
+        live.sort()  # least recently used first
+        total = sum(size for _, size, _ in live)
+        while live and (len(live) > self.max_entries or total > self.max_bytes):
+            _, size, path = live.pop(0)
+            self._remove(path)
+            total -= size
+
+
+class MongoCache:
+    """Cache entries in a MongoDB collection with a TTL index and LRU trimming."""
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        from .database import get_db
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.collection = get_db()["cache"]
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+        self.collection.create_index("last_access")
+
+    def get(self, key):
+        now = datetime.utcnow()
+        entry = self.collection.find_one_and_update(
+            {"_id": key, "expires_at": {"$gt": now}},
+            {"$set": {"last_access": now}},
+        )
+        return entry
+
+    def set(self, key, stage, value):
+        now = datetime.utcnow()
+        self.collection.replace_one(
+            {"_id": key},
+            {
+                "stage": stage,
+                "value": value,
+                "created_at": now,
+                "last_access": now,
+                "expires_at": now + timedelta(seconds=self.ttl),
+            },
+            upsert=True,
+        )
+        self._evict()
+
+    def _evict(self):
+        excess = self.collection.estimated_document_count() - self.max_entries
+        if excess > 0:
+            oldest = self.collection.find({}, {"_id": 1}).sort("last_access", 1).limit(excess)
+            self.collection.delete_many({"_id": {"$in": [d["_id"] for d in oldest]}})
+
+
+_store = None
+_store_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def get_store():
+    """Return the configured cache backend, or None when caching is disabled."""
+    global _store
+    if CACHE_BACKEND == "none":
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = MongoCache() if CACHE_BACKEND == "mongo" else DiskCache()
+    return _store
+
+
+def _count(stage, outcome):
+    with _stats_lock:
+        counters = _stats.setdefault(stage, {"hits": 0, "misses": 0, "errors": 0})
+        counters[outcome] += 1
+    CACHE_LOOKUPS.inc(stage=stage, result=outcome)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters per stage since process start."""
+    with _stats_lock:
+        return {stage: dict(counters) for stage, counters in _stats.items()}
+
+
+def get_cached(stage, key_parts):
+    """Return (hit, value) for `key_parts`. Backend errors count as a miss."""
+    store = get_store()
+    if store is None:
+        return False, None
+    try:
+        entry = store.get(make_key(stage, *key_parts))
+    except Exception as e:
+        print(f"❌ Cache read failed for {stage}: {e}")
+        _count(stage, "errors")
+        entry = None
+
+    if entry is None:
+        _count(stage, "misses")
+        return False, None
+    _count(stage, "hits")
+    return True, entry["value"]
+
+
+def set_cached(stage, key_parts, value):
+    """Store `value` for `key_parts`. Backend errors are logged and ignored."""
+    store = get_store()
+    if store is None:
+        return
+    try:
+        store.set(make_key(stage, *key_parts), stage, value)
+    except Exception as e:
+        print(f"❌ Cache write failed for {stage}: {e}")
+        _count(stage, "errors")
+
+
+def cached_call(stage, key_parts, fn, *args):
+    """
+    Return the cached result for `key_parts`, or call fn(*args) and store it.
+
+    Cache backend errors are logged and never fail the call.
+    """
+    hit, value = get_cached(stage, key_parts)
+    if hit:
+        return value
+    value = fn(*args)
+    set_cached(stage, key_parts, value)
+    return value
+
+
+async def cached_call_async(stage, key_parts, fn, *args):
+    """cached_call for a coroutine function; cache I/O runs on a worker thread."""
+    hit, value = await asyncio.to_thread(get_cached, stage, key_parts)
+    if hit:
+        return value
+    value = await fn(*args)
+    await asyncio.to_thread(set_cached, stage, key_parts, value)
+    return value
@@ -0,0 +1,106 @@
+# backend/calendar_sync.py
+import json
+import hashlib
+from .utils import build_calendar_event, execute_calendar_batch
+from .database import (
+    get_calendar_sync_records, claim_calendar_sync, save_calendar_sync,
+    delete_calendar_sync,
+)
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def deadline_fingerprint(meeting_id, deadline) -> str:
+    """Identity of a deadline within a meeting: meeting ID + normalized title + date."""
+    key = "|".join([str(meeting_id), _normalize(deadline.get('title')), _normalize(deadline.get('date'))])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _event_hash(event) -> str:
+    """Hash of the event body, used to detect changes that need an update."""
+    return hashlib.sha256(json.dumps(event, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _is_gone(error) -> bool:
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    return status in (404, 410)
+
+
+def sync_meeting_deadlines(service, meeting_id, deadlines, reference=None) -> dict:
+    """
+    Bring the calendar in line with a meeting's deadlines.
+
+    New deadlines are inserted, changed ones patched, and deadlines no longer
+    in the list are deleted; unchanged ones cost no API call. All calls go out
+    in batch requests. A fingerprint per deadline is kept in MongoDB with a
+    unique index, so concurrent or repeated syncs never insert twice.
+    Relative dates are anchored to `reference` (the meeting date).
+
+    Returns a dict of lists: inserted, updated, deleted, skipped, failed.
+    Inserted/updated/skipped entries are {'title', 'event_id'}; failed entries
+    are {'title', 'error'}.
+    """
+    report = {'inserted': [], 'updated': [], 'deleted': [], 'skipped': [], 'failed': []}
+    records = {r['fingerprint']: r for r in get_calendar_sync_records(meeting_id)}
+
+    operations = []  # (kind, fingerprint, title, event_hash)
+    requests = []
+    seen = set()
+    for deadline in deadlines:
+        title = deadline.get('title')
+        fingerprint = deadline_fingerprint(meeting_id, deadline)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+
+        event = build_calendar_event(title, deadline.get('date'), deadline.get('description', ''), reference)
+        if event is None:
+            report['failed'].append({'title': title, 'error': 'Could not parse deadline date'})
+            continue
+        event_hash = _event_hash(event)
+
+        record = records.get(fingerprint)
+        if record is None or not record.get('event_id'):
+            if not claim_calendar_sync(fingerprint, meeting_id, title):
+                # Another sync inserted (or is inserting) this deadline
+                report['skipped'].append({'title': title, 'event_id': None})
+                continue
+            operations.append(('insert', fingerprint, title, event_hash))
+            requests.append(service.events().insert(calendarId='primary', body=event))
+        elif record.get('event_hash') == event_hash:
+            report['skipped'].append({'title': title, 'event_id': record['event_id']})
+        else:
+            operations.append(('update', fingerprint, title, event_hash))
+            requests.append(service.events().patch(
+                calendarId='primary', eventId=record['event_id'], body=event
+            ))
+
+    for fingerprint, record in records.items():
+        if fingerprint not in seen and record.get('event_id'):
+            operations.append(('delete', fingerprint, record.get('title'), None))
+            requests.append(service.events().delete(calendarId='primary', eventId=record['event_id']))
+
+    responses = execute_calendar_batch(service, requests)
+    for (kind, fingerprint, title, event_hash), (response, error) in zip(operations, responses):
+        if kind == 'delete':
+            if error is None or _is_gone(error):
+                delete_calendar_sync(fingerprint)
+                report['deleted'].append({'title': title, 'event_id': records[fingerprint]['event_id']})
+            else:
+                report['failed'].append({'title': title, 'error': str(error)})
+            continue
+
+        if error is not None:
+            if kind == 'insert' or _is_gone(error):
+                # Release the claim (or forget a vanished event) so the next sync inserts again
+                delete_calendar_sync(fingerprint)
+            report['failed'].append({'title': title, 'error': str(error)})
+            continue
+
+        save_calendar_sync(fingerprint, meeting_id, title, response.get('id'), event_hash)
+        report['inserted' if kind == 'insert' else 'updated'].append(
+            {'title': title, 'event_id': response.get('id')}
+        )
+    return report
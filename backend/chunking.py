@@ -0,0 +1,146 @@
+# backend/chunking.py
+import re
+import threading
+
+# Rough characters-per-token ratio used when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """The tiktoken encoding, loaded on first use; None if unavailable."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:  # tiktoken missing or encoding unavailable offline
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken if available, else estimate from length."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_long_sentence(sentence, max_tokens):
+    """
+    Hard-split a sentence that alone exceeds max_tokens on word boundaries.
+    Returns (piece, tokens) pairs. Each word is measured once, with its
+    leading space, into a running total that is reset at every split; without
+    tiktoken the total is in characters, matching count_tokens' estimate.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        limit = max_tokens
+        size = lambda text: len(encoding.encode(text, disallowed_special=()))
+        tokens_of = lambda total: total
+    else:
+        limit = max_tokens * CHARS_PER_TOKEN
+        size = len
+        tokens_of = lambda total: (total + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    pieces, words, total = [], [], 0
+    for word in sentence.split():
+        if words:
+            n = size(" " + word)
+            if total + n > limit:
+                pieces.append((" ".join(words), tokens_of(total)))
+                words, total = [], 0
+        if not words:
+            n = size(word)
+        words.append(word)
+        total += n
+    if words:
+        pieces.append((" ".join(words), tokens_of(total)))
+    return pieces
+
+
+def split_transcript(transcript: str, max_tokens: int, overlap_tokens: int = 0, total_tokens=None) -> list:
+    """
+    Split a transcript into segments of at most max_tokens on sentence
+    boundaries. Consecutive segments share roughly overlap_tokens worth of
+    trailing sentences so that context cut at a boundary is not lost.
+    `total_tokens` is the transcript's token count, if already known.
+    """
+    if total_tokens is None:
+        total_tokens = count_tokens(transcript)
+    if total_tokens <= max_tokens:
+        return [transcript]
+
+    # (sentence, tokens) pairs, each sentence counted once
+    sentences = []
+    for sentence in _SENTENCE_RE.split(transcript.strip()):
+        tokens = count_tokens(sentence)
+        if tokens > max_tokens:
+            sentences.extend(_split_long_sentence(sentence, max_tokens))
+        elif sentence:
+            sentences.append((sentence, tokens))
+
+    segments = []
+    current, current_tokens = [], 0
+    for sentence, tokens in sentences:
+        if current and current_tokens + tokens > max_tokens:
+            segments.append(" ".join(text for text, _ in current))
+            # Carry trailing sentences over as overlap
+            carried, carried_tokens = [], 0
+            for prev, prev_tokens in reversed(current):
+                if carried_tokens + prev_tokens > overlap_tokens:
+                    break
+                carried.insert(0, (prev, prev_tokens))
+                carried_tokens += prev_tokens
+            if carried_tokens + tokens > max_tokens:
+                carried, carried_tokens = [], 0
+            current, current_tokens = carried, carried_tokens
+        current.append((sentence, tokens))
+        current_tokens += tokens
+    if current:
+        segments.append(" ".join(text for text, _ in current))
+    return segments
+
+
+def sentence_windows(text: str, spans: list, radius: int = 1) -> list:
+    """
+    Return the passages of `text` around character spans: each sentence that
+    contains a span plus `radius` sentences either side. Overlapping windows
+    are merged; passages come back in transcript order.
+    """
+    if not spans:
+        return []
+
+    # Sentence boundaries as (start, end) character offsets
+    bounds, pos = [], 0
+    for match in _SENTENCE_RE.finditer(text):
+        bounds.append((pos, match.start()))
+        pos = match.end()
+    bounds.append((pos, len(text)))
+
+    hits = set()
+    i = 0
+    for start, _ in sorted(spans):
+        while i < len(bounds) - 1 and bounds[i][1] <= start:
+            i += 1
+        hits.add(i)
+
+    windows = []
+    for i in sorted(hits):
+        lo, hi = max(0, i - radius), min(len(bounds) - 1, i + radius)
+        if windows and lo <= windows[-1][1] + 1:
+            windows[-1][1] = max(windows[-1][1], hi)
+        else:
+            windows.append([lo, hi])
+    return [text[bounds[lo][0]:bounds[hi][1]].strip() for lo, hi in windows]
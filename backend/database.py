@@ -1,38 +1,314 @@
 import os
-from pymongo import MongoClient
-from datetime import datetime
+import re
+import zlib
+import time
+import threading
+from bson.binary import Binary
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from bson.objectid import ObjectId  # move import to top
 
+try:
+    import zstandard
+except ImportError:  # zlib is used instead
+    zstandard = None
+
 load_dotenv()
 
 # MongoDB connection (local)
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/meeting_summarizer")
-client = MongoClient(MONGODB_URI)
-db = client['meeting_summarizer']
-meetings_collection = db['meetings']
+DATABASE_NAME = 'meeting_summarizer'
+# After a failed ensure_indexes, get_db tries again at most this often
+INDEX_RETRY_SECONDS = float(os.getenv("MONGO_INDEX_RETRY_SECONDS", "30"))
+
+_client = None
+_db = None
+_db_lock = threading.Lock()
+_indexes_lock = threading.Lock()
+_indexes_ensured = False
+_indexes_next_try = 0.0
+
+
+def get_db():
+    """
+    Return the shared database handle, connecting on first use.
+
+    pymongo is imported and the MongoClient created here rather than at
+    import time, so pages and tools that never touch MongoDB start fast.
+    The first caller also makes sure the indexes exist; if that fails, a
+    later call tries again.
+    """
+    global _client, _db
+    if _db is not None and _indexes_ensured:
+        return _db
+    with _db_lock:
+        if _db is None:
+            from pymongo import MongoClient
+
+            _client = MongoClient(MONGODB_URI)
+            _db = _client[DATABASE_NAME]
+    _ensure_indexes_once()
+    return _db
+
+
+def _ensure_indexes_once():
+    """Run ensure_indexes until it succeeds, in one thread at a time.
+
+    Other callers go on without waiting; ensure_indexes itself uses the
+    collections, so it must not block get_db.
+    """
+    global _indexes_ensured, _indexes_next_try
+    if _indexes_ensured or time.monotonic() < _indexes_next_try:
+        return
+    if not _indexes_lock.acquire(blocking=False):
+        return
+    try:
+        if not _indexes_ensured:
+            if ensure_indexes():
+                _indexes_ensured = True
+            else:
+                _indexes_next_try = time.monotonic() + INDEX_RETRY_SECONDS
+    finally:
+        _indexes_lock.release()
+
+
+class _LazyCollection:
+    """Stand-in for a collection that resolves it through get_db() on each use."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self._name], attr)
+
+
+meetings_collection = _LazyCollection('meetings')
+stats_collection = _LazyCollection('stats')
+calendar_sync_collection = _LazyCollection('calendar_sync')
+transcripts_collection = _LazyCollection('transcripts')
+
+
+def __getattr__(name):
+    # `from backend.database import db` / `client` keep working, lazily
+    if name == 'db':
+        return get_db()
+    if name == 'client':
+        get_db()
+        return _client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# _id of the incrementally maintained statistics document
+STATS_DOC_ID = 'meetings'
+
+# Full-text search index over meetings; filename matches rank highest
+TEXT_INDEX_NAME = 'meetings_text'
+TEXT_INDEX_WEIGHTS = {'filename': 10, 'summary': 5, 'transcript': 1}
+SEARCH_PAGE_SIZE = 20
+
+# A calendar insert claim with no event ID after this long is assumed abandoned
+CALENDAR_CLAIM_SECONDS = 600
+
+# Transcripts larger than this (UTF-8 bytes) are stored compressed outside the
+# meeting document; smaller ones stay inline and in the text index
+TRANSCRIPT_INLINE_BYTES = int(os.getenv("TRANSCRIPT_INLINE_BYTES", str(64 * 1024)))
+# Compressed transcripts larger than this go to GridFS instead of a single
+# document, keeping well clear of the 16 MB BSON limit
+TRANSCRIPT_GRIDFS_BYTES = 15 * 1024 * 1024
+TRANSCRIPT_CODEC = 'zstd' if zstandard else 'zlib'
+
+# Fields returned by listing and search; summaries and transcripts are loaded
+# by ID only when needed. Older documents without a stored deadline_count get
+# it computed server-side.
+LISTING_PROJECTION = {
+    'filename': 1,
+    'created_at': 1,
+    'deadline_count': {'$ifNull': ['$deadline_count', {'$size': {'$ifNull': ['$deadlines', []]}}]},
+}
+
+
+def ensure_indexes():
+    """Create the collection indexes. Idempotent, safe to call on every startup.
+
+    MongoDB allows one text index per collection, so an existing text index
+    with a different name or weights is replaced.
+    """
+    try:
+        for name, info in meetings_collection.index_information().items():
+            is_text = any(kind == 'text' for _, kind in info.get('key', []))
+            if is_text and (name != TEXT_INDEX_NAME or info.get('weights') != TEXT_INDEX_WEIGHTS):
+                meetings_collection.drop_index(name)
+
+        meetings_collection.create_index(
+            [(field, 'text') for field in TEXT_INDEX_WEIGHTS],
+            name=TEXT_INDEX_NAME,
+            weights=TEXT_INDEX_WEIGHTS,
+            default_language='english'
+        )
+        meetings_collection.create_index([('created_at', -1), ('_id', -1)])
+        meetings_collection.create_index('audio_sha256', sparse=True)
+        calendar_sync_collection.create_index('fingerprint', unique=True)
+        calendar_sync_collection.create_index('meeting_id')
+        # Meetings saved before the stats document existed must be counted
+        # before the first incremental update
+        if stats_collection.find_one({'_id': STATS_DOC_ID}, {'_id': 1}) is None:
+            rebuild_meeting_statistics()
+        return True
+    except Exception as e:
+        print(f"❌ Error creating indexes: {e}")
+        return False
 
 # Rest of your original functions remain unchanged
-def save_meeting_summary(filename, transcript, summary, deadlines):
-    try:
-        meeting_doc = {
-            'filename': filename,
-            'transcript': transcript,
-            'summary': summary,
-            'deadlines': deadlines,
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
-        }
+def transcripts_bucket():
+    """GridFS bucket for the largest transcripts, opened on first use."""
+    import gridfs
+
+    return gridfs.GridFSBucket(get_db(), bucket_name='transcripts')
+
+
+def _compress(text, codec=TRANSCRIPT_CODEC):
+    data = text.encode('utf-8')
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Transcript is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    return zlib.decompress(data).decode('utf-8')
+
+
+def _store_transcript(transcript):
+    """
+    Fields that represent a transcript in a meeting document: the text itself
+    when small, otherwise a reference to a compressed copy kept in the
+    transcripts collection (or GridFS when very large).
+    """
+    size = len(transcript.encode('utf-8'))
+    if size <= TRANSCRIPT_INLINE_BYTES:
+        return {'transcript': transcript, 'transcript_size': size}
+
+    data = _compress(transcript)
+    if len(data) > TRANSCRIPT_GRIDFS_BYTES:
+        file_id = transcripts_bucket().upload_from_stream('transcript', data)
+        ref = {'store': 'gridfs', 'id': file_id}
+    else:
+        ref = {'store': 'collection', 'id': transcripts_collection.insert_one({'data': Binary(data)}).inserted_id}
+    ref.update(codec=TRANSCRIPT_CODEC, compressed_size=len(data))
+    return {'transcript_ref': ref, 'transcript_size': size}
+
+
+def _load_transcript(ref):
+    if ref['store'] == 'gridfs':
+        data = transcripts_bucket().open_download_stream(ref['id']).read()
+    else:
+        doc = transcripts_collection.find_one({'_id': ref['id']})
+        if doc is None:
+            return None
+        data = bytes(doc['data'])
+    return _decompress(data, ref['codec'])
+
+
+def _delete_transcript(ref):
+    if ref['store'] == 'gridfs':
+        transcripts_bucket().delete(ref['id'])
+    else:
+        transcripts_collection.delete_one({'_id': ref['id']})
+
+
+def _meeting_document(filename, transcript_fields, summary, deadlines, audio_sha256=None):
+    """A meeting document around the fields returned by _store_transcript."""
+    now = datetime.utcnow()
+    meeting_doc = {
+        'filename': filename,
+        **transcript_fields,
+        'summary': summary,
+        'deadlines': deadlines,
+        'deadline_count': len(deadlines),
+        'created_at': now,
+        'updated_at': now
+    }
+    if audio_sha256:
+        meeting_doc['audio_sha256'] = audio_sha256
+    return meeting_doc
+
+
+def save_meeting_summary(filename, transcript, summary, deadlines, audio_sha256=None):
+    try:
+        meeting_doc = _meeting_document(filename, _store_transcript(transcript), summary, deadlines, audio_sha256)
         result = meetings_collection.insert_one(meeting_doc)
+        _update_statistics([(meeting_doc['created_at'], len(deadlines))], 1)
         print(f"✅ Meeting saved to database with ID: {result.inserted_id}")
         return str(result.inserted_id)
     except Exception as e:
         print(f"❌ Error saving to database: {e}")
         return None
 
+
+def save_meeting_summaries(meetings):
+    """
+    Bulk counterpart of save_meeting_summary for batch ingestion.
+
+    `meetings` is a list of dicts with filename, transcript, summary,
+    deadlines and optionally audio_sha256. All documents go in with one
+    insert_many and one statistics update. Returns the new IDs in order, or
+    None if the write failed.
+    """
+    if not meetings:
+        return []
+    try:
+        docs = [
+            _meeting_document(m['filename'], _store_transcript(m['transcript']), m['summary'], m['deadlines'],
+                              m.get('audio_sha256'))
+            for m in meetings
+        ]
+        result = meetings_collection.insert_many(docs, ordered=True)
+        _update_statistics([(doc['created_at'], doc['deadline_count']) for doc in docs], 1)
+        print(f"✅ Saved {len(result.inserted_ids)} meetings to database")
+        return [str(meeting_id) for meeting_id in result.inserted_ids]
+    except Exception as e:
+        print(f"❌ Error bulk saving to database: {e}")
+        return None
+
+
+def find_processed_audio(hashes):
+    """The subset of audio SHA-256 hashes that already have a saved meeting."""
+    try:
+        hashes = list(hashes)
+        if not hashes:
+            return set()
+        found = meetings_collection.find({'audio_sha256': {'$in': hashes}}, {'audio_sha256': 1, '_id': 0})
+        return {m['audio_sha256'] for m in found}
+    except Exception as e:
+        print(f"❌ Error looking up processed audio: {e}")
+        return set()
+
+def get_meeting_by_audio_hash(audio_sha256):
+    """Summary and deadlines of the latest meeting saved from this audio, or None."""
+    try:
+        meeting = meetings_collection.find_one(
+            {'audio_sha256': audio_sha256},
+            {'summary': 1, 'deadlines': 1},
+            sort=[('created_at', -1)]
+        )
+        if meeting is None:
+            return None
+        return {
+            'meeting_id': str(meeting['_id']),
+            'summary': meeting.get('summary', ''),
+            'deadlines': meeting.get('deadlines', []),
+        }
+    except Exception as e:
+        print(f"❌ Error looking up meeting by audio hash: {e}")
+        return None
+
+
 def get_all_meetings(limit=50, skip=0):
     try:
-        meetings = list(meetings_collection.find()
+        meetings = list(meetings_collection.find({}, {'transcript': 0, 'transcript_ref': 0})
                        .sort('created_at', -1)
                        .skip(skip)
                        .limit(limit))
@@ -43,25 +319,125 @@ def get_all_meetings(limit=50, skip=0):
         print(f"❌ Error fetching meetings: {e}")
         return []
 
+def _encode_cursor(meeting):
+    return f"{meeting['created_at'].isoformat()}|{meeting['_id']}"
+
+
+def _decode_cursor(cursor):
+    created_at, meeting_id = cursor.split('|', 1)
+    return datetime.fromisoformat(created_at), ObjectId(meeting_id)
+
+
+def list_meetings(limit=20, cursor=None):
+    """
+    Lightweight, keyset-paginated meeting listing (newest first).
+
+    Returns (meetings, next_cursor). Each meeting has only _id, filename,
+    created_at and deadline_count. Pass next_cursor back to get the following
+    page; it is None on the last page.
+    """
+    try:
+        query = {}
+        if cursor:
+            created_at, last_id = _decode_cursor(cursor)
+            query = {'$or': [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': last_id}}
+            ]}
+        meetings = list(meetings_collection.find(query, LISTING_PROJECTION)
+                       .sort([('created_at', -1), ('_id', -1)])
+                       .limit(limit + 1))
+        next_cursor = _encode_cursor(meetings[limit - 1]) if len(meetings) > limit else None
+        meetings = meetings[:limit]
+        for m in meetings:
+            m['_id'] = str(m['_id'])
+        return meetings, next_cursor
+    except Exception as e:
+        print(f"❌ Error listing meetings: {e}")
+        return [], None
+
+
+def get_meeting_summary(meeting_id):
+    """Fetch only the summary and deadlines of a meeting."""
+    try:
+        meeting = meetings_collection.find_one(
+            {'_id': ObjectId(meeting_id)},
+            {'summary': 1, 'deadlines': 1}
+        )
+        if meeting:
+            meeting['_id'] = str(meeting['_id'])
+        return meeting
+    except Exception as e:
+        print(f"❌ Error fetching meeting summary: {e}")
+        return None
+
+
+def get_meeting_created_at(meeting_id):
+    """Creation time of a meeting, used to anchor relative deadline dates."""
+    try:
+        meeting = meetings_collection.find_one({'_id': ObjectId(meeting_id)}, {'created_at': 1})
+        return meeting.get('created_at') if meeting else None
+    except Exception as e:
+        print(f"❌ Error fetching meeting date: {e}")
+        return None
+
+
+def get_meeting_transcript(meeting_id):
+    """Load only the transcript of a meeting, decompressing it if offloaded."""
+    try:
+        meeting = meetings_collection.find_one(
+            {'_id': ObjectId(meeting_id)},
+            {'transcript': 1, 'transcript_ref': 1}
+        )
+        if meeting is None:
+            return None
+        if 'transcript_ref' in meeting:
+            return _load_transcript(meeting['transcript_ref'])
+        return meeting.get('transcript')
+    except Exception as e:
+        print(f"❌ Error fetching meeting transcript: {e}")
+        return None
+
+
 def get_meeting_by_id(meeting_id):
     try:
         meeting = meetings_collection.find_one({'_id': ObjectId(meeting_id)})
         if meeting:
             meeting['_id'] = str(meeting['_id'])
+            ref = meeting.pop('transcript_ref', None)
+            if ref:
+                meeting['transcript'] = _load_transcript(ref)
         return meeting
     except Exception as e:
         print(f"❌ Error fetching meeting by ID: {e}")
         return None
 
-def search_meetings(query):
+def search_meetings(query, page=1, per_page=SEARCH_PAGE_SIZE):
+    """
+    Relevance-ranked search using the text index. Returns the same
+    lightweight fields as list_meetings.
+
+    Falls back to a case-insensitive substring match on filename and summary
+    when the text index finds nothing (partial words, stop words).
+    """
     try:
-        meetings = list(meetings_collection.find({
-            '$or': [
-                {'filename': {'$regex': query, '$options': 'i'}},
-                {'summary': {'$regex': query, '$options': 'i'}},
-                {'transcript': {'$regex': query, '$options': 'i'}}
-            ]
-        }).sort('created_at', -1).limit(20))
+        skip = max(0, page - 1) * per_page
+        meetings = list(meetings_collection.find(
+            {'$text': {'$search': query}},
+            {**LISTING_PROJECTION, 'score': {'$meta': 'textScore'}}
+        ).sort([('score', {'$meta': 'textScore'}), ('created_at', -1)])
+         .skip(skip)
+         .limit(per_page))
+
+        if not meetings and page == 1:
+            pattern = re.escape(query)
+            meetings = list(meetings_collection.find({
+                '$or': [
+                    {'filename': {'$regex': pattern, '$options': 'i'}},
+                    {'summary': {'$regex': pattern, '$options': 'i'}}
+                ]
+            }, LISTING_PROJECTION).sort('created_at', -1).limit(per_page))
+
         for m in meetings:
             m['_id'] = str(m['_id'])
         return meetings
@@ -69,27 +445,197 @@ def search_meetings(query):
         print(f"❌ Error searching meetings: {e}")
         return []
 
+def get_meetings_by_ids(meeting_ids):
+    """Listing fields for the given meetings, keyed by ID; unknown IDs are left out."""
+    try:
+        ids = [ObjectId(meeting_id) for meeting_id in meeting_ids if ObjectId.is_valid(meeting_id)]
+        meetings = {}
+        for m in meetings_collection.find({'_id': {'$in': ids}}, LISTING_PROJECTION):
+            m['_id'] = str(m['_id'])
+            meetings[m['_id']] = m
+        return meetings
+    except Exception as e:
+        print(f"❌ Error fetching meetings by ID: {e}")
+        return {}
+
+def get_calendar_sync_records(meeting_id):
+    """Calendar sync records (fingerprint -> event ID) for one meeting."""
+    try:
+        return list(calendar_sync_collection.find({'meeting_id': str(meeting_id)}, {'_id': 0}))
+    except Exception as e:
+        print(f"❌ Error fetching calendar sync records: {e}")
+        return []
+
+def claim_calendar_sync(fingerprint, meeting_id, title):
+    """
+    Reserve a deadline fingerprint before inserting its calendar event.
+
+    Returns True if this caller may insert the event: the fingerprint was
+    new, or an earlier claim was abandoned without an event ID.
+    """
+    from pymongo.errors import DuplicateKeyError
+
+    now = datetime.utcnow()
+    try:
+        calendar_sync_collection.insert_one({
+            'fingerprint': fingerprint,
+            'meeting_id': str(meeting_id),
+            'title': title,
+            'event_id': None,
+            'event_hash': None,
+            'claimed_at': now,
+            'updated_at': now
+        })
+        return True
+    except DuplicateKeyError:
+        result = calendar_sync_collection.update_one(
+            {'fingerprint': fingerprint, 'event_id': None,
+             'claimed_at': {'$lt': now - timedelta(seconds=CALENDAR_CLAIM_SECONDS)}},
+            {'$set': {'claimed_at': now}}
+        )
+        return result.modified_count == 1
+    except Exception as e:
+        print(f"❌ Error claiming calendar sync: {e}")
+        return False
+
+def save_calendar_sync(fingerprint, meeting_id, title, event_id, event_hash):
+    """Record the calendar event ID and content hash for a deadline."""
+    try:
+        calendar_sync_collection.update_one(
+            {'fingerprint': fingerprint},
+            {'$set': {
+                'meeting_id': str(meeting_id),
+                'title': title,
+                'event_id': event_id,
+                'event_hash': event_hash,
+                'updated_at': datetime.utcnow()
+            }},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"❌ Error saving calendar sync: {e}")
+
+def delete_calendar_sync(fingerprint):
+    try:
+        calendar_sync_collection.delete_one({'fingerprint': fingerprint})
+    except Exception as e:
+        print(f"❌ Error deleting calendar sync: {e}")
+
 def delete_meeting(meeting_id):
     try:
-        result = meetings_collection.delete_one({'_id': ObjectId(meeting_id)})
-        return result.deleted_count > 0
+        meeting = meetings_collection.find_one_and_delete(
+            {'_id': ObjectId(meeting_id)},
+            projection={'created_at': 1, 'deadline_count': 1, 'deadlines': 1, 'transcript_ref': 1}
+        )
+        if meeting is None:
+            return False
+        deadline_count = meeting.get('deadline_count', len(meeting.get('deadlines', [])))
+        _update_statistics([(meeting['created_at'], deadline_count)], -1)
+        if meeting.get('transcript_ref'):
+            try:
+                _delete_transcript(meeting['transcript_ref'])
+            except Exception as e:
+                print(f"❌ Error deleting offloaded transcript: {e}")
+        return True
     except Exception as e:
         print(f"❌ Error deleting meeting: {e}")
         return False
 
+def _day_key(created_at):
+    return created_at.strftime('%Y-%m-%d')
+
+def _week_key(created_at):
+    year, week, _ = created_at.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def _statistics_inc(meetings, sign):
+    """
+    $inc update for the stats document that applies saved (+1) or deleted
+    (-1) meetings, given as (created_at, deadline_count) pairs.
+    """
+    inc = {}
+    for created_at, deadline_count in meetings:
+        for key, value in (
+            ('total_meetings', sign),
+            ('total_deadlines', sign * deadline_count),
+            (f'meetings_by_day.{_day_key(created_at)}', sign),
+            (f'deadlines_by_week.{_week_key(created_at)}', sign * deadline_count),
+        ):
+            inc[key] = inc.get(key, 0) + value
+    return {'$inc': inc}
+
+def _update_statistics(meetings, sign):
+    """
+    Atomically apply saved (+1) or deleted (-1) meetings to the stats document.
+
+    A missing document is rebuilt from the meetings collection rather than
+    upserted, so it never holds only the latest delta.
+    """
+    try:
+        result = stats_collection.update_one({'_id': STATS_DOC_ID}, _statistics_inc(meetings, sign))
+        if result.matched_count == 0:
+            rebuild_meeting_statistics()
+    except Exception as e:
+        print(f"❌ Error updating statistics: {e}")
+
+def rebuild_meeting_statistics():
+    """Recompute the stats document from scratch with an aggregation pipeline."""
+    try:
+        deadline_count = {'$ifNull': ['$deadline_count', {'$size': {'$ifNull': ['$deadlines', []]}}]}
+        result = list(meetings_collection.aggregate([
+            {'$project': {'created_at': 1, 'deadline_count': deadline_count}},
+            {'$facet': {
+                'totals': [
+                    {'$group': {'_id': None, 'meetings': {'$sum': 1}, 'deadlines': {'$sum': '$deadline_count'}}}
+                ],
+                'by_day': [
+                    {'$group': {'_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
+                                'count': {'$sum': 1}}}
+                ],
+                'by_week': [
+                    {'$group': {'_id': {'$dateToString': {'format': '%G-W%V', 'date': '$created_at'}},
+                                'count': {'$sum': '$deadline_count'}}}
+                ],
+            }}
+        ]))[0]
+        totals = result['totals'][0] if result['totals'] else {'meetings': 0, 'deadlines': 0}
+        stats_doc = {
+            'total_meetings': totals['meetings'],
+            'total_deadlines': totals['deadlines'],
+            'meetings_by_day': {d['_id']: d['count'] for d in result['by_day']},
+            'deadlines_by_week': {w['_id']: w['count'] for w in result['by_week']},
+        }
+        stats_collection.replace_one({'_id': STATS_DOC_ID}, stats_doc, upsert=True)
+        return stats_doc
+    except Exception as e:
+        print(f"❌ Error rebuilding statistics: {e}")
+        return None
+
 def get_meeting_statistics():
+    """Read the precomputed stats document; built once if it does not exist yet."""
     try:
-        total_meetings = meetings_collection.count_documents({})
-        total_deadlines = sum(len(m.get('deadlines', [])) for m in meetings_collection.find({}, {'deadlines': 1}))
+        stats = stats_collection.find_one({'_id': STATS_DOC_ID}) or rebuild_meeting_statistics()
+        if stats is None:
+            raise RuntimeError("statistics unavailable")
+        total_meetings = stats.get('total_meetings', 0)
+        total_deadlines = stats.get('total_deadlines', 0)
         return {
             'total_meetings': total_meetings,
             'total_deadlines': total_deadlines,
-            'average_deadlines_per_meeting': total_deadlines / total_meetings if total_meetings else 0
+            'average_deadlines_per_meeting': total_deadlines / total_meetings if total_meetings else 0,
+            'meetings_per_day': dict(sorted(
+                (day, n) for day, n in stats.get('meetings_by_day', {}).items() if n > 0
+            )),
+            'deadlines_per_week': dict(sorted(
+                (week, n) for week, n in stats.get('deadlines_by_week', {}).items() if n > 0
+            ))
         }
     except Exception as e:
         print(f"❌ Error getting statistics: {e}")
         return {
             'total_meetings': 0,
             'total_deadlines': 0,
-            'average_deadlines_per_meeting': 0
+            'average_deadlines_per_meeting': 0,
+            'meetings_per_day': {},
+            'deadlines_per_week': {}
         }
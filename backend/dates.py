@@ -0,0 +1,185 @@
+# backend/dates.py
+import re
+import calendar
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+
+MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9,
+    'oct': 10, 'october': 10, 'nov': 11, 'november': 11, 'dec': 12, 'december': 12,
+}
+WEEKDAYS = {
+    'mon': 0, 'monday': 0, 'tue': 1, 'tues': 1, 'tuesday': 1, 'wed': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3, 'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5, 'sun': 6, 'sunday': 6,
+}
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+
+_MONTH_NAMES = '|'.join(sorted(MONTHS, key=len, reverse=True))
+_WEEKDAY_NAMES = '|'.join(sorted(WEEKDAYS, key=len, reverse=True))
+_MONTH = r'(?P<month>' + _MONTH_NAMES + r')\.?'
+_WEEKDAY = r'(?P<weekday>' + _WEEKDAY_NAMES + r')'
+_DAY = r'(?P<day>\d{1,2})(?:st|nd|rd|th)?'
+_YEAR = r'(?:,?\s+(?P<year>\d{4}))?'
+_NUMBER = r'(?P<n>\d+|' + '|'.join(NUMBER_WORDS) + r')'
+
+# Leading words LLMs put in front of a date ("by Friday", "due on 5 March")
+_PREFIX_RE = re.compile(
+    r'^(?:(?:due|deadline|by|on|before|until|till|no later than|the|of)\b[\s:]*|:\s*)+'
+)
+
+_ISO_RE = re.compile(
+    r'^(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})'
+    r'(?:[t ](?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?)?'
+)
+_NUMERIC_RE = re.compile(r'^(?P<day>\d{1,2})/(?P<month>\d{1,2})/(?P<year>\d{4})$')
+_MONTH_DAY_RE = re.compile(r'^' + _MONTH + r'\s+' + _DAY + _YEAR + r'$')
+_DAY_MONTH_RE = re.compile(r'^' + _DAY + r'(?:\s+of)?\s+' + _MONTH + _YEAR + r'$')
+_WEEKDAY_RE = re.compile(r'^(?P<which>this|next|coming)?\s*' + _WEEKDAY + r'$')
+_IN_RE = re.compile(r'^in\s+' + _NUMBER + r'\s+(?P<unit>day|week|month)s?$')
+_END_OF_RE = re.compile(r'^(?:the\s+)?end\s+of\s+(?:the\s+)?(?P<which>this\s+|next\s+)?(?P<unit>day|week|month|quarter|year)$')
+_RELATIVE_DAYS = {
+    'today': 0, 'tonight': 0, 'eod': 0, 'end of day': 0, 'end of today': 0,
+    'tomorrow': 1, 'day after tomorrow': 2,
+    'next week': 7, 'next month': None,
+}
+
+MEMO_SIZE = 4096
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _absolute(year, month, day, reference: date):
+    """Build a date; without a year, pick the next occurrence from the reference."""
+    try:
+        if year:
+            return date(int(year), month, int(day))
+        result = date(reference.year, month, int(day))
+        if result < reference:
+            result = date(reference.year + 1, month, int(day))
+        return result
+    except ValueError:
+        return None
+
+
+def _end_of(unit, which, reference: date):
+    if unit == 'day':
+        return reference + timedelta(days=1 if which else 0)
+    if unit == 'week':
+        # Working week: Friday of this (or next) week
+        friday = reference + timedelta(days=(4 - reference.weekday()) % 7)
+        return friday + timedelta(days=7 if which else 0)
+    if unit == 'month':
+        anchor = _add_months(reference, 1 if which else 0)
+        return anchor.replace(day=calendar.monthrange(anchor.year, anchor.month)[1])
+    if unit == 'quarter':
+        last_month = ((reference.month - 1) // 3 + 1) * 3 + (3 if which else 0)
+        anchor = _add_months(reference.replace(day=1), last_month - reference.month)
+        return anchor.replace(day=calendar.monthrange(anchor.year, anchor.month)[1])
+    return date(reference.year + (1 if which else 0), 12, 31)
+
+
+def _parse(text: str, reference: date):
+    """Parse normalized text to a datetime, or None."""
+    text = _PREFIX_RE.sub('', text).strip(' .,')
+
+    m = _ISO_RE.match(text)
+    if m:
+        try:
+            return datetime(
+                int(m['year']), int(m['month']), int(m['day']),
+                int(m['hour'] or 0), int(m['minute'] or 0), int(m['second'] or 0)
+            )
+        except ValueError:
+            return None
+
+    result = None
+
+    if text in _RELATIVE_DAYS:
+        offset = _RELATIVE_DAYS[text]
+        result = _add_months(reference, 1) if offset is None else reference + timedelta(days=offset)
+    elif (m := _NUMERIC_RE.match(text)):
+        result = _absolute(m['year'], int(m['month']), m['day'], reference)
+    elif (m := _MONTH_DAY_RE.match(text)) or (m := _DAY_MONTH_RE.match(text)):
+        result = _absolute(m['year'], MONTHS[m['month']], m['day'], reference)
+    elif (m := _WEEKDAY_RE.match(text)):
+        # "Friday" / "this Friday": next occurrence after the reference day.
+        # "next Friday": the occurrence in the following week.
+        days_ahead = (WEEKDAYS[m['weekday']] - reference.weekday()) % 7 or 7
+        if m['which'] == 'next' and days_ahead < 7 and WEEKDAYS[m['weekday']] > reference.weekday():
+            days_ahead += 7
+        result = reference + timedelta(days=days_ahead)
+    elif (m := _IN_RE.match(text)):
+        n = int(m['n']) if m['n'].isdigit() else NUMBER_WORDS[m['n']]
+        if m['unit'] == 'month':
+            result = _add_months(reference, n)
+        else:
+            result = reference + timedelta(days=n * (7 if m['unit'] == 'week' else 1))
+    elif (m := _END_OF_RE.match(text)):
+        result = _end_of(m['unit'], m['which'], reference)
+
+    return datetime.combine(result, datetime.min.time()) if result else None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _parse_memo(text: str, reference: date):
+    return _parse(text, reference)
+
+
+def parse_deadline_date(text, reference=None):
+    """
+    Parse an absolute or relative deadline expression into a datetime.
+
+    Handles ISO dates ("2025-01-15", "2025-01-15T17:00"), "15/01/2025",
+    "January 15", "15th Jan 2025", weekdays ("Friday", "next Friday"),
+    "today"/"tomorrow"/"EOD", "in 3 days", "next week" and "end of
+    week/month/quarter/year". Relative expressions are anchored to
+    `reference` (the meeting date; defaults to now). Results are memoized.
+
+    Returns None if the text is not recognized.
+    """
+    if not text or not isinstance(text, str):
+        return None
+    if reference is None:
+        reference = datetime.now()
+    if isinstance(reference, datetime):
+        reference = reference.date()
+    normalized = " ".join(text.lower().split())
+    return _parse_memo(normalized, reference)
+
+
+_MONTH_ALT = r'(?:' + _MONTH_NAMES + r')\.?'
+
+# Expressions that suggest a date or deadline somewhere in free text. "May"
+# and "March" double as ordinary words, so bare month names need a day or a
+# preposition next to them; weekdays must be spelled out ("sat", "sun").
+_CANDIDATE_RE = re.compile(
+    r'\b(?:'
+    r'\d{4}-\d{1,2}-\d{1,2}'
+    r'|\d{1,2}/\d{1,2}(?:/\d{2,4})?'
+    r'|' + _MONTH_ALT + r'\s+\d{1,2}(?:st|nd|rd|th)?\b'
+    r'|\d{1,2}(?:st|nd|rd|th)?(?:\s+of)?\s+' + _MONTH_ALT + r'\b'
+    r'|(?:in|by|until|before|end\s+of)\s+' + _MONTH_ALT + r'\b'
+    r'|(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b'
+    r'|today|tonight|tomorrow|eod|eow|asap'
+    r'|(?:next|this|coming)\s+(?:week|month|quarter|year)'
+    r'|end\s+of\s+(?:the\s+)?(?:day|week|month|quarter|year)'
+    r'|in\s+(?:\d+|' + '|'.join(NUMBER_WORDS) + r')\s+(?:day|week|month)s?'
+    r'|deadlines?|due|no\s+later\s+than'
+    r')\b',
+    re.IGNORECASE
+)
+
+
+def find_date_candidates(text: str) -> list:
+    """Return (start, end) spans of date/deadline expressions in `text`."""
+    return [m.span() for m in _CANDIDATE_RE.finditer(text or '')]
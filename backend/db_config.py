@@ -1,20 +1,101 @@
 # backend/db_config.py
 import os
+import threading
 from dotenv import load_dotenv
-from openai import OpenAI
-import openai  # for legacy compatibility
 
 # Load environment variables from .env
 dotenv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env")
 load_dotenv(dotenv_path)
 
-# OpenAI API key
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY not found. Please set it in your .env file.")
+# Connection pool shared by all worker threads; size it to cover concurrent calls
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "16"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+# The async client (ASGI mode) multiplexes many more calls over one process
+OPENAI_ASYNC_MAX_CONNECTIONS = int(os.getenv("OPENAI_ASYNC_MAX_CONNECTIONS", "256"))
+# Point at a stub server (benchmarks/stub_openai_server.py) for local testing
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
 
-# Initialize OpenAI client
-client = OpenAI(api_key=api_key)
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
 
-# Legacy openai namespace
-openai.api_key = api_key
+
+def _api_key():
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found. Please set it in your .env file.")
+    return api_key
+
+
+def get_openai_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+
+    The openai/httpx imports and the API key check happen here rather than at
+    import time, so code paths that never call the API do not pay for them.
+    Retries are handled in backend/llm.py, which knows about the shared rate
+    limiter, so the SDK's own retries are disabled.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            import httpx
+            import openai  # for legacy compatibility
+            from openai import OpenAI
+
+            # OpenAI API key
+            api_key = _api_key()
+
+            # Legacy openai namespace
+            openai.api_key = api_key
+            _client = OpenAI(
+                api_key=api_key,
+                base_url=OPENAI_BASE_URL,
+                max_retries=0,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                    ),
+                    timeout=httpx.Timeout(600.0, connect=OPENAI_CONNECT_TIMEOUT),
+                ),
+            )
+    return _client
+
+
+def get_async_openai_client():
+    """
+    Return the shared AsyncOpenAI client used by the ASGI server, creating
+    it on first use. Like get_openai_client, SDK retries are disabled.
+    """
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+    with _client_lock:
+        if _async_client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            _async_client = AsyncOpenAI(
+                api_key=_api_key(),
+                base_url=OPENAI_BASE_URL,
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_ASYNC_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_ASYNC_MAX_CONNECTIONS,
+                    ),
+                    timeout=httpx.Timeout(600.0, connect=OPENAI_CONNECT_TIMEOUT),
+                ),
+            )
+    return _async_client
+
+
+def __getattr__(name):
+    # `from backend.db_config import client` keeps working, lazily
+    if name == "client":
+        return get_openai_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
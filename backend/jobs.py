@@ -0,0 +1,364 @@
+# backend/jobs.py
+import os
+import time
+import asyncio
+import uuid
+import queue
+import threading
+import traceback
+from datetime import datetime, timedelta
+from .uploads import spool_upload
+
+# Job queue configuration
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")  # memory | mongo
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "20"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+# Running jobs renew their lease this often, so only jobs of dead workers expire
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+# Pipelines running at once in the ASGI server; each mostly waits on the network
+ASYNC_JOB_CONCURRENCY = int(os.getenv("ASYNC_JOB_CONCURRENCY", "256"))
+
+# Pipeline stages reported to clients, in order
+STAGES = ("transcribing", "summarizing", "extracting", "saving")
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at capacity; clients should retry later."""
+
+
+def _new_job(job_id, filename):
+    now = datetime.utcnow()
+    return {
+        "job_id": job_id,
+        "filename": filename,
+        "status": "queued",
+        "stages": {stage: "pending" for stage in STAGES},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class InMemoryJobQueue:
+    """Bounded in-process queue. Jobs are lost on restart; meant for a single
+    process and for tests."""
+
+    def __init__(self, maxsize=JOB_QUEUE_MAX):
+        self._pending = queue.Queue(maxsize=maxsize)
+        self._jobs = {}
+        self._audio = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        """Forget finished jobs older than JOB_RETENTION_SECONDS."""
+        cutoff = datetime.utcnow() - timedelta(seconds=JOB_RETENTION_SECONDS)
+        for job_id in [j for j, job in self._jobs.items()
+                       if job["status"] in ("done", "failed") and job["updated_at"] < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, filename, audio_file) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = _new_job(job_id, filename)
+            self._audio[job_id] = audio_file
+        try:
+            self._pending.put_nowait(job_id)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self._audio.pop(job_id, None)
+            raise QueueFull("Job queue is full, retry later")
+        return job_id
+
+    def claim(self, timeout=JOB_POLL_SECONDS):
+        """Return (job_id, filename, audio file) for the next job, or None."""
+        try:
+            job_id = self._pending.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["updated_at"] = datetime.utcnow()
+            return job_id, job["filename"], self._audio.pop(job_id)
+
+    def heartbeat(self, job_id) -> bool:
+        with self._lock:
+            self._jobs[job_id]["updated_at"] = datetime.utcnow()
+        return True
+
+    def update_stage(self, job_id, stage, state):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["stages"][stage] = state
+            job["updated_at"] = datetime.utcnow()
+
+    def finish(self, job_id, result=None, error=None):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "failed" if error else "done"
+            job["result"] = result
+            job["error"] = error
+            job["updated_at"] = datetime.utcnow()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "stages": dict(job["stages"])}
+
+
+class MongoJobQueue:
+    """Job queue shared between nodes through MongoDB. Audio is stored in
+    GridFS so any node can pick the job up. Workers renew their lease on a
+    running job with heartbeat(); a job whose lease has not been renewed for
+    JOB_LEASE_SECONDS (its worker died) is reclaimed by another worker, and
+    the old worker can no longer renew or finish it."""
+
+    def __init__(self, maxsize=JOB_QUEUE_MAX, lease_seconds=JOB_LEASE_SECONDS):
+        import gridfs
+        from .database import get_db
+
+        self.maxsize = maxsize
+        self.lease = timedelta(seconds=lease_seconds)
+        self.collection = get_db()["jobs"]
+        self.audio = gridfs.GridFSBucket(get_db(), bucket_name="job_audio")
+        self.collection.create_index("job_id", unique=True)
+        self.collection.create_index([("status", 1), ("created_at", 1)])
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+        self._owners = {}  # job_id -> lease token of the jobs this process runs
+        self._owners_lock = threading.Lock()
+
+    def submit(self, filename, audio_file) -> str:
+        if self.collection.count_documents({"status": "queued"}) >= self.maxsize:
+            raise QueueFull("Job queue is full, retry later")
+        job_id = uuid.uuid4().hex
+        audio_file.seek(0)
+        audio_id = self.audio.upload_from_stream(filename, audio_file)
+        job = _new_job(job_id, filename)
+        job["audio_id"] = audio_id
+        self.collection.insert_one(job)
+        return job_id
+
+    def claim(self, timeout=JOB_POLL_SECONDS):
+        now = datetime.utcnow()
+        owner = uuid.uuid4().hex
+        job = self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued"},
+                {"status": "running", "updated_at": {"$lt": now - self.lease}},
+            ]},
+            {"$set": {"status": "running", "updated_at": now, "lease_owner": owner}},
+            sort=[("created_at", 1)],
+        )
+        if job is None:
+            time.sleep(timeout)
+            return None
+        with self._owners_lock:
+            self._owners[job["job_id"]] = owner
+        with self.audio.open_download_stream(job["audio_id"]) as stream:
+            audio = spool_upload(stream, job["filename"], max_bytes=None)
+        return job["job_id"], job["filename"], audio
+
+    def _owned(self, job_id) -> dict:
+        """Filter matching the job only while this process still holds its lease."""
+        with self._owners_lock:
+            owner = self._owners.get(job_id)
+        return {"job_id": job_id, "lease_owner": owner}
+
+    def heartbeat(self, job_id) -> bool:
+        """Renew the lease on a running job; False if another worker reclaimed it."""
+        result = self.collection.update_one(
+            dict(self._owned(job_id), status="running"),
+            {"$set": {"updated_at": datetime.utcnow()}},
+        )
+        return result.matched_count == 1
+
+    def update_stage(self, job_id, stage, state):
+        self.collection.update_one(
+            {"job_id": job_id},
+            {"$set": {f"stages.{stage}": state, "updated_at": datetime.utcnow()}},
+        )
+
+    def finish(self, job_id, result=None, error=None):
+        job = self.collection.find_one_and_update(
+            self._owned(job_id),
+            {"$set": {
+                "status": "failed" if error else "done",
+                "result": result,
+                "error": error,
+                "updated_at": datetime.utcnow(),
+                "expires_at": datetime.utcnow() + timedelta(seconds=JOB_RETENTION_SECONDS),
+            }},
+        )
+        with self._owners_lock:
+            self._owners.pop(job_id, None)
+        if job is None:
+            print(f"❌ Job {job_id} was reclaimed by another worker, result discarded")
+            return
+        if job.get("audio_id") is not None:
+            try:
+                self.audio.delete(job["audio_id"])
+            except Exception as e:
+                print(f"❌ Error deleting job audio: {e}")
+
+    def get(self, job_id):
+        return self.collection.find_one({"job_id": job_id}, {"_id": 0, "audio_id": 0, "expires_at": 0})
+
+
+class AsyncJobQueue:
+    """
+    Job queue for the ASGI server: each job is a task on the event loop,
+    running `process_fn(audio_file, on_stage)` (a coroutine function) with at
+    most `concurrency` jobs in flight and `maxsize` more waiting. Job
+    documents match InMemoryJobQueue's. In-process only; all methods must be
+    called from the event loop thread.
+    """
+
+    def __init__(self, process_fn, concurrency=ASYNC_JOB_CONCURRENCY, maxsize=JOB_QUEUE_MAX):
+        self.process_fn = process_fn
+        self.concurrency = concurrency
+        self.maxsize = maxsize
+        self._jobs = {}
+        self._tasks = set()
+        self._slots = None  # created on first use, inside the running loop
+
+    def _prune(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=JOB_RETENTION_SECONDS)
+        for job_id in [j for j, job in self._jobs.items()
+                       if job["status"] in ("done", "failed") and job["updated_at"] < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, filename, audio_file) -> str:
+        self._prune()
+        if sum(1 for job in self._jobs.values() if job["status"] == "queued") >= self.maxsize:
+            raise QueueFull("Job queue is full, retry later")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = _new_job(job_id, filename)
+        task = asyncio.get_running_loop().create_task(self._run(job_id, audio_file))
+        # Keep a reference so the task is not garbage-collected while it runs
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    async def _run(self, job_id, audio):
+        try:
+            async with self._slots:
+                job = self._jobs[job_id]
+                job["status"] = "running"
+                job["updated_at"] = datetime.utcnow()
+
+                def on_stage(stage, state):
+                    self.update_stage(job_id, stage, state)
+
+                try:
+                    result = await self.process_fn(audio, on_stage)
+                    self.finish(job_id, result=result)
+                except Exception as e:
+                    traceback.print_exc()
+                    self.finish(job_id, error=str(e))
+        finally:
+            audio.close()
+
+    def update_stage(self, job_id, stage, state):
+        job = self._jobs[job_id]
+        job["stages"][stage] = state
+        job["updated_at"] = datetime.utcnow()
+
+    def finish(self, job_id, result=None, error=None):
+        job = self._jobs[job_id]
+        job["status"] = "failed" if error else "done"
+        job["result"] = result
+        job["error"] = error
+        job["updated_at"] = datetime.utcnow()
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {**job, "stages": dict(job["stages"])}
+
+
+def make_job_queue():
+    """Create the job queue selected by JOB_QUEUE_BACKEND."""
+    if JOB_QUEUE_BACKEND == "mongo":
+        return MongoJobQueue()
+    return InMemoryJobQueue()
+
+
+class JobWorkerPool:
+    """Worker threads that claim jobs and run them through `process_fn`.
+
+    `process_fn(audio_file, on_stage)` must return a JSON-serializable result;
+    `on_stage(stage, state)` is used to report progress.
+    """
+
+    def __init__(self, job_queue, process_fn, workers=JOB_WORKERS):
+        self.job_queue = job_queue
+        self.process_fn = process_fn
+        self.workers = workers
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def _heartbeat(self, job_id, done):
+        """Renew the job's lease until `done` is set, so long stages are not reclaimed."""
+        while not done.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                if not self.job_queue.heartbeat(job_id):
+                    print(f"❌ Lost the lease on job {job_id}")
+                    return
+            except Exception as e:
+                print(f"❌ Error renewing job lease: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.job_queue.claim()
+            except Exception as e:
+                print(f"❌ Error claiming job: {e}")
+                self._stop.wait(JOB_POLL_SECONDS)
+                continue
+            if claimed is None:
+                continue
+
+            job_id, filename, audio = claimed
+
+            def on_stage(stage, state, job_id=job_id):
+                self.job_queue.update_stage(job_id, stage, state)
+
+            done = threading.Event()
+            threading.Thread(target=self._heartbeat, args=(job_id, done),
+                             name=f"{threading.current_thread().name}-lease", daemon=True).start()
+            try:
+                result = self.process_fn(audio, on_stage)
+                self.job_queue.finish(job_id, result=result)
+            except Exception as e:
+                traceback.print_exc()
+                self.job_queue.finish(job_id, error=str(e))
+            finally:
+                done.set()
+                audio.close()
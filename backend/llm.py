@@ -0,0 +1,224 @@
+# backend/llm.py
+import os
+import time
+import random
+import asyncio
+import threading
+from .db_config import get_openai_client, get_async_openai_client
+from .chunking import count_tokens
+from .metrics import OPENAI_CALLS
+
+# Account limits shared by every worker thread in this process (0 = unlimited)
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+
+# Retry policy for 429 / 5xx / timeouts / connection errors
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "0.5"))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", "30"))
+
+# Per-call timeouts (seconds)
+CHAT_TIMEOUT = float(os.getenv("OPENAI_CHAT_TIMEOUT", "120"))
+TRANSCRIBE_TIMEOUT = float(os.getenv("OPENAI_TRANSCRIBE_TIMEOUT", "600"))
+
+# Completion tokens assumed per chat call when charging the TPM bucket
+COMPLETION_TOKENS_ESTIMATE = int(os.getenv("OPENAI_COMPLETION_TOKENS_ESTIMATE", "500"))
+# Whisper calls are charged as this many tokens against the TPM bucket
+TRANSCRIPTION_TOKENS_ESTIMATE = 0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` per second."""
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount=1.0) -> float:
+        """Take `amount` tokens if available and return 0, else return the seconds to wait."""
+        amount = min(float(amount), self.capacity)
+        with self._cond:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def acquire(self, amount=1.0):
+        """Block until `amount` tokens are available and take them.
+
+        Requests larger than the capacity are clamped so they can still pass
+        once the bucket is full.
+        """
+        amount = min(float(amount), self.capacity)
+        with self._cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                self._cond.wait((amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits as two token buckets."""
+
+    def __init__(self, rpm=OPENAI_RPM_LIMIT, tpm=OPENAI_TPM_LIMIT):
+        self.requests = TokenBucket(rpm, rpm / 60.0) if rpm else None
+        self.tokens = TokenBucket(tpm, tpm / 60.0) if tpm else None
+
+    def acquire(self, tokens=0):
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens and tokens:
+            self.tokens.acquire(tokens)
+
+    async def acquire_async(self, tokens=0):
+        """acquire() for coroutines: waits on the event loop instead of blocking it.
+        The buckets are shared with threaded callers."""
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            while bucket and amount:
+                wait = bucket.try_acquire(amount)
+                if not wait:
+                    break
+                await asyncio.sleep(wait)
+
+
+rate_limiter = RateLimiter()
+
+def llm_stats() -> dict:
+    """Call, retry and failure counters since process start."""
+    outcomes = {outcome: OPENAI_CALLS.value(outcome=outcome) for outcome in ("ok", "retry", "failed")}
+    return {"calls": sum(outcomes.values()), "retries": outcomes["retry"], "failures": outcomes["failed"]}
+
+
+def _retry_after(error):
+    """Seconds from a Retry-After header, if the server sent one."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _is_retryable(error) -> bool:
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def backoff_delay(attempt, retry_after=None) -> float:
+    """Exponential backoff with full jitter, never shorter than Retry-After."""
+    delay = random.uniform(0, min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, OPENAI_BACKOFF_MAX))
+    return delay
+
+
+def call_with_retries(fn, tokens=0, **kwargs):
+    """
+    Call an OpenAI client method under the shared rate limiter, retrying
+    429, 5xx, timeout and connection errors with exponential backoff.
+    """
+    attempt = 0
+    while True:
+        rate_limiter.acquire(tokens)
+        try:
+            response = fn(**kwargs)
+        except Exception as e:
+            if not _is_retryable(e) or attempt >= OPENAI_MAX_RETRIES:
+                OPENAI_CALLS.inc(outcome="failed")
+                raise
+            delay = backoff_delay(attempt, _retry_after(e))
+            print(f"DEBUG: OpenAI call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s")
+            OPENAI_CALLS.inc(outcome="retry")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        OPENAI_CALLS.inc(outcome="ok")
+        return response
+
+
+async def async_call_with_retries(fn, tokens=0, **kwargs):
+    """call_with_retries for coroutine functions of the async client."""
+    attempt = 0
+    while True:
+        await rate_limiter.acquire_async(tokens)
+        try:
+            response = await fn(**kwargs)
+        except Exception as e:
+            if not _is_retryable(e) or attempt >= OPENAI_MAX_RETRIES:
+                OPENAI_CALLS.inc(outcome="failed")
+                raise
+            delay = backoff_delay(attempt, _retry_after(e))
+            print(f"DEBUG: OpenAI call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s")
+            OPENAI_CALLS.inc(outcome="retry")
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        OPENAI_CALLS.inc(outcome="ok")
+        return response
+
+
+def _message_tokens(messages) -> int:
+    return sum(count_tokens(m.get("content") or "") for m in messages)
+
+
+def chat_completion(**kwargs):
+    """client.chat.completions.create with rate limiting, retries and a timeout."""
+    kwargs.setdefault("timeout", CHAT_TIMEOUT)
+    tokens = _message_tokens(kwargs.get("messages", [])) + kwargs.get("max_tokens", COMPLETION_TOKENS_ESTIMATE)
+    return call_with_retries(get_openai_client().chat.completions.create, tokens=tokens, **kwargs)
+
+
+async def async_chat_completion(**kwargs):
+    """chat_completion on the async client."""
+    kwargs.setdefault("timeout", CHAT_TIMEOUT)
+    tokens = _message_tokens(kwargs.get("messages", [])) + kwargs.get("max_tokens", COMPLETION_TOKENS_ESTIMATE)
+    return await async_call_with_retries(get_async_openai_client().chat.completions.create, tokens=tokens, **kwargs)
+
+
+def create_transcription(**kwargs):
+    """client.audio.transcriptions.create with rate limiting, retries and a timeout."""
+    kwargs.setdefault("timeout", TRANSCRIBE_TIMEOUT)
+    file = kwargs.get("file")
+
+    def create(**call_kwargs):
+        # A failed attempt may have consumed part of the upload
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return get_openai_client().audio.transcriptions.create(**call_kwargs)
+
+    return call_with_retries(create, tokens=TRANSCRIPTION_TOKENS_ESTIMATE, **kwargs)
+
+
+async def async_create_transcription(**kwargs):
+    """create_transcription on the async client."""
+    kwargs.setdefault("timeout", TRANSCRIBE_TIMEOUT)
+    file = kwargs.get("file")
+
+    async def create(**call_kwargs):
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return await get_async_openai_client().audio.transcriptions.create(**call_kwargs)
+
+    return await async_call_with_retries(create, tokens=TRANSCRIPTION_TOKENS_ESTIMATE, **kwargs)
+
+
+def create_embeddings(**kwargs):
+    """client.embeddings.create with rate limiting, retries and a timeout."""
+    kwargs.setdefault("timeout", CHAT_TIMEOUT)
+    inputs = kwargs.get("input", [])
+    tokens = sum(count_tokens(text) for text in ([inputs] if isinstance(inputs, str) else inputs))
+    return call_with_retries(get_openai_client().embeddings.create, tokens=tokens, **kwargs)
@@ -1,17 +1,52 @@
 # backend/main.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from .routes import process_meeting, add_reminders_to_calendar
+from .routes import process_meeting, process_meeting_stream, add_reminders_to_calendar, read_upload
+from .cache import cache_stats
+from .jobs import make_job_queue, JobWorkerPool, QueueFull, JOB_POLL_SECONDS
+from .uploads import UploadTooLarge, MAX_UPLOAD_BYTES
+from .metrics import render_metrics
 import os
+import json
 import traceback
 
 app = Flask(__name__)
 CORS(app)
+# Werkzeug rejects larger bodies with 413 while parsing, before the view runs
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+
+
+def _run_job(audio_file, on_stage):
+    """Worker entry point: run the pipeline and keep only what clients need."""
+    result = process_meeting(audio_file, on_stage=on_stage)
+    return {
+        'meeting_id': result['meeting_id'],
+        'summary': result['summary'],
+        'deadlines': result['deadlines'],
+        'timings': result['timings'],
+    }
+
+
+job_queue = make_job_queue()
+worker_pool = JobWorkerPool(job_queue, _run_job)
+
+
+def start_workers():
+    """Start this process's job workers. Importing the app never does;
+    whatever serves it calls this (or `create_app`) once per process."""
+    worker_pool.start()
+    return worker_pool
+
+
+def create_app():
+    """App factory for WSGI servers: `gunicorn "backend.main:create_app()"`."""
+    start_workers()
+    return app
 
 
 @app.route('/api/upload', methods=['POST'])
 def upload_audio():
-    """Handle audio file upload and processing"""
+    """Queue an uploaded audio file for processing and return its job ID"""
     try:
         if 'audio' not in request.files:
             return jsonify({'success': False, 'error': 'No audio file provided'}), 400
@@ -20,9 +55,24 @@ def upload_audio():
         if audio_file.filename == '':
             return jsonify({'success': False, 'error': 'No file selected'}), 400
 
-        result = process_meeting(audio_file)
-        return jsonify({'success': True, 'summary': result['summary'], 'deadlines': result['deadlines']}), 200
+        audio = read_upload(audio_file.stream, audio_file.filename)
+        try:
+            job_id = job_queue.submit(audio.name, audio)
+        except Exception:
+            audio.close()
+            raise
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
 
+    except UploadTooLarge as e:
+        return jsonify({'success': False, 'error': str(e)}), 413
+    except QueueFull as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = str(max(1, int(JOB_POLL_SECONDS * 5)))
+        return response, 503
     except ValueError as e:
         return jsonify({'success': False, 'error': str(e)}), 400
     except RuntimeError as e:
@@ -33,6 +83,54 @@ def upload_audio():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.route('/api/upload/stream', methods=['POST'])
+def upload_audio_stream():
+    """Process an upload and stream stage events and summary tokens over SSE"""
+    if 'audio' not in request.files:
+        return jsonify({'success': False, 'error': 'No audio file provided'}), 400
+
+    audio_file = request.files['audio']
+    if audio_file.filename == '':
+        return jsonify({'success': False, 'error': 'No file selected'}), 400
+
+    try:
+        audio = read_upload(audio_file.stream, audio_file.filename)
+    except UploadTooLarge as e:
+        return jsonify({'success': False, 'error': str(e)}), 413
+
+    def generate():
+        try:
+            for event, data in process_meeting_stream(audio):
+                if event == 'done':
+                    data = {k: v for k, v in data.items() if k != 'transcript'}
+                yield _sse(event, data)
+        except Exception as e:
+            traceback.print_exc()
+            yield _sse('error', {'error': str(e)})
+        finally:
+            audio.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status and stage progress of an upload job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, **job}), 200
+
+
 @app.route('/api/add-to-calendar', methods=['POST'])
 def add_to_calendar():
     """Add deadlines to Google Calendar"""
@@ -43,7 +141,7 @@ def add_to_calendar():
         if not deadlines:
             return jsonify({'error': 'No deadlines provided'}), 400
         
-        result = add_reminders_to_calendar(deadlines)
+        result = add_reminders_to_calendar(deadlines, meeting_id=data.get('meeting_id'))
         return jsonify(result), 200
     
     except Exception as e:
@@ -59,7 +157,23 @@ def health_check():
     return jsonify({'status': 'ok'}), 200
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Pipeline cache hit/miss counters"""
+    return jsonify(cache_stats()), 200
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Per-stage latency, size and token histograms in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
+    # With the reloader, the parent only watches files; workers belong in
+    # the child that serves requests.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_workers()
     app.run(debug=True, port=5000)
 
 
@@ -72,3 +186,13 @@ def handle_audio_upload(uploaded_file):
     if not uploaded_file:
         raise ValueError('No audio file provided')
     return process_meeting(uploaded_file)
+
+
+def handle_audio_upload_stream(uploaded_file):
+    """Streaming counterpart of `handle_audio_upload` for Streamlit.
+    Yields the (event, data) tuples from `process_meeting_stream`; the
+    final "done" event carries the same result dict as `process_meeting`.
+    """
+    if not uploaded_file:
+        raise ValueError('No audio file provided')
+    return process_meeting_stream(uploaded_file)
@@ -0,0 +1,185 @@
+# backend/metrics.py
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+# Fraction of large-payload debug dumps that are printed, and their size cap
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+LOG_MAX_CHARS = int(os.getenv("LOG_MAX_CHARS", "500"))
+
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+BYTES_BUCKETS = tuple(10 ** exponent for exponent in range(3, 10))  # 1 KB .. 1 GB
+TOKEN_BUCKETS = (100, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000, 250000)
+
+
+def _label_text(labelnames, labels, extra=None):
+    pairs = [(name, labels[i]) for i, name in enumerate(labelnames)]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels, Prometheus style."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, ('le', repr(float(bound))))} {count}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, ('le', '+Inf'))} {state[-1]}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+REGISTRY = []
+
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+STAGE_SECONDS = _register(Histogram(
+    "meeting_stage_duration_seconds", "Wall time of a pipeline stage.", DURATION_BUCKETS, ("stage",)
+))
+STAGE_BYTES = _register(Histogram(
+    "meeting_stage_bytes", "Bytes handled by a pipeline stage.", BYTES_BUCKETS, ("stage",)
+))
+STAGE_TOKENS = _register(Histogram(
+    "meeting_stage_tokens", "Tokens sent to / produced by a pipeline stage.", TOKEN_BUCKETS, ("stage", "direction")
+))
+STAGE_ERRORS = _register(Counter(
+    "meeting_stage_errors_total", "Pipeline stages that raised.", ("stage",)
+))
+CACHE_LOOKUPS = _register(Counter(
+    "cache_lookups_total", "Result cache lookups by stage and outcome.", ("stage", "result")
+))
+OPENAI_CALLS = _register(Counter(
+    "openai_calls_total", "OpenAI API attempts by outcome (ok, retry, failed).", ("outcome",)
+))
+ROUTING_DECISIONS = _register(Counter(
+    "model_routing_decisions_total", "Models chosen per meeting by the routing policy.",
+    ("mode", "summary_model", "deadlines_model")
+))
+MODEL_CALL_SECONDS = _register(Histogram(
+    "model_call_duration_seconds", "Latency of routed chat calls by task and model.", DURATION_BUCKETS,
+    ("task", "model", "outcome")
+))
+
+
+class StageRecord:
+    """Sizes a stage reports about itself inside stage_timer()."""
+
+    def __init__(self):
+        self.bytes = None
+        self.tokens_in = None
+        self.tokens_out = None
+
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Time a pipeline stage and record its sizes:
+
+        with stage_timer("summary") as record:
+            ...
+            record.tokens_in = count_tokens(transcript)
+
+    Duration is always recorded; bytes/tokens only if the block set them.
+    """
+    record = StageRecord()
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+        if record.bytes is not None:
+            STAGE_BYTES.observe(record.bytes, stage=stage)
+        if record.tokens_in is not None:
+            STAGE_TOKENS.observe(record.tokens_in, stage=stage, direction="in")
+        if record.tokens_out is not None:
+            STAGE_TOKENS.observe(record.tokens_out, stage=stage, direction="out")
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def truncate(value, limit=LOG_MAX_CHARS) -> str:
+    """String form of value cut to `limit` characters, noting the full length."""
+    text = str(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text)} chars]"
+
+
+def log_payload(label, value):
+    """Print a large debug payload for a sample of calls, truncated."""
+    if LOG_SAMPLE_RATE >= 1 or random.random() < LOG_SAMPLE_RATE:
+        print(f"DEBUG: {label}: {truncate(value)}")
@@ -0,0 +1,117 @@
+# backend/migrate_transcripts.py
+"""
+Move inline transcripts above TRANSCRIPT_INLINE_BYTES out of existing
+meeting documents into compressed storage, in bulk batches.
+
+Each batch inserts the compressed copies with one insert_many and swaps the
+meeting documents over with one bulk_write. A meeting is only updated while
+it still holds an inline transcript, so the tool is safe to re-run and to run
+against a live database. Transcripts small enough to stay inline get
+transcript_size recorded, so later runs skip them.
+
+Usage:
+    python -m backend.migrate_transcripts --batch-size 200
+    python -m backend.migrate_transcripts --dry-run
+"""
+import argparse
+import time
+from bson.binary import Binary
+from pymongo import UpdateOne
+from .database import (
+    meetings_collection, transcripts_collection, transcripts_bucket,
+    TRANSCRIPT_INLINE_BYTES, TRANSCRIPT_GRIDFS_BYTES, TRANSCRIPT_CODEC, _compress,
+)
+
+
+def _pending_query(last_id=None):
+    query = {
+        'transcript': {'$type': 'string'},
+        '$or': [
+            {'transcript_size': {'$exists': False}},
+            {'transcript_size': {'$gt': TRANSCRIPT_INLINE_BYTES}},
+        ]
+    }
+    if last_id is not None:
+        query['_id'] = {'$gt': last_id}
+    return query
+
+
+def migrate_batch(meetings, dry_run=False) -> dict:
+    """Offload the large transcripts in one batch of meeting documents."""
+    counts = {'offloaded': 0, 'inline': 0, 'bytes_before': 0, 'bytes_after': 0}
+    blobs, refs, updates = [], [], []
+    for meeting in meetings:
+        transcript = meeting['transcript']
+        size = len(transcript.encode('utf-8'))
+        match = {'_id': meeting['_id'], 'transcript': {'$exists': True}}
+        if size <= TRANSCRIPT_INLINE_BYTES:
+            counts['inline'] += 1
+            updates.append(UpdateOne(match, {'$set': {'transcript_size': size}}))
+            continue
+
+        data = _compress(transcript)
+        counts['offloaded'] += 1
+        counts['bytes_before'] += size
+        counts['bytes_after'] += len(data)
+        if dry_run:
+            continue
+        if len(data) > TRANSCRIPT_GRIDFS_BYTES:
+            ref = {'store': 'gridfs', 'id': transcripts_bucket().upload_from_stream('transcript', data)}
+        else:
+            ref = {'store': 'collection'}
+            blobs.append({'data': Binary(data)})
+        ref.update(codec=TRANSCRIPT_CODEC, compressed_size=len(data))
+        refs.append((match, ref, size))
+
+    if dry_run:
+        return counts
+
+    if blobs:
+        inserted = iter(transcripts_collection.insert_many(blobs, ordered=True).inserted_ids)
+        for _, ref, _ in refs:
+            if ref['store'] == 'collection':
+                ref['id'] = next(inserted)
+    for match, ref, size in refs:
+        updates.append(UpdateOne(match, {
+            '$set': {'transcript_ref': ref, 'transcript_size': size},
+            '$unset': {'transcript': ''}
+        }))
+    if updates:
+        meetings_collection.bulk_write(updates, ordered=False)
+    return counts
+
+
+def migrate(batch_size=200, dry_run=False) -> dict:
+    totals = {'offloaded': 0, 'inline': 0, 'bytes_before': 0, 'bytes_after': 0}
+    last_id = None
+    started = time.perf_counter()
+    while True:
+        meetings = list(meetings_collection.find(_pending_query(last_id), {'transcript': 1})
+                        .sort('_id', 1)
+                        .limit(batch_size))
+        if not meetings:
+            break
+        last_id = meetings[-1]['_id']
+        counts = migrate_batch(meetings, dry_run)
+        for key, value in counts.items():
+            totals[key] += value
+        print(f"✅ {totals['offloaded']} offloaded, {totals['inline']} left inline "
+              f"({time.perf_counter() - started:.1f}s)")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="report what would move without writing")
+    args = parser.parse_args()
+
+    totals = migrate(args.batch_size, args.dry_run)
+    ratio = totals['bytes_after'] / totals['bytes_before'] if totals['bytes_before'] else 0
+    print(f"{'Would offload' if args.dry_run else 'Offloaded'} {totals['offloaded']} transcripts: "
+          f"{totals['bytes_before'] / 1e6:.1f} MB -> {totals['bytes_after'] / 1e6:.1f} MB ({ratio:.0%}), "
+          f"codec {TRANSCRIPT_CODEC}")
+
+
+if __name__ == "__main__":
+    main()
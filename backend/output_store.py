@@ -0,0 +1,183 @@
+# backend/output_store.py
+import os
+import gzip
+import time
+import queue
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from .metrics import stage_timer
+
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", "outputs")
+# Store artifacts gzip-compressed (*.txt.gz)
+OUTPUT_COMPRESS = os.getenv("OUTPUT_COMPRESS", "false").lower() in ("1", "true", "yes")
+# Delete meeting directories older than this (0 = keep forever)
+OUTPUT_RETENTION_DAYS = float(os.getenv("OUTPUT_RETENTION_DAYS", "30"))
+# Delete the oldest meeting directories once the store exceeds this (0 = no cap)
+OUTPUT_MAX_BYTES = int(os.getenv("OUTPUT_MAX_BYTES", "0"))
+# Seconds between retention sweeps on the writer thread
+OUTPUT_CLEANUP_INTERVAL = float(os.getenv("OUTPUT_CLEANUP_INTERVAL", "3600"))
+# Pending writes before submitters block
+OUTPUT_QUEUE_MAX = int(os.getenv("OUTPUT_QUEUE_MAX", "256"))
+
+# Leftover temp files from interrupted writes are removed after this long
+_TEMP_MAX_AGE = 3600
+
+
+def output_path(meeting_id, kind, content, folder=OUTPUT_DIR, compress=OUTPUT_COMPRESS) -> str:
+    """
+    Content-addressed path of an artifact: outputs/<meeting_id>/<kind>-<sha256 prefix>.txt[.gz].
+    The same content always maps to the same file, so a rewrite is a no-op.
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    name = f"{kind}-{digest}.txt" + (".gz" if compress else "")
+    return os.path.join(folder, str(meeting_id), name)
+
+
+def _write_atomic(path, content):
+    """Write via a temp file in the target directory and rename into place."""
+    if os.path.exists(path):
+        return 0
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    data = content.encode("utf-8")
+    if path.endswith(".gz"):
+        data = gzip.compress(data)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return len(data)
+
+
+def read_output(path) -> str:
+    """Read an artifact written by the store, decompressing if needed."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def cleanup_outputs(folder=OUTPUT_DIR, retention_days=OUTPUT_RETENTION_DAYS, max_bytes=OUTPUT_MAX_BYTES) -> int:
+    """
+    Apply retention to the store: drop meeting directories older than
+    retention_days, then the oldest ones until the total is under max_bytes,
+    plus stale temp files. Returns the number of directories removed.
+    """
+    if not os.path.isdir(folder):
+        return 0
+    now = time.time()
+    meetings = []  # (mtime, size, path)
+    for entry in os.scandir(folder):
+        if not entry.is_dir():
+            continue
+        size, newest = 0, entry.stat().st_mtime
+        for file in os.scandir(entry.path):
+            stat = file.stat()
+            if file.name.endswith(".tmp") and now - stat.st_mtime > _TEMP_MAX_AGE:
+                os.remove(file.path)
+                continue
+            size += stat.st_size
+            newest = max(newest, stat.st_mtime)
+        meetings.append((newest, size, entry.path))
+
+    removed = 0
+    meetings.sort()
+    total = sum(size for _, size, _ in meetings)
+    for newest, size, path in meetings:
+        expired = retention_days and now - newest > retention_days * 86400
+        over_cap = max_bytes and total > max_bytes
+        if not (expired or over_cap):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+class OutputWriter:
+    """Background thread that writes queued artifacts and sweeps retention."""
+
+    def __init__(self, maxsize=OUTPUT_QUEUE_MAX, cleanup_interval=OUTPUT_CLEANUP_INTERVAL):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._cleanup_interval = cleanup_interval
+        self._last_cleanup = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, path, content):
+        """Queue one write; blocks only when OUTPUT_QUEUE_MAX writes are pending."""
+        self._ensure_started()
+        self._queue.put((path, content))
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until every queued write has finished. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                path, content = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._maybe_cleanup()
+                continue
+            try:
+                with stage_timer("file_write") as record:
+                    record.bytes = _write_atomic(path, content)
+            except Exception as e:
+                print(f"❌ Failed to write {path}: {e}")
+            finally:
+                self._queue.task_done()
+            self._maybe_cleanup()
+
+    def _maybe_cleanup(self):
+        if not (OUTPUT_RETENTION_DAYS or OUTPUT_MAX_BYTES):
+            return
+        if time.monotonic() - self._last_cleanup < self._cleanup_interval:
+            return
+        self._last_cleanup = time.monotonic()
+        try:
+            removed = cleanup_outputs()
+            if removed:
+                print(f"✅ Removed {removed} expired output directories")
+        except Exception as e:
+            print(f"❌ Output cleanup failed: {e}")
+
+
+writer = OutputWriter()
+# Give pending writes a chance to land on interpreter shutdown
+atexit.register(writer.flush, 10)
+
+
+def save_meeting_outputs(meeting_id, artifacts: dict) -> dict:
+    """
+    Queue per-meeting artifacts ({"transcript": text, ...}) for writing and
+    return their paths right away. Files appear once the writer gets to them.
+    """
+    paths = {}
+    for kind, content in artifacts.items():
+        path = output_path(meeting_id, kind, content or "")
+        writer.submit(path, content or "")
+        paths[kind] = path
+    return paths
@@ -0,0 +1,111 @@
+# backend/pipeline.py
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Shared, bounded pool for post-transcription stages (summary, deadlines, ...)
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "8"))
+_executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline")
+
+# Sentinel meaning "no fallback: re-raise the stage error"
+RAISE = object()
+
+
+def _timed(fn, args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
+
+
+def submit_stage(fn, *args):
+    """Run a single stage in the background on the shared pool; returns a Future."""
+    return _executor.submit(fn, *args)
+
+
+def run_stages(stages: dict) -> tuple:
+    """
+    Run independent stages concurrently and join their results.
+
+    Args:
+        stages: mapping of stage name -> dict with keys
+            fn: callable to run
+            args: tuple of positional arguments (optional)
+            timeout: seconds to wait for this stage (optional, None = no limit)
+            fallback: value returned if the stage fails or times out
+                      (optional, default RAISE re-raises the error)
+
+    Returns:
+        (results, timings) where both are dicts keyed by stage name.
+        Timings are in seconds; a stage that failed or timed out records
+        the time spent waiting for it.
+    """
+    started = time.perf_counter()
+    futures = {
+        name: _executor.submit(_timed, spec["fn"], spec.get("args", ()))
+        for name, spec in stages.items()
+    }
+
+    results, timings = {}, {}
+    for name, future in futures.items():
+        spec = stages[name]
+        timeout = spec.get("timeout")
+        fallback = spec.get("fallback", RAISE)
+        remaining = None
+        if timeout is not None:
+            remaining = max(0.0, timeout - (time.perf_counter() - started))
+        try:
+            results[name], timings[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            timings[name] = time.perf_counter() - started
+            print(f"❌ Stage '{name}' timed out after {timeout}s")
+            if fallback is RAISE:
+                raise RuntimeError(f"{name} timed out after {timeout}s")
+            results[name] = fallback
+        except Exception as e:
+            timings[name] = time.perf_counter() - started
+            print(f"❌ Stage '{name}' failed: {e}")
+            if fallback is RAISE:
+                raise
+            results[name] = fallback
+
+    return results, timings
+
+
+async def _run_stage_async(name, spec):
+    started = time.perf_counter()
+    timeout = spec.get("timeout")
+    fallback = spec.get("fallback", RAISE)
+    try:
+        value = await asyncio.wait_for(spec["fn"](*spec.get("args", ())), timeout)
+    except asyncio.TimeoutError:
+        print(f"❌ Stage '{name}' timed out after {timeout}s")
+        if fallback is RAISE:
+            raise RuntimeError(f"{name} timed out after {timeout}s")
+        value = fallback
+    except Exception as e:
+        print(f"❌ Stage '{name}' failed: {e}")
+        if fallback is RAISE:
+            raise
+        value = fallback
+    return value, time.perf_counter() - started
+
+
+async def run_stages_async(stages: dict) -> tuple:
+    """
+    run_stages for coroutine functions: the stages run concurrently as tasks
+    on the running event loop. `stages` and the return value are as for
+    run_stages.
+    """
+    names = list(stages)
+    tasks = [asyncio.ensure_future(_run_stage_async(name, stages[name])) for name in names]
+    try:
+        outcomes = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    results = {name: value for name, (value, _) in zip(names, outcomes)}
+    timings = {name: elapsed for name, (_, elapsed) in zip(names, outcomes)}
+    return results, timings
@@ -1,42 +1,423 @@
 # backend/routes.py
-from .services import transcribe_audio, generate_summary, extract_deadlines_with_gpt
-from .utils import save_text, get_calendar_service, add_calendar_reminder
-from .database import save_meeting_summary, get_all_meetings, get_meeting_by_id, search_meetings, delete_meeting
-import io
-
-def process_meeting(audio_file) -> dict:
-    """Process the uploaded meeting audio and return results"""
-    audio_bytes = io.BytesIO(audio_file.read())
-    audio_bytes.name = audio_file.name
-    filename = audio_file.name
-
-    transcript = transcribe_audio(audio_bytes)
-    summary = generate_summary(transcript)
-    
-    # Extract deadlines using GPT (uses db_config.client internally)
-    deadlines = extract_deadlines_with_gpt(transcript)
+from .services import (
+    transcribe_audio, generate_summary, stream_summary, extract_deadlines_with_gpt,
+    summarize_with_deadlines, prepare_transcript, route_meeting, WHISPER_MODEL,
+    TRANSCRIBE_VERSION, SUMMARY_PROMPT_VERSION, DEADLINES_PROMPT_VERSION, COMBINED_PROMPT_VERSION,
+)
+from .async_services import (
+    transcribe_audio_async, generate_summary_async, extract_deadlines_async, summarize_with_deadlines_async,
+)
+from .routing import record_outcome
+from .async_database import save_meeting_summary_async
+from .utils import get_calendar_service, add_calendar_reminders_batch
+from .database import save_meeting_summary, get_meeting_created_at
+from .calendar_sync import sync_meeting_deadlines
+from .pipeline import run_stages, run_stages_async, submit_stage
+from .cache import cached_call, cached_call_async, get_cached, set_cached
+from .uploads import SpooledUpload, spool_upload
+from .output_store import save_meeting_outputs
+from .chunking import count_tokens
+from .metrics import stage_timer
+import os
+import json
+import queue
+import time
+
+# Per-stage timeouts (seconds) for the concurrent post-transcription stages
+SUMMARY_TIMEOUT = float(os.getenv("SUMMARY_TIMEOUT", "120"))
+DEADLINES_TIMEOUT = float(os.getenv("DEADLINES_TIMEOUT", "120"))
+
+def _with_stage(on_stage, stage, fn):
+    """Wrap fn so that on_stage(stage, 'running'/'done'/'failed') is reported."""
+    def run(*args):
+        on_stage(stage, "running")
+        try:
+            value = fn(*args)
+        except Exception:
+            on_stage(stage, "failed")
+            raise
+        on_stage(stage, "done")
+        return value
+    return run
+
+
+def _no_stage(stage, state):
+    pass
+
+
+def _output_tokens(value) -> int:
+    return count_tokens(value if isinstance(value, str) else json.dumps(value))
+
+
+def _timed(stage, fn, tokens_in):
+    """Wrap fn so its duration and token counts are recorded under `stage`."""
+    def run(*args):
+        with stage_timer(stage) as record:
+            value = fn(*args)
+            record.tokens_in = tokens_in
+            record.tokens_out = _output_tokens(value)
+        return value
+    return run
+
+
+def read_upload(stream, filename) -> SpooledUpload:
+    """Spool an incoming upload, recording the upload_read stage."""
+    with stage_timer("upload_read") as record:
+        audio = spool_upload(stream, filename)
+        record.bytes = audio.size
+    return audio
 
+
+def _transcribe(audio_file, on_stage) -> tuple:
+    """
+    Transcribe (or fetch from cache) an upload.
+    Returns (filename, audio hash, transcript, transcript tokens).
+    """
+    if isinstance(audio_file, SpooledUpload):
+        audio = audio_file
+    else:
+        audio = read_upload(audio_file, audio_file.name)
+    try:
+        with stage_timer("transcription") as record:
+            transcript = _with_stage(on_stage, "transcribing", cached_call)(
+                "transcript", (audio.sha256, WHISPER_MODEL, TRANSCRIBE_VERSION),
+                transcribe_audio, audio
+            )
+            record.bytes = audio.size
+            record.tokens_out = count_tokens(transcript)
+    finally:
+        # The audio is not needed past transcription; drop our own spool early
+        if audio is not audio_file:
+            audio.close()
+    return audio.name, audio.sha256, transcript, record.tokens_out
+
+
+def _save_results(filename, audio_hash, transcript, summary, deadlines, on_stage) -> tuple:
+    """Persist a processed meeting. Returns (meeting_id, output file paths)."""
+    on_stage("saving", "running")
     # Save to MongoDB
-    meeting_id = save_meeting_summary(filename, transcript, summary, deadlines)
+    with stage_timer("db_save") as record:
+        meeting_id = save_meeting_summary(filename, transcript, summary, deadlines, audio_hash)
+        record.bytes = len(transcript.encode("utf-8")) + len(summary.encode("utf-8"))
+
+    # Save outputs for reference, per meeting, on the background writer
+    files = save_meeting_outputs(meeting_id or audio_hash, {"transcript": transcript, "summary": summary})
+    # Embed for semantic search in the background; numpy loads on first save
+    from .semantic_search import index_meeting_async
+    index_meeting_async(meeting_id, transcript, summary)
+    on_stage("saving", "done")
+    return meeting_id, files
+
+
+def _analysis_stages(decision, audio_hash, transcript, prepared, on_stage, asynchronous=False) -> dict:
+    """
+    Stage specs for the routed summary and deadline calls: two concurrent
+    stages, or one "analysis" stage (reported as both summarizing and
+    extracting) when the decision merged them into a single call. The
+    calls reuse the segments in `prepared` (see prepare_transcript).
+    """
+    transcript_tokens = prepared["tokens"]
+    if asynchronous:
+        with_stage, timed, cached = _with_stage_async, _timed_async, cached_call_async
+        summarize, extract, combined = generate_summary_async, extract_deadlines_async, summarize_with_deadlines_async
+    else:
+        with_stage, timed, cached = _with_stage, _timed, cached_call
+        summarize, extract, combined = generate_summary, extract_deadlines_with_gpt, summarize_with_deadlines
+
+    if decision["mode"] == "merged":
+        model = decision["model"]
+        return {
+            "analysis": {
+                "fn": with_stage(on_stage, "summarizing", with_stage(
+                    on_stage, "extracting", timed("analysis", cached, transcript_tokens))),
+                "args": ("analysis", (audio_hash, model, COMBINED_PROMPT_VERSION), combined, transcript, model),
+                "timeout": max(SUMMARY_TIMEOUT, DEADLINES_TIMEOUT),
+            },
+        }
+
+    # A failed summary fails the request; deadlines fall back to an empty list
+    summary_model, deadlines_model = decision["summary_model"], decision["deadlines_model"]
+    return {
+        "summary": {
+            "fn": with_stage(on_stage, "summarizing", timed("summary", cached, transcript_tokens)),
+            "args": ("summary", (audio_hash, summary_model, SUMMARY_PROMPT_VERSION),
+                     summarize, transcript, summary_model, prepared["summary_segments"]),
+            "timeout": SUMMARY_TIMEOUT,
+        },
+        "deadlines": {
+            "fn": with_stage(on_stage, "extracting", timed("extraction", cached, transcript_tokens)),
+            "args": ("deadlines", (audio_hash, deadlines_model, DEADLINES_PROMPT_VERSION),
+                     extract, transcript, deadlines_model, prepared["deadline_segments"]),
+            "timeout": DEADLINES_TIMEOUT,
+            "fallback": [],
+        },
+    }
+
+
+def _merged_results(results, stage_timings) -> tuple:
+    """Reshape the "analysis" stage into the summary/deadlines results and timings."""
+    analysis, elapsed = results["analysis"], stage_timings["analysis"]
+    return ({"summary": analysis["summary"], "deadlines": analysis["deadlines"]},
+            {"summary": elapsed, "deadlines": elapsed, "analysis": elapsed})
+
+
+def _separate(decision) -> dict:
+    print("❌ Combined summary/deadlines call failed, falling back to separate calls")
+    return dict(decision, mode="separate", model=None)
+
+
+def _run_analysis(decision, audio_hash, transcript, prepared, on_stage) -> tuple:
+    """Run the routed calls; a failed merged call is retried as separate calls."""
+    if decision["mode"] == "merged":
+        try:
+            return _merged_results(*run_stages(
+                _analysis_stages(decision, audio_hash, transcript, prepared, on_stage)
+            ))
+        except Exception:
+            decision = _separate(decision)
+    return run_stages(_analysis_stages(decision, audio_hash, transcript, prepared, on_stage))
+
+
+async def _run_analysis_async(decision, audio_hash, transcript, prepared, on_stage) -> tuple:
+    """_run_analysis on the event loop."""
+    if decision["mode"] == "merged":
+        try:
+            return _merged_results(*await run_stages_async(
+                _analysis_stages(decision, audio_hash, transcript, prepared, on_stage, asynchronous=True)
+            ))
+        except Exception:
+            decision = _separate(decision)
+    return await run_stages_async(
+        _analysis_stages(decision, audio_hash, transcript, prepared, on_stage, asynchronous=True)
+    )
 
-    # Save outputs for reference
-    transcript_path = save_text("transcript.txt", transcript)
-    summary_path = save_text("summary.txt", summary)
+
+def analyze_meeting(audio_file, on_stage=None) -> dict:
+    """Transcribe, summarize and extract deadlines without saving anything.
+
+    Returns filename, audio_sha256, transcript, summary, deadlines and
+    timings. `on_stage` is called as in process_meeting.
+    """
+    on_stage = on_stage or _no_stage
+
+    started = time.perf_counter()
+    filename, audio_hash, transcript, transcript_tokens = _transcribe(audio_file, on_stage)
+    timings = {"transcription": time.perf_counter() - started}
+
+    # Summary and deadline extraction only depend on the transcript, so run
+    # them concurrently, on the models routed for this transcript.
+    prepared = prepare_transcript(transcript, transcript_tokens)
+    decision = route_meeting(prepared)
+    results, stage_timings = _run_analysis(decision, audio_hash, transcript, prepared, on_stage)
+    timings.update(stage_timings)
+    record_outcome(decision, stage_timings)
+    timings["total"] = time.perf_counter() - started
+
+    return {
+        "filename": filename,
+        "audio_sha256": audio_hash,
+        "transcript": transcript,
+        "summary": results["summary"],
+        "deadlines": results["deadlines"],
+        "timings": timings
+    }
+
+
+def process_meeting(audio_file, on_stage=None) -> dict:
+    """Process the uploaded meeting audio and return results.
+
+    `on_stage(stage, state)` is called as each stage (transcribing,
+    summarizing, extracting, saving) starts and finishes.
+    """
+    on_stage = on_stage or _no_stage
+
+    started = time.perf_counter()
+    analysis = analyze_meeting(audio_file, on_stage)
+    transcript, summary, deadlines = analysis["transcript"], analysis["summary"], analysis["deadlines"]
+
+    meeting_id, files = _save_results(
+        analysis["filename"], analysis["audio_sha256"], transcript, summary, deadlines, on_stage
+    )
+    timings = dict(analysis["timings"], total=time.perf_counter() - started)
 
     return {
         "meeting_id": meeting_id,
         "transcript": transcript,
         "summary": summary,
         "deadlines": deadlines,
-        "files": {
-            "transcript": transcript_path,
-            "summary": summary_path
-        }
+        "files": files,
+        "timings": timings
+    }
+
+
+def _with_stage_async(on_stage, stage, fn):
+    """_with_stage for a coroutine function."""
+    async def run(*args):
+        on_stage(stage, "running")
+        try:
+            value = await fn(*args)
+        except Exception:
+            on_stage(stage, "failed")
+            raise
+        on_stage(stage, "done")
+        return value
+    return run
+
+
+def _timed_async(stage, fn, tokens_in):
+    """_timed for a coroutine function."""
+    async def run(*args):
+        with stage_timer(stage) as record:
+            value = await fn(*args)
+            record.tokens_in = tokens_in
+            record.tokens_out = _output_tokens(value)
+        return value
+    return run
+
+
+async def process_meeting_async(audio, on_stage=None) -> dict:
+    """
+    process_meeting for the ASGI server: the same stages, cache keys and
+    result, with model calls on the async OpenAI client and the meeting
+    saved through Motor. `audio` is a SpooledUpload.
+    """
+    on_stage = on_stage or _no_stage
+
+    started = time.perf_counter()
+    with stage_timer("transcription") as record:
+        transcript = await _with_stage_async(on_stage, "transcribing", cached_call_async)(
+            "transcript", (audio.sha256, WHISPER_MODEL, TRANSCRIBE_VERSION),
+            transcribe_audio_async, audio
+        )
+        record.bytes = audio.size
+        record.tokens_out = count_tokens(transcript)
+    transcript_tokens = record.tokens_out
+    timings = {"transcription": time.perf_counter() - started}
+
+    prepared = prepare_transcript(transcript, transcript_tokens)
+    decision = route_meeting(prepared)
+    results, stage_timings = await _run_analysis_async(decision, audio.sha256, transcript, prepared, on_stage)
+    timings.update(stage_timings)
+    record_outcome(decision, stage_timings)
+    summary, deadlines = results["summary"], results["deadlines"]
+
+    on_stage("saving", "running")
+    with stage_timer("db_save") as record:
+        meeting_id = await save_meeting_summary_async(audio.name, transcript, summary, deadlines, audio.sha256)
+        record.bytes = len(transcript.encode("utf-8")) + len(summary.encode("utf-8"))
+    files = save_meeting_outputs(meeting_id or audio.sha256, {"transcript": transcript, "summary": summary})
+    from .semantic_search import index_meeting_async
+    index_meeting_async(meeting_id, transcript, summary)
+    on_stage("saving", "done")
+    timings["total"] = time.perf_counter() - started
+
+    return {
+        "meeting_id": meeting_id,
+        "transcript": transcript,
+        "summary": summary,
+        "deadlines": deadlines,
+        "files": files,
+        "timings": timings
     }
 
 
-def add_reminders_to_calendar(deadlines) -> dict:
-    """Add extracted deadlines to Google Calendar"""
+def _drain(events):
+    while True:
+        try:
+            yield events.get_nowait()
+        except queue.Empty:
+            return
+
+
+def process_meeting_stream(audio_file):
+    """
+    Streaming variant of process_meeting.
+
+    Yields (event, data) tuples as the pipeline progresses:
+        ("stage", {"stage": ..., "state": ...})  stage started/finished
+        ("token", {"text": ...})                 summary text as it is generated
+        ("deadlines", [...])                     extracted deadlines
+        ("done", {...})                          final result (same keys as process_meeting)
+    Errors propagate to the caller after the events already produced.
+    """
+    events = queue.Queue()
+
+    def on_stage(stage, state):
+        events.put(("stage", {"stage": stage, "state": state}))
+
+    started = time.perf_counter()
+    on_stage("transcribing", "running")
+    yield from _drain(events)
+    filename, audio_hash, transcript, transcript_tokens = _transcribe(audio_file, _no_stage)
+    on_stage("transcribing", "done")
+    timings = {"transcription": time.perf_counter() - started}
+    yield from _drain(events)
+
+    # The summary streams token by token, so it is never merged with deadlines
+    prepared = prepare_transcript(transcript, transcript_tokens)
+    decision = route_meeting(prepared, merge=False)
+    summary_model, deadlines_model = decision["summary_model"], decision["deadlines_model"]
+
+    # Deadlines run in the background while the summary streams
+    deadlines_started = time.perf_counter()
+    deadlines_future = submit_stage(
+        _with_stage(on_stage, "extracting", _timed("extraction", cached_call, transcript_tokens)),
+        "deadlines", (audio_hash, deadlines_model, DEADLINES_PROMPT_VERSION),
+        extract_deadlines_with_gpt, transcript, deadlines_model, prepared["deadline_segments"]
+    )
+
+    summary_started = time.perf_counter()
+    summary_key = (audio_hash, summary_model, SUMMARY_PROMPT_VERSION)
+    on_stage("summarizing", "running")
+    with stage_timer("summary") as record:
+        hit, summary = get_cached("summary", summary_key)
+        if hit:
+            yield from _drain(events)
+            yield "token", {"text": summary}
+        else:
+            parts = []
+            for delta in stream_summary(transcript, summary_model, prepared["summary_segments"]):
+                parts.append(delta)
+                yield from _drain(events)
+                yield "token", {"text": delta}
+            summary = "".join(parts).strip()
+            set_cached("summary", summary_key, summary)
+        record.tokens_in = transcript_tokens
+        record.tokens_out = count_tokens(summary)
+    on_stage("summarizing", "done")
+    timings["summary"] = time.perf_counter() - summary_started
+    yield from _drain(events)
+
+    remaining = max(0.0, DEADLINES_TIMEOUT - (time.perf_counter() - deadlines_started))
+    try:
+        deadlines = deadlines_future.result(timeout=remaining)
+    except Exception as e:
+        print(f"❌ Stage 'deadlines' failed: {e}")
+        deadlines = []
+    timings["deadlines"] = time.perf_counter() - deadlines_started
+    record_outcome(decision, timings)
+    yield from _drain(events)
+    yield "deadlines", deadlines
+
+    meeting_id, files = _save_results(filename, audio_hash, transcript, summary, deadlines, on_stage)
+    timings["total"] = time.perf_counter() - started
+    yield from _drain(events)
+    yield "done", {
+        "meeting_id": meeting_id,
+        "transcript": transcript,
+        "summary": summary,
+        "deadlines": deadlines,
+        "files": files,
+        "timings": timings
+    }
+
+
+def add_reminders_to_calendar(deadlines, meeting_id=None) -> dict:
+    """Add extracted deadlines to Google Calendar.
+
+    With a meeting_id the deadlines are synced idempotently: repeated calls
+    only insert new, patch changed and delete removed deadlines.
+    """
     try:
         service = get_calendar_service()
         
@@ -46,19 +427,29 @@ def add_reminders_to_calendar(deadlines) -> dict:
                 'message': 'Failed to authenticate with Google Calendar.'
             }
         
+        if meeting_id:
+            reference = get_meeting_created_at(meeting_id)
+            report = sync_meeting_deadlines(service, meeting_id, deadlines, reference)
+            for item in report['failed']:
+                print(f"❌ Failed to sync: {item['title']} ({item['error']})")
+            return {
+                'success': True,
+                'added': report['inserted'],
+                'updated': report['updated'],
+                'deleted': report['deleted'],
+                'skipped': report['skipped'],
+                'failed': [item['title'] for item in report['failed']],
+                'message': (
+                    f"Added {len(report['inserted'])}, updated {len(report['updated'])}, "
+                    f"removed {len(report['deleted'])} reminders "
+                    f"({len(report['skipped'])} already up to date)"
+                )
+            }
+        
         added_events = []
         failed_events = []
         
-        for deadline in deadlines:
-            print(f"Processing deadline: {deadline}")
-            
-            event_id = add_calendar_reminder(
-                service,
-                event_title=deadline.get('title'),
-                deadline_date=deadline.get('date'),
-                description=deadline.get('description', '')
-            )
-            
+        for deadline, event_id, error in add_calendar_reminders_batch(service, deadlines):
             if event_id:
                 added_events.append({
                     'title': deadline.get('title'),
@@ -67,7 +458,7 @@ def add_reminders_to_calendar(deadlines) -> dict:
                 print(f"✅ Successfully added: {deadline.get('title')}")
             else:
                 failed_events.append(deadline.get('title'))
-                print(f"❌ Failed to add: {deadline.get('title')}")
+                print(f"❌ Failed to add: {deadline.get('title')} ({error})")
         
         return {
             'success': True,
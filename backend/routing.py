@@ -0,0 +1,335 @@
+# backend/routing.py
+"""
+Per-meeting model routing for the summary and deadline calls.
+
+Once a transcript is available, plan_meeting() picks the chat model for each
+call from a few cheap features: transcript tokens, the number of date
+candidates the rule-based pre-filter found, and the size of the excerpt that
+would be sent for deadline extraction. Long transcripts and date-heavy
+excerpts go to ROUTING_LARGE_MODEL, everything else to ROUTING_SMALL_MODEL.
+The plan is then held to a per-meeting budget (ROUTING_MAX_COST_USD and
+ROUTING_MAX_LATENCY_S): large models are downgraded until the estimate fits.
+When the transcript fits one prompt, a single structured-output call that
+returns both the summary and the deadlines is chosen instead if it is
+estimated to be cheaper and still within the latency budget.
+
+Estimates come from MODEL_CATALOG (prices per 1M tokens, time to first token
+and output tokens/s). Every routed call is timed: its latency feeds the
+model_call_duration_seconds histogram and a per-model correction factor
+(observed / estimated latency) that later estimates use, and calls and
+per-meeting decisions are appended to ROUTING_LOG so the thresholds can be
+tuned from data:
+
+    python -m backend.routing --report
+
+With MODEL_ROUTING=0 every meeting uses the fixed summary and deadline
+models, as before.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from .metrics import ROUTING_DECISIONS, MODEL_CALL_SECONDS
+
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "1") == "1"
+ROUTING_SMALL_MODEL = os.getenv("ROUTING_SMALL_MODEL", "gpt-4o-mini")
+ROUTING_LARGE_MODEL = os.getenv("ROUTING_LARGE_MODEL", "gpt-4o")
+ROUTING_MERGE = os.getenv("ROUTING_MERGE", "1") == "1"
+
+# Budget per meeting for the summary and deadline calls together
+ROUTING_MAX_COST_USD = float(os.getenv("ROUTING_MAX_COST_USD", "0.05"))
+ROUTING_MAX_LATENCY_S = float(os.getenv("ROUTING_MAX_LATENCY_S", "30"))
+
+# Features above which a call goes to the large model
+ROUTING_SUMMARY_LARGE_TOKENS = int(os.getenv("ROUTING_SUMMARY_LARGE_TOKENS", "6000"))
+ROUTING_DEADLINES_LARGE_CANDIDATES = int(os.getenv("ROUTING_DEADLINES_LARGE_CANDIDATES", "5"))
+ROUTING_DEADLINES_LARGE_TOKENS = int(os.getenv("ROUTING_DEADLINES_LARGE_TOKENS", "2000"))
+
+# Output sizes assumed by the estimates
+ROUTING_SUMMARY_OUTPUT_TOKENS = int(os.getenv("ROUTING_SUMMARY_OUTPUT_TOKENS", "400"))
+ROUTING_DEADLINE_OUTPUT_TOKENS = int(os.getenv("ROUTING_DEADLINE_OUTPUT_TOKENS", "40"))  # per date candidate
+PROMPT_OVERHEAD_TOKENS = 200
+
+# JSON-lines log of decisions and calls ("" disables it)
+ROUTING_LOG = os.getenv("ROUTING_LOG", "routing_log.jsonl")
+# Weight of the newest observation in the per-model latency correction
+ROUTING_EWMA_ALPHA = float(os.getenv("ROUTING_EWMA_ALPHA", "0.2"))
+
+# USD per 1M input/output tokens, context window, and latency priors
+MODEL_CATALOG = {
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60, "context": 128000, "ttft": 0.5, "tokens_per_s": 80},
+    "gpt-4o": {"input": 2.50, "output": 10.00, "context": 128000, "ttft": 0.6, "tokens_per_s": 60},
+    "gpt-4-turbo": {"input": 10.00, "output": 30.00, "context": 128000, "ttft": 0.8, "tokens_per_s": 30},
+    "gpt-4": {"input": 30.00, "output": 60.00, "context": 8192, "ttft": 0.8, "tokens_per_s": 25},
+}
+# Extra or overridden entries, e.g. '{"my-model": {"input": 1, "output": 2, ...}}'
+MODEL_CATALOG.update(json.loads(os.getenv("ROUTING_CATALOG_JSON", "{}")))
+_UNKNOWN_MODEL = MODEL_CATALOG["gpt-4o"]
+
+_latency_factor = {}  # model -> EWMA of observed / estimated latency
+_factor_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def _spec(model):
+    return MODEL_CATALOG.get(model, _UNKNOWN_MODEL)
+
+
+def estimate_cost(model, tokens_in, tokens_out) -> float:
+    spec = _spec(model)
+    return (tokens_in * spec["input"] + tokens_out * spec["output"]) / 1_000_000
+
+
+def prior_latency(model, tokens_out) -> float:
+    """Catalog latency of one call, before the observed correction."""
+    spec = _spec(model)
+    return spec["ttft"] + tokens_out / spec["tokens_per_s"]
+
+
+def estimate_latency(model, tokens_out) -> float:
+    with _factor_lock:
+        factor = _latency_factor.get(model, 1.0)
+    return prior_latency(model, tokens_out) * factor
+
+
+def _fits(model, tokens_in, tokens_out) -> bool:
+    return tokens_in + tokens_out <= _spec(model)["context"]
+
+
+def _summary_estimate(model, features) -> tuple:
+    """(cost, latency) of the summary; long transcripts are one map round plus a merge call."""
+    segments = features["summary_segments"]
+    out = ROUTING_SUMMARY_OUTPUT_TOKENS
+    tokens_in = features["transcript_tokens"] + PROMPT_OVERHEAD_TOKENS * segments
+    if segments > 1:
+        tokens_in += segments * out  # the merge prompt reads every partial summary
+        cost = estimate_cost(model, tokens_in, out * (segments + 1))
+        return cost, 2 * estimate_latency(model, out)
+    return estimate_cost(model, tokens_in, out), estimate_latency(model, out)
+
+
+def _deadlines_out(features) -> int:
+    return ROUTING_DEADLINE_OUTPUT_TOKENS * max(1, features["date_candidates"])
+
+
+def _deadlines_estimate(model, features) -> tuple:
+    if not features["excerpt_tokens"]:
+        return 0.0, 0.0  # nothing to extract, no call is made
+    out = _deadlines_out(features)
+    return (estimate_cost(model, features["excerpt_tokens"] + PROMPT_OVERHEAD_TOKENS, out),
+            estimate_latency(model, out))
+
+
+def _merged_estimate(model, features) -> tuple:
+    out = ROUTING_SUMMARY_OUTPUT_TOKENS + _deadlines_out(features)
+    return (estimate_cost(model, features["transcript_tokens"] + PROMPT_OVERHEAD_TOKENS, out),
+            estimate_latency(model, out))
+
+
+def _preferred_models(features) -> tuple:
+    summary = (ROUTING_LARGE_MODEL if features["transcript_tokens"] > ROUTING_SUMMARY_LARGE_TOKENS
+               else ROUTING_SMALL_MODEL)
+    deadlines = (ROUTING_LARGE_MODEL
+                 if features["date_candidates"] >= ROUTING_DEADLINES_LARGE_CANDIDATES
+                 or features["excerpt_tokens"] > ROUTING_DEADLINES_LARGE_TOKENS
+                 else ROUTING_SMALL_MODEL)
+    return summary, deadlines
+
+
+def _separate_plans(features) -> list:
+    """(summary model, deadlines model) pairs, most preferred first, cheapest last."""
+    summary, deadlines = _preferred_models(features)
+    pairs = []
+    for pair in ((summary, deadlines), (summary, ROUTING_SMALL_MODEL),
+                 (ROUTING_SMALL_MODEL, deadlines), (ROUTING_SMALL_MODEL, ROUTING_SMALL_MODEL)):
+        if pair not in pairs:
+            pairs.append(pair)
+    return pairs
+
+
+def _within_budget(cost, latency) -> bool:
+    return cost <= ROUTING_MAX_COST_USD and latency <= ROUTING_MAX_LATENCY_S
+
+
+def plan_meeting(features: dict, summary_model: str, deadlines_model: str, merge=True) -> dict:
+    """
+    Choose models for one meeting.
+
+    `features` has transcript_tokens, excerpt_tokens (0 when deadline
+    extraction would be skipped), date_candidates, summary_segments and
+    segment_tokens (the largest prompt a single call receives).
+    `summary_model` and `deadlines_model` are used unchanged when routing
+    is disabled. Returns a decision dict: mode ("separate" or "merged"),
+    summary_model, deadlines_model, model (the merged call's model or None),
+    estimated cost_usd and latency_s, over_budget and the features.
+    """
+    decision = {"id": uuid.uuid4().hex, "features": dict(features), "model": None}
+    if not MODEL_ROUTING:
+        pairs = [(summary_model, deadlines_model)]
+    else:
+        pairs = [pair for pair in _separate_plans(features)
+                 if all(_fits(model, features["segment_tokens"], ROUTING_SUMMARY_OUTPUT_TOKENS) for model in pair)]
+        pairs = pairs or [(ROUTING_SMALL_MODEL, ROUTING_SMALL_MODEL)]
+
+    for summary, deadlines in pairs:
+        summary_cost, summary_latency = _summary_estimate(summary, features)
+        deadlines_cost, deadlines_latency = _deadlines_estimate(deadlines, features)
+        cost, latency = summary_cost + deadlines_cost, max(summary_latency, deadlines_latency)
+        if _within_budget(cost, latency):
+            break
+    decision.update(mode="separate", summary_model=summary, deadlines_model=deadlines,
+                    cost_usd=cost, latency_s=latency, over_budget=not _within_budget(cost, latency))
+
+    # One call for both only pays off when there are deadlines to extract and
+    # the whole transcript fits a single prompt
+    if (MODEL_ROUTING and ROUTING_MERGE and merge and features["excerpt_tokens"]
+            and features["summary_segments"] == 1):
+        merged = summary if summary == deadlines else ROUTING_LARGE_MODEL
+        out = ROUTING_SUMMARY_OUTPUT_TOKENS + _deadlines_out(features)
+        if _fits(merged, features["transcript_tokens"] + PROMPT_OVERHEAD_TOKENS, out):
+            merged_cost, merged_latency = _merged_estimate(merged, features)
+            if merged_cost < cost and (merged_latency <= ROUTING_MAX_LATENCY_S or decision["over_budget"]):
+                decision.update(mode="merged", model=merged, summary_model=merged, deadlines_model=merged,
+                                cost_usd=merged_cost, latency_s=merged_latency,
+                                over_budget=not _within_budget(merged_cost, merged_latency))
+
+    ROUTING_DECISIONS.inc(mode=decision["mode"], summary_model=decision["summary_model"],
+                          deadlines_model=decision["deadlines_model"])
+    if decision["over_budget"]:
+        print(f"DEBUG: Routing over budget: est ${decision['cost_usd']:.4f}, {decision['latency_s']:.1f}s")
+    return decision
+
+
+def _append_log(record):
+    if not ROUTING_LOG:
+        return
+    line = json.dumps(dict(record, ts=time.time())) + "\n"
+    try:
+        with _log_lock, open(ROUTING_LOG, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        print(f"❌ Could not write routing log: {e}")
+
+
+def record_outcome(decision: dict, timings: dict):
+    """Log a decision with the stage latencies the meeting actually saw."""
+    observed = {stage: round(seconds, 4) for stage, seconds in timings.items()
+                if stage in ("summary", "deadlines", "analysis")}
+    _append_log({"kind": "decision", **decision, "observed_s": observed})
+
+
+class ModelCall:
+    """Sizes a routed call reports about itself inside model_call()."""
+
+    def __init__(self):
+        self.tokens_in = None
+        self.tokens_out = None
+
+
+@contextmanager
+def model_call(task, model):
+    """
+    Time one chat call and record it against `task` and `model`:
+
+        with model_call("summary", model) as call:
+            response = chat_completion(...)
+            call.tokens_out = count_tokens(text)
+
+    Works around awaits as well. Successful calls with a known output size
+    update the model's latency correction.
+    """
+    call = ModelCall()
+    started = time.perf_counter()
+    outcome = "failed"
+    try:
+        yield call
+        outcome = "ok"
+    finally:
+        seconds = time.perf_counter() - started
+        MODEL_CALL_SECONDS.observe(seconds, task=task, model=model, outcome=outcome)
+        estimate = prior_latency(model, call.tokens_out or 0)
+        if outcome == "ok" and call.tokens_out:
+            with _factor_lock:
+                previous = _latency_factor.get(model, 1.0)
+                _latency_factor[model] = previous + ROUTING_EWMA_ALPHA * (seconds / estimate - previous)
+        _append_log({"kind": "call", "task": task, "model": model, "outcome": outcome,
+                     "seconds": round(seconds, 4), "prior_s": round(estimate, 4),
+                     "tokens_in": call.tokens_in, "tokens_out": call.tokens_out})
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(path=ROUTING_LOG) -> dict:
+    """Aggregate the routing log: calls per task/model and decisions per plan."""
+    calls, decisions = {}, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+            if record.get("kind") == "call":
+                calls.setdefault((record["task"], record["model"]), []).append(record)
+            elif record.get("kind") == "decision":
+                key = (record["mode"], record["summary_model"], record["deadlines_model"])
+                decisions.setdefault(key, []).append(record)
+
+    call_rows = []
+    for (task, model), records in sorted(calls.items()):
+        ok = [r for r in records if r["outcome"] == "ok"]
+        seconds = [r["seconds"] for r in ok] or [0.0]
+        ratios = [r["seconds"] / r["prior_s"] for r in ok if r.get("tokens_out") and r["prior_s"]]
+        call_rows.append({
+            "task": task, "model": model, "calls": len(records), "failed": len(records) - len(ok),
+            "p50_s": _percentile(seconds, 0.5), "p95_s": _percentile(seconds, 0.95),
+            "observed_over_prior": sum(ratios) / len(ratios) if ratios else None,
+        })
+
+    decision_rows = []
+    for (mode, summary, deadlines), records in sorted(decisions.items()):
+        walls = [max(r["observed_s"].values()) for r in records if r.get("observed_s")] or [0.0]
+        decision_rows.append({
+            "mode": mode, "summary_model": summary, "deadlines_model": deadlines, "meetings": len(records),
+            "est_cost_usd": sum(r["cost_usd"] for r in records) / len(records),
+            "est_latency_s": sum(r["latency_s"] for r in records) / len(records),
+            "observed_p50_s": _percentile(walls, 0.5),
+            "over_budget": sum(1 for r in records if r["over_budget"]),
+        })
+    return {"calls": call_rows, "decisions": decision_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--report", action="store_true", help="summarize the routing log")
+    parser.add_argument("--log", default=ROUTING_LOG, help="routing log to read")
+    args = parser.parse_args()
+
+    if not args.report:
+        parser.print_help()
+        return
+    if not args.log or not os.path.exists(args.log):
+        print(f"❌ No routing log at {args.log!r}")
+        return
+    summary = report(args.log)
+    print(f"{'task':<10} {'model':<14} {'calls':>6} {'failed':>6} {'p50 s':>7} {'p95 s':>7} {'obs/prior':>9}")
+    for row in summary["calls"]:
+        ratio = f"{row['observed_over_prior']:.2f}" if row["observed_over_prior"] is not None else "-"
+        print(f"{row['task']:<10} {row['model']:<14} {row['calls']:>6} {row['failed']:>6} "
+              f"{row['p50_s']:>7.2f} {row['p95_s']:>7.2f} {ratio:>9}")
+    print()
+    print(f"{'mode':<9} {'summary':<14} {'deadlines':<14} {'meetings':>8} {'est $':>8} "
+          f"{'est s':>6} {'p50 s':>6} {'over':>5}")
+    for row in summary["decisions"]:
+        print(f"{row['mode']:<9} {row['summary_model']:<14} {row['deadlines_model']:<14} {row['meetings']:>8} "
+              f"{row['est_cost_usd']:>8.4f} {row['est_latency_s']:>6.1f} {row['observed_p50_s']:>6.2f} "
+              f"{row['over_budget']:>5}")
+
+
+if __name__ == "__main__":
+    main()
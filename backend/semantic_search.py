@@ -0,0 +1,377 @@
+# backend/semantic_search.py
+"""
+Semantic search over meeting summaries and transcripts.
+
+At save time each meeting is split into chunks (the summary, and the
+transcript in overlapping windows) and every chunk is embedded, either with
+the OpenAI embeddings API or, for tests and offline use, a local hashed
+bag-of-words model. Vectors are L2-normalized float32 rows appended to a flat
+file in VECTOR_INDEX_DIR; a JSON-lines file alongside maps each row to its
+meeting. Queries memory-map the vector file and score it in blocks with one
+matrix product per block, so cosine top-k never loads the index into the
+heap and a batch of queries shares a single pass over the file (about 100 MB
+for 100k chunks at the default 256 dims).
+
+The index is append-only. Deleted meetings are dropped at query time (their
+IDs no longer resolve in MongoDB); `--rebuild` compacts them away.
+
+Usage:
+    python -m backend.semantic_search --reindex     # add meetings missing from the index
+    python -m backend.semantic_search --rebuild     # start over from MongoDB
+    python -m backend.semantic_search "budget discussion"
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import numpy as np
+from .chunking import split_transcript, count_tokens
+from .llm import create_embeddings
+from .metrics import stage_timer
+from .pipeline import submit_stage
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")  # openai | local | none
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# text-embedding-3 models can return shortened vectors. Scoring reads every
+# row, so query time grows with chunks x dims: 256 dims (1 KB per chunk) keeps
+# a 100k-chunk scan around 100 MB at a small cost in ranking quality.
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+EMBEDDING_BATCH = int(os.getenv("EMBEDDING_BATCH", "64"))  # texts per API request
+EMBED_CHUNK_TOKENS = int(os.getenv("EMBED_CHUNK_TOKENS", "300"))
+EMBED_CHUNK_OVERLAP = 40
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "vector_index")
+# Rows scored per matrix product; bounds the temporary score buffer
+SEARCH_BLOCK_ROWS = 65536
+# Chunks fetched per requested meeting, since one meeting can own many hits
+SEARCH_OVERSAMPLE = 5
+SNIPPET_CHARS = 300
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def local_embeddings(texts, dim=EMBEDDING_DIM):
+    """
+    Hashed bag-of-words vectors (words and word pairs), for tests and offline
+    use. Deterministic across processes; matches shared vocabulary only, so it
+    does not find paraphrases the way a real embedding model does.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _WORD_RE.findall(text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            vectors[row, digest % dim] += 1.0 if digest >> 63 else -1.0
+    return _normalize(vectors)
+
+
+def embed_texts(texts) -> np.ndarray:
+    """Embed texts in batches; returns normalized float32 rows."""
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    if EMBEDDING_BACKEND == "local":
+        return local_embeddings(texts)
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH):
+        response = create_embeddings(
+            model=EMBEDDING_MODEL,
+            input=texts[start:start + EMBEDDING_BATCH],
+            # Passed through the body: older SDK releases lack the parameter
+            extra_body={"dimensions": EMBEDDING_DIM},
+        )
+        vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+    return _normalize(vectors)
+
+
+def meeting_chunks(transcript, summary) -> list:
+    """(kind, text) pairs embedded for one meeting."""
+    chunks = [("summary", text) for text in split_transcript(summary or "", EMBED_CHUNK_TOKENS) if text.strip()]
+    chunks += [("transcript", text)
+               for text in split_transcript(transcript or "", EMBED_CHUNK_TOKENS, EMBED_CHUNK_OVERLAP)
+               if text.strip()]
+    return chunks
+
+
+class VectorIndex:
+    """
+    Append-only file of normalized float32 rows plus per-row metadata.
+
+    Files in `directory`: vectors.f32 (rows of `dim` floats), chunks.jsonl
+    (meeting_id, kind and a text snippet per row) and index.json (model and
+    dim, checked on open). Rows become visible once their metadata line is
+    written, so readers never see a vector without its meeting, including
+    rows appended by another process.
+    """
+
+    def __init__(self, directory=VECTOR_INDEX_DIR, dim=EMBEDDING_DIM, model=None):
+        self.directory = directory
+        self.dim = dim
+        self.model = model or (EMBEDDING_MODEL if EMBEDDING_BACKEND != "local" else "local")
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.chunks_path = os.path.join(directory, "chunks.jsonl")
+        self._lock = threading.Lock()
+        self._reset()
+        self._check_header()
+
+    def _reset(self):
+        self._vectors = None  # np.memmap over the first self._rows rows
+        self._rows = 0
+        self._chunks = []
+        self._meeting_ids = set()
+        self._chunks_offset = 0
+        self._chunks_inode = None
+
+    def _check_header(self):
+        os.makedirs(self.directory, exist_ok=True)
+        header_path = os.path.join(self.directory, "index.json")
+        header = {"model": self.model, "dim": self.dim}
+        if os.path.exists(header_path):
+            with open(header_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored != header:
+                raise ValueError(f"Vector index at {self.directory} was built with {stored}, not {header}; "
+                                 f"run `python -m backend.semantic_search --rebuild`")
+        else:
+            with open(header_path, "w", encoding="utf-8") as f:
+                json.dump(header, f)
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        with open(os.path.join(self.directory, "index.lock"), "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Pick up rows appended since the last call, by this or another process."""
+        try:
+            stat = os.stat(self.chunks_path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        if stat.st_ino != self._chunks_inode or stat.st_size < self._chunks_offset:
+            self._reset()  # rebuilt underneath us
+            self._chunks_inode = stat.st_ino
+        if stat.st_size > self._chunks_offset:
+            with open(self.chunks_path, "rb") as f:
+                f.seek(self._chunks_offset)
+                data = f.read()
+            complete = data[:data.rfind(b"\n") + 1]  # ignore a line still being written
+            for line in complete.splitlines():
+                chunk = json.loads(line)
+                self._chunks.append(chunk)
+                self._meeting_ids.add(chunk["meeting_id"])
+            self._chunks_offset += len(complete)
+
+        row_bytes = 4 * self.dim
+        on_disk = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        rows = min(on_disk, len(self._chunks))
+        if rows != self._rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                      shape=(rows, self.dim)) if rows else None
+            self._rows = rows
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return self._rows
+
+    def has_meeting(self, meeting_id) -> bool:
+        with self._lock:
+            self._refresh()
+            return meeting_id in self._meeting_ids
+
+    def chunk(self, row) -> dict:
+        return self._chunks[row]
+
+    def add(self, meeting_id, chunks, vectors) -> int:
+        """Append one meeting's chunks; returns rows added (0 if already indexed)."""
+        vectors = _normalize(vectors)
+        if len(chunks) != len(vectors) or vectors.shape[1] != self.dim:
+            raise ValueError(f"expected {len(chunks)} vectors of {self.dim} dims, got {vectors.shape}")
+        with self._lock, self._file_lock():
+            self._refresh()
+            if meeting_id in self._meeting_ids or not chunks:
+                return 0
+            # Drop a tail left by a writer that died between the two appends
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(len(self._chunks) * 4 * self.dim)
+                f.write(vectors.astype("<f4").tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.chunks_path, "ab") as f:
+                f.truncate(self._chunks_offset)
+                f.write("".join(
+                    json.dumps({"meeting_id": meeting_id, "kind": kind, "text": text[:SNIPPET_CHARS]}) + "\n"
+                    for kind, text in chunks
+                ).encode("utf-8"))
+            self._refresh()
+            return len(chunks)
+
+    def search(self, queries, k=10, block_rows=SEARCH_BLOCK_ROWS) -> list:
+        """
+        Cosine top-k for a batch of query vectors. Returns, per query, a list
+        of (score, row) sorted best first.
+        """
+        queries = _normalize(queries)
+        with self._lock:
+            self._refresh()
+            vectors, rows = self._vectors, self._rows
+        if not rows or k <= 0:
+            return [[] for _ in queries]
+
+        best_scores = np.empty((0, len(queries)), dtype=np.float32)
+        best_rows = np.empty((0, len(queries)), dtype=np.int64)
+        for start in range(0, rows, block_rows):
+            scores = vectors[start:start + block_rows] @ queries.T  # (block, queries)
+            top = min(k, len(scores))
+            idx = np.argpartition(-scores, top - 1, axis=0)[:top]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, idx, axis=0)])
+            best_rows = np.concatenate([best_rows, idx + start])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=0)[:k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=0)
+                best_rows = np.take_along_axis(best_rows, keep, axis=0)
+
+        order = np.argsort(-best_scores, axis=0)
+        best_scores = np.take_along_axis(best_scores, order, axis=0)
+        best_rows = np.take_along_axis(best_rows, order, axis=0)
+        return [list(zip(best_scores[:, q].tolist(), best_rows[:, q].tolist())) for q in range(len(queries))]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> VectorIndex:
+    """The shared index, opened on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VectorIndex()
+    return _index
+
+
+def index_meeting(meeting_id, transcript, summary) -> int:
+    """Chunk, embed and index one meeting; returns the number of chunks added."""
+    index = get_index()
+    if index.has_meeting(meeting_id):
+        return 0
+    chunks = meeting_chunks(transcript, summary)
+    with stage_timer("embedding") as record:
+        texts = [text for _, text in chunks]
+        record.tokens_in = sum(count_tokens(text) for text in texts)
+        vectors = embed_texts(texts)
+        record.bytes = vectors.nbytes
+    return index.add(meeting_id, chunks, vectors)
+
+
+def _index_quietly(meeting_id, transcript, summary):
+    try:
+        return index_meeting(meeting_id, transcript, summary)
+    except Exception as e:
+        print(f"❌ Error indexing meeting {meeting_id} for semantic search: {e}")
+        return 0
+
+
+def index_meeting_async(meeting_id, transcript, summary):
+    """Index a saved meeting on the pipeline pool; failures are logged, not raised."""
+    if EMBEDDING_BACKEND == "none" or not meeting_id:
+        return None
+    return submit_stage(_index_quietly, meeting_id, transcript, summary)
+
+
+def semantic_search_meetings(query, limit=20):
+    """
+    Meetings ranked by their best-matching chunk. Returns the listing fields
+    of search_meetings plus `score` and the matching `snippet`.
+    """
+    from .database import get_meetings_by_ids
+
+    try:
+        index = get_index()
+        hits = index.search(embed_texts([query]), k=limit * SEARCH_OVERSAMPLE)[0]
+        best = {}
+        for score, row in hits:
+            chunk = index.chunk(row)
+            best.setdefault(chunk["meeting_id"], (score, chunk["text"]))
+        meetings = get_meetings_by_ids(list(best))
+        results = []
+        for meeting_id, (score, snippet) in best.items():
+            if meeting_id in meetings:  # deleted meetings keep their rows until a rebuild
+                results.append(dict(meetings[meeting_id], score=round(score, 4), snippet=snippet))
+            if len(results) == limit:
+                break
+        return results
+    except Exception as e:
+        print(f"❌ Error in semantic search: {e}")
+        return []
+
+
+def reindex(batch_size=50) -> int:
+    """Index every saved meeting that is not in the index yet."""
+    from .database import meetings_collection, get_meeting_transcript
+
+    index = get_index()
+    added, last_id = 0, None
+    started = time.perf_counter()
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id is not None else {}
+        meetings = list(meetings_collection.find(query, {'summary': 1}).sort('_id', 1).limit(batch_size))
+        if not meetings:
+            break
+        last_id = meetings[-1]['_id']
+        for meeting in meetings:
+            meeting_id = str(meeting['_id'])
+            if index.has_meeting(meeting_id):
+                continue
+            added += _index_quietly(meeting_id, get_meeting_transcript(meeting_id) or "", meeting.get('summary', ""))
+        print(f"✅ {len(index)} chunks indexed, {added} added ({time.perf_counter() - started:.1f}s)")
+    return added
+
+
+def main():
+    global _index
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("query", nargs="?", help="search the index instead of updating it")
+    parser.add_argument("--reindex", action="store_true", help="index meetings missing from the index")
+    parser.add_argument("--rebuild", action="store_true", help="delete the index and index every meeting")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.rebuild:
+        shutil.rmtree(VECTOR_INDEX_DIR, ignore_errors=True)
+        _index = None
+    if args.rebuild or args.reindex:
+        reindex()
+    if args.query:
+        started = time.perf_counter()
+        results = semantic_search_meetings(args.query, args.limit)
+        print(f"{len(results)} meetings in {(time.perf_counter() - started) * 1000:.1f}ms")
+        for meeting in results:
+            print(f"{meeting['score']:.3f}  {meeting['filename']}  {meeting['snippet'][:120]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,119 @@
 # backend/services.py
 from io import BytesIO
-from .db_config import client  # Corrected import
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from .llm import chat_completion, create_transcription
+from .audio import split_audio, stitch_transcripts
+from .chunking import count_tokens, split_transcript, sentence_windows
+from .dates import find_date_candidates
+from .metrics import log_payload, truncate
+from .routing import plan_meeting, model_call
 import json
+import os
+
+# Whisper rejects uploads above 25 MB; longer recordings are chunked
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+TRANSCRIBE_CHUNK_THRESHOLD_BYTES = int(os.getenv("TRANSCRIBE_CHUNK_THRESHOLD_BYTES", str(8 * 1024 * 1024)))
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+
+# Map-reduce limits for long transcripts (tokens per segment prompt)
+SUMMARY_SEGMENT_TOKENS = int(os.getenv("SUMMARY_SEGMENT_TOKENS", "12000"))
+DEADLINES_SEGMENT_TOKENS = int(os.getenv("DEADLINES_SEGMENT_TOKENS", "4000"))
+SEGMENT_OVERLAP_TOKENS = int(os.getenv("SEGMENT_OVERLAP_TOKENS", "200"))
+LLM_MAP_CONCURRENCY = int(os.getenv("LLM_MAP_CONCURRENCY", "4"))
+
+# Rule-based pre-extraction ahead of the deadline model call
+DEADLINE_PREFILTER = os.getenv("DEADLINE_PREFILTER", "1") == "1"
+DEADLINE_WINDOW_SENTENCES = int(os.getenv("DEADLINE_WINDOW_SENTENCES", "1"))
+
+# Models and prompt versions; bump a version whenever its prompt changes so
+# cached results produced by the old prompt are not reused.
+WHISPER_MODEL = "whisper-1"
+SUMMARY_MODEL = "gpt-4o-mini"
+DEADLINES_MODEL = "gpt-4"
+TRANSCRIBE_VERSION = "1"
+SUMMARY_PROMPT_VERSION = "2"
+DEADLINES_PROMPT_VERSION = "3"
+COMBINED_PROMPT_VERSION = "1"
+
+
+def _transcription_parts(transcript):
+    """Return (text, segments) from a Whisper response object or dict."""
+    if isinstance(transcript, dict):
+        return transcript.get('text'), transcript.get('segments') or []
+    segments = getattr(transcript, 'segments', None) or []
+    segments = [s if isinstance(s, dict) else dict(s) for s in segments]
+    return getattr(transcript, 'text', None), segments
+
+
+def _transcribe_chunk(file: BytesIO, verbose=False):
+    kwargs = {"response_format": "verbose_json"} if verbose else {}
+    transcript = create_transcription(
+        model=WHISPER_MODEL,
+        file=file,
+        **kwargs
+    )
+
+    log_payload("Whisper API raw response", transcript)
+    return _transcription_parts(transcript)
+
+
+def _file_size(file) -> int:
+    """Size of a seekable file-like object without copying its contents."""
+    pos = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(pos)
+    return size
+
+
+def _transcribe_chunked(file: BytesIO) -> str:
+    """Split a long recording at silences and transcribe chunks in parallel."""
+    chunks = split_audio(file)
+    print(f"DEBUG: Split {file.name} into {len(chunks)} chunks, "
+          f"concurrency={TRANSCRIBE_CONCURRENCY}")
+
+    with ThreadPoolExecutor(max_workers=TRANSCRIBE_CONCURRENCY,
+                            thread_name_prefix="whisper") as pool:
+        results = list(pool.map(lambda chunk: _transcribe_chunk(chunk[1], verbose=True), chunks))
+
+    parts = [(offset, text, segments)
+             for (offset, _), (text, segments) in zip(chunks, results)]
+    return stitch_transcripts(parts)
 
 
 def transcribe_audio(file: BytesIO) -> str:
-    """Transcribe meeting audio using OpenAI Whisper."""
+    """Transcribe meeting audio using OpenAI Whisper.
+
+    `file` is any seekable binary file object with a `.name` (a BytesIO or
+    a SpooledUpload); it is streamed to the API, not copied.
+
+    Recordings larger than TRANSCRIBE_CHUNK_THRESHOLD_BYTES are split at
+    silence boundaries and transcribed in parallel (requires pydub/ffmpeg).
+    """
     file.seek(0)  # ensure pointer at start
-    print(f"DEBUG: Sending file {file.name}, size={len(file.getbuffer())} bytes")
-    
-    transcript = client.audio.transcriptions.create(
-        model="whisper-1",
-        file=file
-    )
-    
-    # Debug: print raw response
-    print(f"DEBUG: Whisper API raw response: {transcript}")
-    
-    # Parse text
-    if isinstance(transcript, dict):
-        text = transcript.get('text')
-    else:
-        text = getattr(transcript, 'text', None)
-    
+    size = _file_size(file)
+    print(f"DEBUG: Sending file {file.name}, size={size} bytes")
+
+    text = None
+    if size > TRANSCRIBE_CHUNK_THRESHOLD_BYTES:
+        try:
+            text = _transcribe_chunked(file)
+        except ImportError:
+            if size > WHISPER_MAX_BYTES:
+                raise ValueError(
+                    f"Audio file is {size} bytes, above the Whisper upload limit. "
+                    "Install pydub and ffmpeg to enable chunked transcription."
+                )
+            print("DEBUG: pydub not installed, transcribing in a single request")
+            file.seek(0)
+
+    if text is None:
+        text, _ = _transcribe_chunk(file)
+    return _require_text(text)
+
+
+def _require_text(text):
     if not text:
         raise RuntimeError(
             "Transcription returned no text. Confirm audio format. "
@@ -31,9 +122,94 @@ def transcribe_audio(file: BytesIO) -> str:
     return text
 
 
-def generate_summary(transcript: str) -> str:
-    """Summarize transcript and extract action items."""
+def _summary_request(prompt: str, model=SUMMARY_MODEL) -> dict:
+    return {"model": model, "messages": [{"role": "user", "content": prompt}]}
+
+
+def _summary_content(response) -> str:
+    content = response.choices[0].message.content.strip()
+    if not content:
+        raise RuntimeError("Empty summary returned.")
+    return content
+
+
+def _complete_summary(prompt: str, model=SUMMARY_MODEL) -> str:
+    with model_call("summary", model) as call:
+        call.tokens_in = count_tokens(prompt)
+        content = _summary_content(chat_completion(**_summary_request(prompt, model)))
+        call.tokens_out = count_tokens(content)
+    return content
+
+
+def _map_segments(fn, segments):
+    """Apply fn to each transcript segment in parallel, preserving order."""
+    with ThreadPoolExecutor(max_workers=LLM_MAP_CONCURRENCY,
+                            thread_name_prefix="llm-map") as pool:
+        return list(pool.map(fn, segments))
+
+
+def _summarize_segment(segment: str, model=SUMMARY_MODEL) -> str:
     prompt = f"""
+    The following is one part of a longer meeting transcript. Summarize this part into:
+    1. Key decisions
+    2. Action items (with responsible persons if mentioned)
+    3. Next steps
+
+    Keep names, dates and figures exactly as stated.
+
+    Transcript part:
+    {segment}
+    """
+    return _complete_summary(prompt, model)
+
+
+def _merge_prompt(partials: list, model=SUMMARY_MODEL) -> str:
+    """Prompt merging partial summaries; groups are merged first if they do
+    not fit in one prompt."""
+    joined = "\n\n".join(f"Part {i + 1}:\n{p}" for i, p in enumerate(partials))
+    if len(partials) > 1 and count_tokens(joined) > SUMMARY_SEGMENT_TOKENS:
+        groups, current = [], []
+        for partial in partials:
+            if current and count_tokens("\n\n".join(current + [partial])) > SUMMARY_SEGMENT_TOKENS:
+                groups.append(current)
+                current = []
+            current.append(partial)
+        groups.append(current)
+        if len(groups) < len(partials):
+            merged = _map_segments(
+                lambda group: group[0] if len(group) == 1 else _complete_summary(_merge_prompt(group, model), model),
+                groups
+            )
+            return _merge_prompt(merged, model)
+
+    return f"""
+    The following are summaries of consecutive parts of one meeting. Merge them
+    into a single summary of the whole meeting with:
+    1. Key decisions
+    2. Action items (with responsible persons if mentioned)
+    3. Next steps
+
+    Remove duplicates that appear in more than one part.
+
+    {joined}
+    """
+
+
+def _summary_prompt(transcript: str, model=SUMMARY_MODEL, segments=None) -> str:
+    """Prompt for the final summary call.
+
+    Transcripts longer than SUMMARY_SEGMENT_TOKENS are summarized
+    map-reduce style: overlapping segments in parallel, and the final
+    prompt merges the partial summaries. `segments` is the transcript
+    already split by prepare_transcript, if available.
+    """
+    if segments is None:
+        segments = split_transcript(transcript, SUMMARY_SEGMENT_TOKENS, SEGMENT_OVERLAP_TOKENS)
+    if len(segments) > 1:
+        print(f"DEBUG: Summarizing transcript in {len(segments)} segments")
+        return _merge_prompt(_map_segments(partial(_summarize_segment, model=model), segments), model)
+
+    return f"""
     Summarize the following meeting transcript into:
     1. Key decisions
     2. Action items (with responsible persons if mentioned)
@@ -42,21 +218,220 @@ def generate_summary(transcript: str) -> str:
     Transcript:
     {transcript}
     """
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}]
+
+
+def generate_summary(transcript: str, model=SUMMARY_MODEL, segments=None) -> str:
+    """Summarize transcript and extract action items."""
+    return _complete_summary(_summary_prompt(transcript, model, segments), model)
+
+
+def stream_summary(transcript: str, model=SUMMARY_MODEL, segments=None):
+    """Like generate_summary, but yield the summary text as it is generated."""
+    prompt = _summary_prompt(transcript, model, segments)
+    with model_call("summary", model) as call:
+        call.tokens_in = count_tokens(prompt)
+        stream = chat_completion(**_summary_request(prompt, model), stream=True)
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        if not parts:
+            raise RuntimeError("Empty summary returned.")
+        call.tokens_out = count_tokens("".join(parts))
+
+
+def prepare_transcript(transcript: str, tokens=None) -> dict:
+    """
+    Split and measure a transcript once for routing, the summary and the
+    deadline extraction:
+
+        tokens            transcript tokens (`tokens` if already counted)
+        date_candidates   date/deadline expressions found by the pre-filter
+        excerpt_tokens    tokens sent for deadline extraction (0: no call)
+        summary_segments  the transcript split for map-reduce summarizing
+        deadline_segments the deadline excerpt split into prompts ([]: no call)
+    """
+    if tokens is None:
+        tokens = count_tokens(transcript)
+    candidates = find_date_candidates(transcript)
+    excerpt = _deadline_excerpt(transcript, candidates)
+    if excerpt is None:
+        excerpt_tokens, deadline_segments = 0, []
+    else:
+        excerpt_tokens = tokens if excerpt is transcript else count_tokens(excerpt)
+        if excerpt is not transcript:
+            print(f"DEBUG: Deadline pre-filter kept {excerpt_tokens} of {tokens} transcript tokens")
+        deadline_segments = split_transcript(
+            excerpt, DEADLINES_SEGMENT_TOKENS, SEGMENT_OVERLAP_TOKENS, total_tokens=excerpt_tokens
+        )
+    return {
+        "tokens": tokens,
+        "date_candidates": len(candidates),
+        "excerpt_tokens": excerpt_tokens,
+        "summary_segments": split_transcript(
+            transcript, SUMMARY_SEGMENT_TOKENS, SEGMENT_OVERLAP_TOKENS, total_tokens=tokens
+        ),
+        "deadline_segments": deadline_segments,
+    }
+
+
+def route_meeting(prepared: dict, merge=True) -> dict:
+    """
+    Pick the models for a prepared transcript's summary and deadline calls
+    (see routing.plan_meeting). `merge=False` rules out the combined call,
+    e.g. when the summary is streamed.
+    """
+    transcript_tokens = prepared["tokens"]
+    features = {
+        "transcript_tokens": transcript_tokens,
+        "excerpt_tokens": prepared["excerpt_tokens"],
+        "date_candidates": prepared["date_candidates"],
+        "summary_segments": len(prepared["summary_segments"]),
+        "segment_tokens": min(transcript_tokens, SUMMARY_SEGMENT_TOKENS),
+    }
+    decision = plan_meeting(features, SUMMARY_MODEL, DEADLINES_MODEL, merge=merge)
+    print(f"DEBUG: Routed {transcript_tokens} tokens, {prepared['date_candidates']} date candidates: "
+          f"{decision['mode']} summary={decision['summary_model']} deadlines={decision['deadlines_model']} "
+          f"(est ${decision['cost_usd']:.4f}, {decision['latency_s']:.1f}s)")
+    return decision
+
+
+def _combined_request(transcript: str, model) -> dict:
+    """chat_completion arguments for the summary and deadlines in one JSON reply."""
+    prompt = f"""
+    Analyze the following meeting transcript and return a JSON object with two keys:
+
+    "summary": a summary of the meeting as plain text with
+        1. Key decisions
+        2. Action items (with responsible persons if mentioned)
+        3. Next steps
+    "deadlines": an array of all deadlines, tasks with due dates and important
+        dates mentioned, each as {{"title": ..., "date": ..., "description": ...}}
+        with the date as YYYY-MM-DD if possible, or natural language.
+        Use [] if there are none.
+
+    Meeting Transcript:
+    {transcript}
+    """
+    return dict(
+        model=model,
+        messages=[
+            {
+                "role": "system",
+                "content": "You summarize meeting transcripts and extract their deadlines. Always respond with a single JSON object."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        temperature=0.3,
+        response_format={"type": "json_object"},
     )
-    content = response.choices[0].message.content.strip()
-    if not content:
+
+
+def _parse_combined(response_text) -> dict:
+    """{"summary", "deadlines"} from a combined reply; raises if it is unusable."""
+    log_payload("Raw GPT combined response", response_text)
+    try:
+        reply = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Combined response is not valid JSON: {e}")
+    summary = str(reply.get("summary") or "").strip() if isinstance(reply, dict) else ""
+    if not summary:
         raise RuntimeError("Empty summary returned.")
-    return content
+    deadlines = reply.get("deadlines")
+    return {"summary": summary, "deadlines": merge_deadlines([deadlines if isinstance(deadlines, list) else []])}
+
+
+def summarize_with_deadlines(transcript: str, model) -> dict:
+    """
+    Summary and deadlines from one structured-output call. Only for
+    transcripts that fit a single prompt; the router decides when.
+    """
+    request = _combined_request(transcript, model)
+    with model_call("combined", model) as call:
+        call.tokens_in = count_tokens(request["messages"][1]["content"])
+        content = chat_completion(**request).choices[0].message.content
+        call.tokens_out = count_tokens(content)
+    return _parse_combined(content)
+
 
+def _deadline_key(deadline: dict) -> tuple:
+    title = " ".join(str(deadline.get("title", "")).lower().split())
+    date = " ".join(str(deadline.get("date", "")).lower().split())
+    return title, date
 
-def extract_deadlines_with_gpt(meeting_transcript):
+
+def merge_deadlines(batches: list) -> list:
+    """Concatenate per-segment deadline lists, dropping duplicates by title and date."""
+    merged, seen = [], set()
+    for batch in batches:
+        for deadline in batch:
+            if not isinstance(deadline, dict):
+                continue
+            key = _deadline_key(deadline)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(deadline)
+    return merged
+
+
+def extract_deadlines_with_gpt(meeting_transcript, model=DEADLINES_MODEL, segments=None):
     """
     Use GPT to extract deadlines from meeting transcript.
     Returns list of dictionaries with deadline info.
+
+    A local pass first looks for date and deadline expressions: without any,
+    no API call is made; otherwise only the sentences around them are sent.
+    Long inputs are split into overlapping segments that are processed in
+    parallel; the results are merged and de-duplicated. A failed API call
+    raises instead of returning a partial list. `segments` is the excerpt
+    already split by prepare_transcript, if available.
+    """
+    if segments is None:
+        segments = _deadline_segments(meeting_transcript)
+    if not segments:
+        return []
+    if len(segments) == 1:
+        return _extract_deadlines_segment(segments[0], model)
+
+    print(f"DEBUG: Extracting deadlines from {len(segments)} segments")
+    return merge_deadlines(_map_segments(partial(_extract_deadlines_segment, model=model), segments))
+
+
+def _deadline_excerpt(meeting_transcript, candidates=None):
+    """
+    The part of the transcript worth sending for deadline extraction: with
+    DEADLINE_PREFILTER, only the sentences around date/deadline expressions
+    (`candidates`, found here if not given), or None when there are none.
     """
+    if not DEADLINE_PREFILTER:
+        return meeting_transcript
+    if candidates is None:
+        candidates = find_date_candidates(meeting_transcript)
+    windows = sentence_windows(meeting_transcript, candidates, DEADLINE_WINDOW_SENTENCES)
+    if not windows:
+        print("DEBUG: No date expressions in transcript, skipping deadline extraction")
+        return None
+    return "\n...\n".join(windows)
+
+
+def _deadline_segments(meeting_transcript) -> list:
+    """The deadline excerpt split into prompts; [] when there is nothing to extract."""
+    excerpt = _deadline_excerpt(meeting_transcript)
+    if excerpt is None:
+        return []
+    return split_transcript(excerpt, DEADLINES_SEGMENT_TOKENS, SEGMENT_OVERLAP_TOKENS)
+
+
+def _deadlines_request(meeting_transcript, model=DEADLINES_MODEL) -> dict:
+    """chat_completion arguments for extracting deadlines from one segment."""
     extraction_prompt = f"""
     Analyze the following meeting transcript and extract all deadlines, tasks with due dates, 
     and important dates mentioned. 
@@ -88,49 +463,65 @@ def extract_deadlines_with_gpt(meeting_transcript):
     {meeting_transcript}
     """
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at extracting deadlines and important dates from meeting transcripts. Always respond with ONLY valid JSON, no other text or markdown."
-                },
-                {
-                    "role": "user",
-                    "content": extraction_prompt
-                }
-            ],
-            temperature=0.3,
-        )
+    return dict(
+        model=model,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert at extracting deadlines and important dates from meeting transcripts. Always respond with ONLY valid JSON, no other text or markdown."
+            },
+            {
+                "role": "user",
+                "content": extraction_prompt
+            }
+        ],
+        temperature=0.3,
+    )
+
+
+def _parse_deadlines(response_text):
+    """
+    Deadlines from the model's JSON reply. Raises ValueError if the reply
+    is not a JSON list, so a malformed answer is never cached as "no
+    deadlines".
+    """
+    response_text = response_text.strip()
 
-        # Parse the JSON response
-        response_text = response.choices[0].message.content.strip()
+    log_payload("Raw GPT response", response_text)
 
-        # Debug: print the raw response
-        print(f"DEBUG: Raw GPT response: {response_text}")
+    # Remove code block markers if present
+    if response_text.startswith("```json"):
+        response_text = response_text[7:]
+    if response_text.startswith("```"):
+        response_text = response_text[3:]
+    if response_text.endswith("```"):
+        response_text = response_text[:-3]
 
-        # Remove code block markers if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
+    response_text = response_text.strip()
 
-        response_text = response_text.strip()
-        
+    try:
         deadlines = json.loads(response_text)
-        print(f"DEBUG: Successfully parsed deadlines: {deadlines}")
-        
-        return deadlines
-
     except json.JSONDecodeError as e:
         print(f"Failed to parse GPT response as JSON: {e}")
-        print(f"Response was: {response_text}")
-        return []
-    except Exception as e:
-        print(f"Error extracting deadlines with GPT: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return []
+        print(f"Response was: {truncate(response_text)}")
+        raise ValueError(f"Deadlines response is not valid JSON: {e}")
+    if not isinstance(deadlines, list):
+        raise ValueError("Deadlines response is not a JSON list.")
+    log_payload("Successfully parsed deadlines", deadlines)
+    return deadlines
+
+
+def _extract_deadlines_segment(meeting_transcript, model=DEADLINES_MODEL):
+    """
+    Use GPT to extract deadlines from one transcript segment.
+    Returns list of dictionaries with deadline info.
+
+    API errors and unparseable replies propagate, so a failed call is never
+    cached as "no deadlines"; the pipeline stage falls back to [] for this
+    request only.
+    """
+    with model_call("deadlines", model) as call:
+        call.tokens_in = count_tokens(meeting_transcript)
+        content = chat_completion(**_deadlines_request(meeting_transcript, model)).choices[0].message.content
+        call.tokens_out = count_tokens(content)
+    return _parse_deadlines(content)
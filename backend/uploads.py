@@ -0,0 +1,86 @@
+# backend/uploads.py
+import io
+import os
+import hashlib
+import tempfile
+
+# Upload handling configuration
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+# Uploads up to this size stay in memory; larger ones roll over to a temp file
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(8 * 1024 * 1024)))
+
+
+class UploadTooLarge(ValueError):
+    """Raised while streaming an upload that exceeds MAX_UPLOAD_BYTES."""
+
+
+class SpooledUpload(io.BufferedIOBase):
+    """
+    Read-only file handle over a spooled upload.
+
+    Carries the original filename (Whisper uses its extension), the size and
+    the SHA-256 computed while the upload was streamed in.
+    """
+
+    def __init__(self, spool, name, size, sha256):
+        super().__init__()
+        self._spool = spool
+        self.name = name
+        self.size = size
+        self.sha256 = sha256
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._spool.read(size)
+
+    def read1(self, size=-1):
+        return self._spool.read(size)
+
+    def readinto(self, buffer):
+        data = self._spool.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._spool.seek(offset, whence)
+
+    def tell(self):
+        return self._spool.tell()
+
+    def close(self):
+        if not self.closed:
+            self._spool.close()
+        super().close()
+
+
+def spool_upload(stream, filename, max_bytes=MAX_UPLOAD_BYTES, chunk_size=UPLOAD_CHUNK_SIZE) -> SpooledUpload:
+    """
+    Copy `stream` into a spooled temp file in fixed-size chunks, hashing it
+    on the way. Raises UploadTooLarge as soon as more than max_bytes have
+    been read, without buffering the rest of the body.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            block = stream.read(chunk_size)
+            if not block:
+                break
+            size += len(block)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds the maximum size of {max_bytes} bytes")
+            digest.update(block)
+            spool.write(block)
+    except Exception:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return SpooledUpload(spool, filename, size, digest.hexdigest())
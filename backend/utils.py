@@ -1,20 +1,56 @@
 # backend/utils.py
 import os
-from datetime import datetime, timedelta
-from googleapiclient.discovery import build
+import threading
+from datetime import timedelta
+from .dates import parse_deadline_date
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
-def save_text(filename: str, content: str, folder="outputs"):
-    """Save text output (transcript or summary) to a file"""
-    os.makedirs(folder, exist_ok=True)
-    path = os.path.join(folder, filename)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
-    return path
+# The Calendar API accepts at most 50 calls per batch request
+CALENDAR_BATCH_SIZE = 50
+
+_calendar_credentials = None
+_calendar_document = None
+_calendar_lock = threading.Lock()
+_calendar_local = threading.local()
 
 def get_calendar_service():
-    """Authenticate and return Google Calendar service using OAuth"""
+    """Return this thread's Google Calendar service, building it on first use.
+
+    A service wraps a single httplib2.Http, which is not thread-safe, so
+    each thread (Flask requests, job workers, Starlette's thread pool,
+    Streamlit scripts) gets its own. The credentials and the discovery
+    document are loaded once per process and shared, so building a
+    thread's service needs no network round trip.
+    """
+    service = getattr(_calendar_local, 'service', None)
+    if service is None:
+        from googleapiclient.discovery import build, build_from_document
+
+        credentials, document = _calendar_resources()
+        if document is not None:
+            service = build_from_document(document, credentials=credentials)
+        else:
+            service = build('calendar', 'v3', credentials=credentials)
+        _calendar_local.service = service
+    return service
+
+
+def _calendar_resources():
+    """(credentials, discovery document), loaded once per process."""
+    global _calendar_credentials, _calendar_document
+    if _calendar_credentials is None:
+        with _calendar_lock:
+            if _calendar_credentials is None:
+                from googleapiclient.discovery_cache import get_static_doc
+
+                _calendar_document = get_static_doc('calendar', 'v3')
+                _calendar_credentials = _load_calendar_credentials()
+    return _calendar_credentials, _calendar_document
+
+
+def _load_calendar_credentials():
+    """Load, refresh or obtain Google Calendar OAuth credentials"""
     import pickle
     from google.auth.transport.requests import Request
     from google_auth_oauthlib.flow import InstalledAppFlow
@@ -40,37 +76,50 @@ def get_calendar_service():
         with open('token.pickle', 'wb') as token:
             pickle.dump(creds, token)
     
-    return build('calendar', 'v3', credentials=creds)
+    return creds
 
-def extract_deadline_date(deadline_str):
+def extract_deadline_date(deadline_str, reference=None):
     """
     Parse deadline string and return datetime object
-    Handles formats like: "2025-01-15", "January 15", "15th Jan", etc.
+    Handles formats like: "2025-01-15", "January 15", "15th Jan", "next Friday",
+    "end of month", etc. Relative dates are anchored to `reference` (the
+    meeting date), defaulting to now.
     """
-    try:
-        # Try ISO format first
-        return datetime.fromisoformat(deadline_str)
-    except:
-        pass
-    
-    try:
-        # Try common date formats
-        for fmt in ['%Y-%m-%d', '%B %d', '%d %B', '%d %b', '%b %d', '%d/%m/%Y']:
-            try:
-                parsed = datetime.strptime(deadline_str.strip(), fmt)
-                # If no year provided, assume current or next year
-                if parsed.year == 1900:
-                    now = datetime.now()
-                    parsed = parsed.replace(year=now.year)
-                    if parsed < now:
-                        parsed = parsed.replace(year=now.year + 1)
-                return parsed
-            except ValueError:
-                continue
-    except:
-        pass
-    
-    return None
+    return parse_deadline_date(deadline_str, reference)
+
+def build_calendar_event(event_title, deadline_date, description="", reference=None):
+    """
+    Build the Calendar API event body for a deadline.
+
+    `reference` anchors relative dates such as "next Friday".
+    Returns None if the date cannot be parsed.
+    """
+    # Parse date if string
+    if isinstance(deadline_date, str):
+        deadline_date = extract_deadline_date(deadline_date, reference)
+
+    if not deadline_date:
+        return None
+
+    return {
+        'summary': f'Deadline: {event_title}',
+        'description': description,
+        'start': {
+            'dateTime': deadline_date.isoformat(),
+            'timeZone': 'UTC',
+        },
+        'end': {
+            'dateTime': (deadline_date + timedelta(hours=1)).isoformat(),
+            'timeZone': 'UTC',
+        },
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},  # 1 day before
+                {'method': 'popup', 'minutes': 60},  # 1 hour before
+            ],
+        },
+    }
 
 def add_calendar_reminder(service, event_title, deadline_date, description=""):
     """
@@ -86,38 +135,85 @@ def add_calendar_reminder(service, event_title, deadline_date, description=""):
         Event ID if successful, None otherwise
     """
     try:
-        # Parse date if string
-        if isinstance(deadline_date, str):
-            deadline_date = extract_deadline_date(deadline_date)
-        
-        if not deadline_date:
+        event = build_calendar_event(event_title, deadline_date, description)
+        if not event:
             return None
         
-        # Create event object
-        event = {
-            'summary': f'Deadline: {event_title}',
-            'description': description,
-            'start': {
-                'dateTime': deadline_date.isoformat(),
-                'timeZone': 'UTC',
-            },
-            'end': {
-                'dateTime': (deadline_date + timedelta(hours=1)).isoformat(),
-                'timeZone': 'UTC',
-            },
-            'reminders': {
-                'useDefault': False,
-                'overrides': [
-                    {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                    {'method': 'popup', 'minutes': 60},  # 1 hour before
-                ],
-            },
-        }
-        
         # Insert event into primary calendar
         event = service.events().insert(calendarId='primary', body=event).execute()
         return event.get('id')
     
     except Exception as e:
         print(f"Error adding calendar event: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+def execute_calendar_batch(service, requests, batch_size=CALENDAR_BATCH_SIZE):
+    """
+    Execute Calendar API requests using batch HTTP requests.
+
+    Args:
+        service: Google Calendar service object
+        requests: list of HttpRequest objects (e.g. service.events().insert(...))
+        batch_size: calls per batch round trip (API maximum is 50)
+
+    Returns:
+        List of (response, error) tuples in the same order as `requests`;
+        exactly one of the two is None for each request.
+    """
+    results = [(None, None)] * len(requests)
+
+    def callback(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    for start in range(0, len(requests), batch_size):
+        batch = service.new_batch_http_request(callback=callback)
+        for i, request in enumerate(requests[start:start + batch_size], start):
+            batch.add(request, request_id=str(i))
+        try:
+            batch.execute()
+        except Exception as e:
+            # The whole round trip failed: mark every call in it as failed
+            for i in range(start, min(start + batch_size, len(requests))):
+                results[i] = (None, e)
+    return results
+
+def add_calendar_reminders_batch(service, deadlines, batch_size=CALENDAR_BATCH_SIZE, reference=None):
+    """
+    Add many deadlines to Google Calendar in batched round trips.
+
+    Args:
+        service: Google Calendar service object
+        deadlines: list of dicts with 'title', 'date' and optional 'description'
+        batch_size: events per batch request
+        reference: date relative deadlines are anchored to (default: now)
+
+    Returns:
+        List of (deadline, event_id, error) tuples in input order. event_id is
+        None and error is a message when the date could not be parsed or the
+        insert failed.
+    """
+    results = []
+    requests = []
+    pending = []
+    for deadline in deadlines:
+        event = build_calendar_event(
+            deadline.get('title'),
+            deadline.get('date'),
+            deadline.get('description', ''),
+            reference
+        )
+        if event is None:
+            results.append((deadline, None, 'Could not parse deadline date'))
+            continue
+        pending.append(len(results))
+        results.append(None)
+        requests.append(service.events().insert(calendarId='primary', body=event))
+
+    for index, (response, error) in zip(pending, execute_calendar_batch(service, requests, batch_size)):
+        deadline = deadlines[index]
+        if error is not None:
+            print(f"Error adding calendar event: {error}")
+            results[index] = (deadline, None, str(error))
+        else:
+            results[index] = (deadline, response.get('id'), None)
+    return results
@@ -0,0 +1,33 @@
+# backend/worker.py
+"""
+Run job workers without serving HTTP.
+
+Workers claim uploads from the shared MongoDB job queue
+(JOB_QUEUE_BACKEND=mongo), so nodes can be added to take load off the ones
+receiving uploads. Ctrl+C stops after the running jobs finish; jobs of a
+killed worker are picked up by another node once their lease expires.
+
+Usage:
+    JOB_QUEUE_BACKEND=mongo python -m backend.worker
+"""
+import time
+from .jobs import JOB_QUEUE_BACKEND
+from .main import start_workers
+
+
+def main():
+    if JOB_QUEUE_BACKEND != "mongo":
+        print("❌ JOB_QUEUE_BACKEND is not 'mongo': this process would have no jobs to take")
+        return 1
+    pool = start_workers()
+    print(f"✅ {pool.workers} job workers running")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+# benchmarks/bench_asgi.py
+"""
+Load-test comparison of the Flask app and the ASGI app (backend/asgi.py).
+
+Runs bench_pipeline once per configuration, each in a fresh process so
+peak RSS is per server mode, with the same uploads and stub latencies:
+
+    flask/<workers>    Flask app, JOB_WORKERS=<workers> (default and scaled up)
+    asgi               Starlette app, async OpenAI client and Motor
+
+and prints throughput, latency percentiles and peak RSS side by side.
+With --concurrency well above the Flask worker count, the Flask app queues
+uploads behind its worker threads while the ASGI app keeps them all in
+flight on one event loop.
+
+Usage:
+    python -m benchmarks.bench_asgi --uploads 200 --concurrency 100
+    python -m benchmarks.bench_asgi --uploads 100 --concurrency 50 --flask-workers 4 50 --latency-ms 800
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(mode, args, workers=None):
+    command = [
+        sys.executable, "-m", "benchmarks.bench_pipeline", "--json", "--mode", mode,
+        "--uploads", str(args.uploads), "--concurrency", str(args.concurrency),
+        "--latency-ms", str(args.latency_ms), "--whisper-latency-ms", str(args.whisper_latency_ms),
+        "--max-kb", str(args.max_kb), "--seed", str(args.seed),
+    ]
+    if workers is not None:
+        command += ["--workers", str(workers)]
+    out = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    # The report is the last JSON object on stdout, after the backend's logging
+    start = out.stdout.rfind("\n{\n")
+    if start < 0:
+        tail = (out.stderr or out.stdout).strip().splitlines()
+        raise RuntimeError(tail[-1] if tail else f"bench_pipeline exited with {out.returncode}")
+    report, _ = json.JSONDecoder().raw_decode(out.stdout[start + 1:])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100, help="concurrent clients")
+    parser.add_argument("--flask-workers", type=int, nargs="+", default=[4], help="JOB_WORKERS values to try")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="median chat latency")
+    parser.add_argument("--whisper-latency-ms", type=float, default=600.0)
+    parser.add_argument("--max-kb", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    configs = [(f"flask/{workers}", "flask", workers) for workers in args.flask_workers]
+    configs.append(("asgi", "asgi", None))
+
+    print(f"{args.uploads} uploads, {args.concurrency} concurrent clients, "
+          f"chat {args.latency_ms:.0f} ms, whisper {args.whisper_latency_ms:.0f} ms")
+    print(f"{'server':<12} {'uploads/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MB':>8} {'failed':>7}")
+    for label, mode, workers in configs:
+        try:
+            report = run(mode, args, workers)
+        except RuntimeError as e:
+            print(f"{label:<12} failed: {e}")
+            continue
+        print(f"{label:<12} {report['throughput_per_s']:>10.2f} {report['p50_ms']:>9.0f} {report['p95_ms']:>9.0f} "
+              f"{report['p99_ms']:>9.0f} {report['peak_rss_mb']:>8.0f} {report['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_calendar.py
+"""
+Compare one-call-per-deadline calendar insertion with batched insertion,
+offline, against the fake Calendar server.
+
+Usage:
+    python -m benchmarks.bench_calendar --deadlines 100 --latency-ms 80
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from backend.utils import add_calendar_reminder, add_calendar_reminders_batch
+from benchmarks.fake_calendar_server import start_server, build_fake_service
+
+
+def make_deadlines(n):
+    start = date.today() + timedelta(days=1)
+    return [
+        {
+            "title": f"Task {i}",
+            "date": (start + timedelta(days=i % 60)).isoformat(),
+            "description": f"Synthetic deadline {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def run(label, calendar, fn):
+    calendar.round_trips = 0
+    started = time.perf_counter()
+    added = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {added:>6} events  {elapsed:8.3f}s  "
+          f"{added / elapsed if elapsed else 0:8.1f} events/s  {calendar.round_trips:>5} round trips")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deadlines", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    server, calendar, discovery_url = start_server(latency_ms=args.latency_ms)
+    try:
+        service = build_fake_service(discovery_url)
+        deadlines = make_deadlines(args.deadlines)
+
+        def sequential():
+            return sum(
+                1 for d in deadlines
+                if add_calendar_reminder(service, d["title"], d["date"], d["description"])
+            )
+
+        def batched():
+            results = add_calendar_reminders_batch(service, deadlines, batch_size=args.batch_size)
+            return sum(1 for _, event_id, _ in results if event_id)
+
+        print(f"{args.deadlines} deadlines, {args.latency_ms:.0f} ms simulated latency per round trip")
+        run("sequential", calendar, sequential)
+        run("batched", calendar, batched)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_dates.py
+"""
+Microbenchmark: the original try/strptime deadline parser vs the compiled-regex
+parser in backend/dates.py, on date strings of the kind the deadline
+extraction prompt gets back from the model.
+
+Usage:
+    python -m benchmarks.bench_dates --repeat 20000
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from backend.dates import parse_deadline_date, _parse_memo
+
+# Shapes of "date" values seen in extracted deadlines
+CORPUS = [
+    "2025-01-20", "2025-03-04", "2025-11-30T17:00", "2025-06-01 09:30",
+    "January 15", "March 3", "Dec 12", "15 January", "3 March", "12th Dec",
+    "Jan 20th, 2026", "the 3rd of November", "20/01/2026", "05/11/2025",
+    "Friday", "by Friday", "next Monday", "this Thursday", "tomorrow", "today",
+    "EOD", "end of day", "end of week", "end of the month", "by end of next month",
+    "end of quarter", "in 3 days", "in two weeks", "next week", "next month",
+    "due: Oct 20", "Not specified", "ASAP", "TBD", "Q3",
+]
+
+
+def legacy_extract_deadline_date(deadline_str):
+    """The parser `backend/utils.py` used before backend/dates.py."""
+    try:
+        return datetime.fromisoformat(deadline_str)
+    except:
+        pass
+
+    try:
+        for fmt in ['%Y-%m-%d', '%B %d', '%d %B', '%d %b', '%b %d', '%d/%m/%Y']:
+            try:
+                parsed = datetime.strptime(deadline_str.strip(), fmt)
+                if parsed.year == 1900:
+                    now = datetime.now()
+                    parsed = parsed.replace(year=now.year)
+                    if parsed < now:
+                        parsed = parsed.replace(year=now.year + 1)
+                return parsed
+            except ValueError:
+                continue
+    except:
+        pass
+
+    return None
+
+
+def bench(label, fn, inputs):
+    started = time.perf_counter()
+    parsed = sum(1 for text in inputs if fn(text) is not None)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<18} {elapsed * 1e6 / len(inputs):8.2f} us/call   "
+          f"parsed {parsed / len(inputs):6.1%} of inputs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    inputs = [rng.choice(CORPUS) for _ in range(args.repeat)]
+    reference = datetime(2025, 10, 15)
+
+    print(f"{len(inputs)} parses over {len(CORPUS)} distinct strings")
+    bench("legacy strptime", legacy_extract_deadline_date, inputs)
+    _parse_memo.cache_clear()
+    bench("regex, memoized", lambda text: parse_deadline_date(text, reference), inputs)
+    bench("regex, no memo", lambda text: _parse_memo.__wrapped__(" ".join(text.lower().split()), reference.date()), inputs)
+
+
+if __name__ == "__main__":
+    main()
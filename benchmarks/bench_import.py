@@ -0,0 +1,111 @@
+# benchmarks/bench_import.py
+"""
+Cold-start benchmark: time `import backend.main` and the imports the
+Streamlit frontend runs on every fresh process, each in a new interpreter.
+
+With --baseline REV the same measurements are taken on a checkout of another
+git revision (extracted with `git archive`), so the effect of a change on
+startup shows up side by side.
+
+MongoDB is not required. Without MONGODB_URI the benchmark points the
+backend at localhost with a 1 s server selection timeout, so code that
+connects at import time pays for a refused connection, as it would on a
+machine without a running database.
+
+Usage:
+    python -m benchmarks.bench_import --repeat 5
+    python -m benchmarks.bench_import --baseline HEAD~1
+"""
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "backend.main": "import backend.main",
+    # What frontend/app.py imports before drawing the first page
+    "frontend imports": "import backend.routes, backend.database",
+}
+FRONTEND_SCRIPT = "import runpy; runpy.run_path('frontend/app.py', run_name='__main__')"
+
+CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+
+def _have_streamlit():
+    try:
+        import streamlit  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def measure(root, code, repeat, env):
+    """Seconds spent importing in `repeat` fresh interpreters."""
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD.format(root=root, code=code)],
+            cwd=root, env=env, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "import failed")
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def checkout(revision):
+    """Extract `revision` of this repository into a temp directory."""
+    archive = subprocess.run(["git", "archive", revision], cwd=ROOT, capture_output=True, check=True).stdout
+    target = tempfile.mkdtemp(prefix="bench_import_")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "bench")
+    env.setdefault("MONGODB_URI", "mongodb://127.0.0.1:27017/meeting_summarizer?serverSelectionTimeoutMS=1000")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    targets = dict(TARGETS)
+    if _have_streamlit():
+        targets["frontend/app.py"] = FRONTEND_SCRIPT
+    else:
+        print("streamlit not installed: timing the frontend's backend imports only")
+
+    trees = [("current", ROOT)]
+    if args.baseline:
+        trees.insert(0, (args.baseline, checkout(args.baseline)))
+
+    print(f"{'target':<18} {'tree':<12} {'median':>9} {'min':>9}")
+    for name, code in targets.items():
+        for label, root in trees:
+            try:
+                samples = measure(root, code, args.repeat, env)
+            except RuntimeError as e:
+                print(f"{name:<18} {label:<12} failed: {e}")
+                continue
+            print(f"{name:<18} {label:<12} {statistics.median(samples) * 1000:7.0f}ms "
+                  f"{min(samples) * 1000:7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_llm_client.py
+"""
+Exercise the OpenAI client layer (backend/llm.py) against the stub OpenAI
+server: many threads issue chat completions through the shared connection
+pool and rate limiter while the stub injects 429s and 500s. Reports latency
+percentiles, throughput, retries and whether every call eventually succeeded.
+
+Usage:
+    python -m benchmarks.bench_llm_client --calls 200 --threads 16 --error-rate 0.1
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_openai_server import start_server
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05)
+    parser.add_argument("--rpm", type=int, default=0, help="client-side RPM limit (0 = unlimited)")
+    args = parser.parse_args()
+
+    server, stub, base_url = start_server(
+        latency_ms=args.latency_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=0, seed=0,
+    )
+    # The client is configured at import time, so point it at the stub first
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["OPENAI_RPM_LIMIT"] = str(args.rpm)
+    os.environ.setdefault("OPENAI_BACKOFF_BASE", "0.05")
+    from backend.llm import chat_completion, llm_stats
+
+    def call(i):
+        started = time.perf_counter()
+        try:
+            chat_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": f"Summarize meeting {i}"}])
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, e
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(call, range(args.calls)))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    latencies = [latency for latency, _ in results]
+    failed = [error for _, error in results if error is not None]
+    stats = llm_stats()
+    print(f"{args.calls} calls on {args.threads} threads in {elapsed:.2f}s "
+          f"({args.calls / elapsed:.1f} calls/s)")
+    print(f"latency  p50 {percentile(latencies, 50) * 1000:7.1f} ms  "
+          f"p95 {percentile(latencies, 95) * 1000:7.1f} ms  "
+          f"p99 {percentile(latencies, 99) * 1000:7.1f} ms  "
+          f"mean {statistics.mean(latencies) * 1000:7.1f} ms")
+    print(f"server   {dict(stub.counts)}")
+    print(f"client   {stats}  failed calls: {len(failed)}")
+
+
+if __name__ == "__main__":
+    main()
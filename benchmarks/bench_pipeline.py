@@ -0,0 +1,246 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end pipeline benchmark, fully offline.
+
+Whisper and chat calls go to the stub OpenAI server (latency distributions
+configurable, transcription latency can scale with audio size) and MongoDB
+is replaced by mongomock (mongomock-motor for the ASGI app). N synthetic
+uploads of random sizes are pushed concurrently through the Flask app
+(POST /api/upload, then poll /api/jobs/<id>), the ASGI app in
+backend/asgi.py (same routes), or `handle_audio_upload`, the path
+Streamlit uses.
+
+Reports p50/p95/p99 latency, throughput and peak RSS. With --max-p95-ms /
+--min-throughput / --max-rss-mb the script exits non-zero when a threshold
+is missed, so it can gate CI.
+
+Usage:
+    python -m benchmarks.bench_pipeline --mode flask --uploads 50 --concurrency 8
+    python -m benchmarks.bench_pipeline --mode asgi --uploads 200 --concurrency 100
+    python -m benchmarks.bench_pipeline --mode direct --uploads 50 --latency-ms 300 --spread 0.4 --max-p95-ms 2000
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_openai_server import start_server
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def synthetic_uploads(n, min_kb, max_kb, seed):
+    """(filename, size) pairs; contents are generated per upload so hashes differ."""
+    rng = random.Random(seed)
+    return [(f"meeting_{i:04d}.mp3", rng.randint(min_kb, max_kb) * 1024) for i in range(n)]
+
+
+def make_audio(i, size):
+    # Unique prefix keeps each upload's content hash (and cache key) distinct
+    prefix = f"ID3 synthetic upload {i} ".encode()
+    return io.BytesIO(prefix + os.urandom(max(0, size - len(prefix))))
+
+
+class NamedBytesIO(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def configure_backend(args, base_url):
+    """Point the backend at the stand-ins. Must run before backend is imported."""
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("bench_pipeline needs mongomock: pip install mongomock")
+    import pymongo
+
+    pymongo.MongoClient = mongomock.MongoClient
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["CACHE_BACKEND"] = "none"
+    os.environ["JOB_QUEUE_BACKEND"] = "memory"
+    os.environ["JOB_WORKERS"] = str(args.workers)
+    os.environ["JOB_QUEUE_MAX"] = str(max(args.uploads, 1))
+    os.environ.setdefault("OUTPUT_DIR", tempfile.mkdtemp(prefix="bench_outputs_"))
+    os.environ.setdefault("VECTOR_INDEX_DIR", tempfile.mkdtemp(prefix="bench_vectors_"))
+    os.environ.setdefault("ROUTING_LOG", os.path.join(os.environ["OUTPUT_DIR"], "routing_log.jsonl"))
+    os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+    os.environ.setdefault("OPENAI_BACKOFF_BASE", "0.05")
+
+
+def run_flask(args):
+    from backend.main import create_app
+
+    app = create_app()
+
+    client_local = threading.local()
+
+    def one(item):
+        i, (filename, size) = item
+        client = getattr(client_local, "client", None) or app.test_client()
+        client_local.client = client
+        started = time.perf_counter()
+        response = client.post("/api/upload", data={"audio": (make_audio(i, size), filename)})
+        if response.status_code != 202:
+            return time.perf_counter() - started, f"upload {response.status_code}"
+        status_url = response.get_json()["status_url"]
+        while True:
+            job = client.get(status_url).get_json()
+            if job.get("status") in ("done", "failed"):
+                error = job.get("error") if job["status"] == "failed" else None
+                return time.perf_counter() - started, error
+            time.sleep(args.poll_ms / 1000.0)
+
+    return one
+
+
+def run_asgi(args):
+    try:
+        import mongomock_motor
+        from motor import motor_asyncio
+    except ImportError:
+        sys.exit("asgi mode needs motor and mongomock-motor: pip install motor mongomock-motor")
+    import httpx
+
+    motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    from backend.asgi import app
+
+    # The app and its job tasks live on one event loop; client threads submit to it
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://asgi")
+
+    async def upload(i, filename, size):
+        started = time.perf_counter()
+        response = await client.post("/api/upload", files={"audio": (filename, make_audio(i, size).getvalue())})
+        if response.status_code != 202:
+            return time.perf_counter() - started, f"upload {response.status_code}"
+        status_url = response.json()["status_url"]
+        while True:
+            job = (await client.get(status_url)).json()
+            if job.get("status") in ("done", "failed"):
+                error = job.get("error") if job["status"] == "failed" else None
+                return time.perf_counter() - started, error
+            await asyncio.sleep(args.poll_ms / 1000.0)
+
+    def one(item):
+        i, (filename, size) = item
+        return asyncio.run_coroutine_threadsafe(upload(i, filename, size), loop).result()
+
+    return one
+
+
+def run_direct(args):
+    from backend.main import handle_audio_upload
+
+    def one(item):
+        i, (filename, size) = item
+        audio = NamedBytesIO(make_audio(i, size).getvalue(), filename)
+        started = time.perf_counter()
+        try:
+            handle_audio_upload(audio)
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, str(e)
+
+    return one
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["flask", "asgi", "direct"], default="flask")
+    parser.add_argument("--uploads", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--workers", type=int, default=4, help="JOB_WORKERS for flask mode")
+    parser.add_argument("--min-kb", type=int, default=64)
+    parser.add_argument("--max-kb", type=int, default=4096, help="keep below the 8 MB chunking threshold")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="median chat latency")
+    parser.add_argument("--whisper-latency-ms", type=float, default=300.0)
+    parser.add_argument("--whisper-ms-per-mb", type=float, default=100.0)
+    parser.add_argument("--spread", type=float, default=0.3, help="lognormal sigma of model latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--poll-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if p95 latency is higher")
+    parser.add_argument("--min-throughput", type=float, help="fail if uploads/s is lower")
+    parser.add_argument("--max-rss-mb", type=float, help="fail if peak RSS is higher")
+    args = parser.parse_args()
+
+    server, stub, base_url = start_server(
+        latency_ms=args.latency_ms, spread=args.spread,
+        whisper_latency_ms=args.whisper_latency_ms, whisper_ms_per_mb=args.whisper_ms_per_mb,
+        error_rate=args.error_rate, seed=args.seed,
+    )
+    configure_backend(args, base_url)
+    uploads = synthetic_uploads(args.uploads, args.min_kb, args.max_kb, args.seed)
+    one = {"flask": run_flask, "asgi": run_asgi, "direct": run_direct}[args.mode](args)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, enumerate(uploads)))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    latencies = [latency for latency, _ in results]
+    errors = [error for _, error in results if error]
+    report = {
+        "mode": args.mode,
+        "uploads": len(uploads),
+        "concurrency": args.concurrency,
+        "failed": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(uploads) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "megabytes": round(sum(size for _, size in uploads) / 1e6, 1),
+        "stub_requests": dict(stub.counts),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['uploads']} uploads ({report['megabytes']} MB) via {args.mode}, "
+              f"concurrency {args.concurrency}: {report['elapsed_s']}s, "
+              f"{report['throughput_per_s']} uploads/s, {report['failed']} failed")
+        print(f"latency  p50 {report['p50_ms']} ms  p95 {report['p95_ms']} ms  p99 {report['p99_ms']} ms")
+        print(f"peak RSS {report['peak_rss_mb']} MB   stub {report['stub_requests']}")
+    for error in errors[:5]:
+        print(f"❌ {error}")
+
+    failures = []
+    if errors:
+        failures.append(f"{len(errors)} uploads failed")
+    if args.max_p95_ms is not None and report["p95_ms"] > args.max_p95_ms:
+        failures.append(f"p95 {report['p95_ms']} ms > {args.max_p95_ms} ms")
+    if args.min_throughput is not None and report["throughput_per_s"] < args.min_throughput:
+        failures.append(f"throughput {report['throughput_per_s']}/s < {args.min_throughput}/s")
+    if args.max_rss_mb is not None and report["peak_rss_mb"] > args.max_rss_mb:
+        failures.append(f"peak RSS {report['peak_rss_mb']} MB > {args.max_rss_mb} MB")
+    if failures:
+        print("❌ Thresholds missed: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_vector_search.py
+"""
+Query latency of the memory-mapped vector index in backend/semantic_search.py.
+
+Builds an index of --chunks random unit vectors in a temp directory (one
+meeting per --chunks-per-meeting rows, appended as save_meeting would), then
+times single queries and batches of queries against it and checks the top-k
+against a brute-force ranking. The embedding model is not involved.
+
+Scoring streams the whole vector file through one matrix product, so query
+time is bound by memory bandwidth: roughly chunks x dim x 4 bytes per query,
+shared by every query in a batch.
+
+Usage:
+    python -m benchmarks.bench_vector_search --chunks 100000
+    python -m benchmarks.bench_vector_search --chunks 100000 --dim 1536 --max-ms 60
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from backend.semantic_search import VectorIndex, EMBEDDING_DIM
+
+
+def build(directory, chunks, dim, per_meeting, rng):
+    index = VectorIndex(directory, dim=dim, model="bench")
+    started = time.perf_counter()
+    for meeting, start in enumerate(range(0, chunks, per_meeting)):
+        rows = min(per_meeting, chunks - start)
+        vectors = rng.standard_normal((rows, dim), dtype=np.float32)
+        index.add(f"meeting-{meeting}", [("transcript", f"chunk {start + i}") for i in range(rows)], vectors)
+    return index, time.perf_counter() - started
+
+
+def time_queries(index, queries, k, batch):
+    samples = []
+    for start in range(0, len(queries), batch):
+        started = time.perf_counter()
+        index.search(queries[start:start + batch], k=k)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--chunks-per-meeting", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=16, help="queries per batched search")
+    parser.add_argument("--max-ms", type=float, default=15.0, help="fail if the median single query is slower")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    directory = tempfile.mkdtemp(prefix="bench_vectors_")
+    try:
+        index, build_seconds = build(directory, args.chunks, args.dim, args.chunks_per_meeting, rng)
+        print(f"{len(index)} chunks x {args.dim} dims ({len(index) * args.dim * 4 / 1e6:.0f} MB) "
+              f"indexed in {build_seconds:.1f}s")
+
+        queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+        index.search(queries[:1], k=args.k)  # map the file and warm the page cache
+
+        single = time_queries(index, queries, args.k, 1)
+        batched = time_queries(index, queries, args.k, args.batch)
+        print(f"single query   median {statistics.median(single):6.2f}ms  "
+              f"p95 {np.percentile(single, 95):6.2f}ms")
+        print(f"batch of {args.batch:<4}  median {statistics.median(batched):6.2f}ms  "
+              f"({statistics.median(batched) / args.batch:.2f}ms per query)")
+
+        # Blocked top-k must match a brute-force ranking over the whole index
+        vectors = np.fromfile(index.vectors_path, dtype=np.float32).reshape(-1, args.dim)
+        probe = queries[:8] / np.linalg.norm(queries[:8], axis=1, keepdims=True)
+        expected = np.argsort(-(vectors @ probe.T), axis=0)[:args.k]
+        got = index.search(queries[:8], k=args.k, block_rows=8192)
+        mismatches = sum(set(expected[:, q].tolist()) != {row for _, row in hits} for q, hits in enumerate(got))
+        print(f"top-{args.k} vs brute force: {mismatches} of {len(got)} queries differ")
+
+        failed = mismatches or statistics.median(single) > args.max_ms
+        print("❌ FAILED" if failed else "✅ OK")
+        sys.exit(1 if failed else 0)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
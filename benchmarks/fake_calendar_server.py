@@ -0,0 +1,218 @@
+# benchmarks/fake_calendar_server.py
+"""
+Local stand-in for the Google Calendar API, for offline benchmarks.
+
+Serves a minimal discovery document (so `googleapiclient.discovery.build`
+works against it), single event insert/patch/delete calls and batch
+requests. Every HTTP round trip sleeps for the configured latency, which is
+what makes batching visible in benchmarks.
+
+Usage:
+    python -m benchmarks.fake_calendar_server --port 8765 --latency-ms 80
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def discovery_document(root_url):
+    """Subset of the Calendar v3 discovery document used by the backend."""
+    calendar_id = {"type": "string", "required": True, "location": "path"}
+    event_id = {"type": "string", "required": True, "location": "path"}
+    return {
+        "kind": "discovery#restDescription",
+        "discoveryVersion": "v1",
+        "id": "calendar:v3",
+        "name": "calendar",
+        "version": "v3",
+        "rootUrl": root_url,
+        "servicePath": "calendar/v3/",
+        "batchPath": "batch/calendar/v3",
+        "protocol": "rest",
+        "parameters": {},
+        "schemas": {"Event": {"id": "Event", "type": "object"}},
+        "resources": {
+            "events": {
+                "methods": {
+                    "insert": {
+                        "id": "calendar.events.insert",
+                        "path": "calendars/{calendarId}/events",
+                        "httpMethod": "POST",
+                        "parameters": {"calendarId": calendar_id},
+                        "parameterOrder": ["calendarId"],
+                        "request": {"$ref": "Event"},
+                        "response": {"$ref": "Event"},
+                    },
+                    "patch": {
+                        "id": "calendar.events.patch",
+                        "path": "calendars/{calendarId}/events/{eventId}",
+                        "httpMethod": "PATCH",
+                        "parameters": {"calendarId": calendar_id, "eventId": event_id},
+                        "parameterOrder": ["calendarId", "eventId"],
+                        "request": {"$ref": "Event"},
+                        "response": {"$ref": "Event"},
+                    },
+                    "delete": {
+                        "id": "calendar.events.delete",
+                        "path": "calendars/{calendarId}/events/{eventId}",
+                        "httpMethod": "DELETE",
+                        "parameters": {"calendarId": calendar_id, "eventId": event_id},
+                        "parameterOrder": ["calendarId", "eventId"],
+                    },
+                }
+            }
+        },
+    }
+
+
+class FakeCalendar:
+    """In-memory event store shared by all request handlers."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.events = {}
+        self.round_trips = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def handle(self, method, path, body):
+        """Apply one API call. Returns (status, response dict or None)."""
+        with self._lock:
+            self.calls += 1
+            parts = path.split("?", 1)[0].strip("/").split("/")
+            # calendar/v3/calendars/{calendarId}/events[/{eventId}]
+            if len(parts) < 5 or parts[:3] != ["calendar", "v3", "calendars"] or parts[4] != "events":
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+            if method == "POST" and len(parts) == 5:
+                event = dict(json.loads(body or b"{}"), id=uuid.uuid4().hex)
+                self.events[event["id"]] = event
+                return 200, event
+            event_id = parts[5] if len(parts) > 5 else None
+            if event_id not in self.events:
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+            if method == "PATCH":
+                self.events[event_id].update(json.loads(body or b"{}"))
+                return 200, self.events[event_id]
+            if method == "DELETE":
+                del self.events[event_id]
+                return 204, None
+            return 405, {"error": {"code": 405, "message": "Method Not Allowed"}}
+
+
+def _make_handler(calendar):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b"", content_type="application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _round_trip(self):
+            with calendar._lock:
+                calendar.round_trips += 1
+            if calendar.latency:
+                time.sleep(calendar.latency)
+
+        def do_GET(self):
+            if self.path.startswith("/discovery/"):
+                root_url = f"http://{self.headers['Host']}/"
+                self._send(200, json.dumps(discovery_document(root_url)).encode())
+            else:
+                self._send(404, b"{}")
+
+        def _api_call(self):
+            body = self._body()
+            self._round_trip()
+            if self.path.startswith("/batch/"):
+                self._batch(body)
+                return
+            status, payload = calendar.handle(self.command, self.path, body)
+            self._send(status, json.dumps(payload).encode() if payload is not None else b"")
+
+        do_POST = do_PATCH = do_DELETE = _api_call
+
+        def _batch(self, body):
+            content_type = self.headers["Content-Type"]
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode() + body
+            )
+            boundary = f"batch_{uuid.uuid4().hex}"
+            out = []
+            for part in message.iter_parts():
+                content_id = part["Content-ID"]
+                inner = part.get_payload(decode=True) or part.get_payload().encode()
+                head, sep, inner_body = inner.partition(b"\r\n\r\n")
+                if not sep:
+                    head, sep, inner_body = inner.partition(b"\n\n")
+                method, path, _version = head.splitlines()[0].decode().split(" ", 2)
+                status, payload = calendar.handle(method, path, inner_body)
+                payload_bytes = json.dumps(payload) if payload is not None else ""
+                response_id = content_id.replace("<", "<response-", 1)
+                out.append(
+                    f"--{boundary}\r\n"
+                    f"Content-Type: application/http\r\n"
+                    f"Content-ID: {response_id}\r\n\r\n"
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                    f"{payload_bytes}\r\n"
+                )
+            out.append(f"--{boundary}--\r\n")
+            self._send(200, "".join(out).encode(), f"multipart/mixed; boundary={boundary}")
+
+    return Handler
+
+
+def start_server(port=0, latency_ms=0.0):
+    """Start the fake server in a background thread.
+
+    Returns (server, calendar, discovery_url). Call server.shutdown() to stop.
+    """
+    calendar = FakeCalendar(latency=latency_ms / 1000.0)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(calendar))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, bound_port = server.server_address
+    discovery_url = f"http://{host}:{bound_port}/discovery/{{api}}/{{apiVersion}}"
+    return server, calendar, discovery_url
+
+
+def build_fake_service(discovery_url):
+    """Build a googleapiclient Calendar service that talks to the fake server."""
+    from googleapiclient.discovery import build
+
+    return build(
+        "calendar", "v3",
+        discoveryServiceUrl=discovery_url,
+        developerKey="fake",
+        static_discovery=False,
+        cache_discovery=False,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    server, _, url = start_server(args.port, args.latency_ms)
+    print(f"Fake Calendar API listening, discovery URL: {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
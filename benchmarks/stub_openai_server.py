@@ -0,0 +1,291 @@
+# benchmarks/stub_openai_server.py
+"""
+Local stand-in for the OpenAI API, for offline tests of the client layer.
+
+Serves chat completions (plain and streamed), audio transcriptions and
+embeddings (deterministic pseudo-random vectors per input text) with
+configurable latency distributions (transcription latency can also grow with
+the audio size), and injects failures: a fraction of requests answer
+429 (with Retry-After) or 500, and requests above --rpm per minute answer
+429 like a real account limit. Point the backend at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Usage:
+    python -m benchmarks.stub_openai_server --port 8766 --latency-ms 200 --error-rate 0.05
+    python -m benchmarks.stub_openai_server --latency-ms 800 --spread 0.5 --whisper-ms-per-mb 1500
+"""
+import argparse
+import base64
+import collections
+import hashlib
+import json
+import math
+import random
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEADLINES_REPLY = [
+    {"title": "Send project proposal", "date": "2025-01-20", "description": "Stub deadline"},
+]
+
+
+TRANSCRIPT_SENTENCES = [
+    "Let's go through the roadmap for the next release.",
+    "The design review went well and we agreed on the new layout.",
+    "Maria will send the project proposal by Friday.",
+    "We still need numbers from finance before we can commit.",
+    "The client demo is scheduled for March 3.",
+    "Can everyone update their tickets before the end of the week?",
+    "I think the migration can wait until next month.",
+    "Testing is blocked on the staging environment.",
+]
+# Words per megabyte of audio, roughly one minute of speech at 128 kbps
+WORDS_PER_MB = 150
+# text-embedding-3-small's native size, used when the request has no `dimensions`
+EMBEDDING_DIM = 1536
+
+
+class Latency:
+    """
+    A latency distribution in seconds: "fixed", "uniform" (median +/- spread)
+    or "lognormal" (median * e^N(0, spread)), plus per_mb_ms for each
+    megabyte of request body.
+    """
+
+    def __init__(self, median_ms=0.0, spread=0.0, distribution="lognormal", per_mb_ms=0.0):
+        self.median = median_ms / 1000.0
+        self.spread = spread
+        self.distribution = distribution
+        self.per_mb = per_mb_ms / 1000.0
+
+    def sample(self, rng, n_bytes=0):
+        if self.distribution == "uniform":
+            value = self.median * rng.uniform(1 - self.spread, 1 + self.spread)
+        elif self.distribution == "lognormal" and self.spread:
+            value = self.median * math.exp(rng.gauss(0, self.spread))
+        else:
+            value = self.median
+        return max(0.0, value) + self.per_mb * n_bytes / 1e6
+
+
+def synthetic_transcript(n_bytes, rng):
+    """Meeting-like text whose length grows with the audio size."""
+    words, sentences = 0, []
+    target = max(20, int(WORDS_PER_MB * n_bytes / 1e6))
+    while words < target:
+        sentence = rng.choice(TRANSCRIPT_SENTENCES)
+        sentences.append(sentence)
+        words += len(sentence.split())
+    return " ".join(sentences)
+
+
+class StubOpenAI:
+    """Request counters, latencies and failure injection shared by all handlers."""
+
+    def __init__(self, chat_latency=None, whisper_latency=None, error_rate=0.0, rate_limit_rate=0.0,
+                 rpm=0, retry_after=1, seed=None):
+        self.chat_latency = chat_latency or Latency()
+        self.whisper_latency = whisper_latency or self.chat_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.counts = collections.Counter()
+        self._recent = collections.deque()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Decide the fate of one request: None to serve it, or an error status."""
+        with self._lock:
+            self.counts["requests"] += 1
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if self.rpm and len(self._recent) >= self.rpm:
+                self.counts["429"] += 1
+                return 429
+            self._recent.append(now)
+            roll = self._random.random()
+            if roll < self.rate_limit_rate:
+                self.counts["429"] += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.counts["500"] += 1
+                return 500
+            self.counts["ok"] += 1
+            return None
+
+    def delay(self, latency, n_bytes=0):
+        with self._lock:
+            seconds = latency.sample(self._random, n_bytes)
+        if seconds:
+            time.sleep(seconds)
+
+    def transcript(self, n_bytes):
+        with self._lock:
+            return synthetic_transcript(n_bytes, self._random)
+
+
+SUMMARY_REPLY = "Summary: stub summary of the meeting.\nAction items:\n- Follow up with the team."
+
+
+def _chat_reply(request):
+    if (request.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps({"summary": SUMMARY_REPLY, "deadlines": DEADLINES_REPLY})
+    messages = request.get("messages") or []
+    system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+    if "deadline" in system.lower():
+        return json.dumps(DEADLINES_REPLY)
+    return SUMMARY_REPLY
+
+
+def _embedding(text, dimensions):
+    """A unit vector seeded from the text, so equal inputs embed identically."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def _make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json", headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status):
+            kind = "rate_limit_exceeded" if status == 429 else "server_error"
+            body = json.dumps({"error": {"message": f"stub {status}", "type": kind, "code": kind}}).encode()
+            headers = {"Retry-After": str(stub.retry_after)} if status == 429 else None
+            self._send(status, body, headers=headers)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if self.path.endswith("/audio/transcriptions"):
+                stub.delay(stub.whisper_latency, len(body))
+            else:
+                stub.delay(stub.chat_latency)
+            status = stub.admit()
+            if status:
+                self._error(status)
+            elif self.path.endswith("/chat/completions"):
+                self._chat(json.loads(body or b"{}"))
+            elif self.path.endswith("/audio/transcriptions"):
+                self._transcription(body)
+            elif self.path.endswith("/embeddings"):
+                self._embeddings(json.loads(body or b"{}"))
+            else:
+                self._send(404, b'{"error": {"message": "Not Found"}}')
+
+        def _chat(self, request):
+            content = _chat_reply(request)
+            base = {"id": f"chatcmpl-{uuid.uuid4().hex}", "created": int(time.time()), "model": request.get("model")}
+            if not request.get("stream"):
+                self._send(200, json.dumps(dict(
+                    base, object="chat.completion",
+                    choices=[{"index": 0, "finish_reason": "stop",
+                              "message": {"role": "assistant", "content": content}}],
+                    usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                )).encode())
+                return
+
+            events = []
+            for word in content.split(" "):
+                chunk = dict(base, object="chat.completion.chunk",
+                             choices=[{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}])
+                events.append(f"data: {json.dumps(chunk)}\n\n")
+            events.append("data: [DONE]\n\n")
+            self._send(200, "".join(events).encode(), "text/event-stream")
+
+        def _transcription(self, body):
+            text = stub.transcript(len(body))
+            if b'name="response_format"\r\n\r\nverbose_json' in body:
+                payload = {"text": text, "segments": [{"id": 0, "start": 0.0, "end": 5.0, "text": text}]}
+            else:
+                payload = {"text": text}
+            self._send(200, json.dumps(payload).encode())
+
+        def _embeddings(self, request):
+            inputs = request.get("input") or []
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            dimensions = request.get("dimensions") or EMBEDDING_DIM
+            data = []
+            for i, text in enumerate(inputs):
+                vector = _embedding(str(text), dimensions)
+                if request.get("encoding_format") == "base64":
+                    vector = base64.b64encode(struct.pack(f"<{dimensions}f", *vector)).decode()
+                data.append({"object": "embedding", "index": i, "embedding": vector})
+            self._send(200, json.dumps({
+                "object": "list", "data": data, "model": request.get("model"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            }).encode())
+
+    return Handler
+
+
+def start_server(port=0, latency_ms=0.0, spread=0.0, distribution="lognormal",
+                 whisper_latency_ms=None, whisper_ms_per_mb=0.0, **options):
+    """Start the stub server in a background thread.
+
+    `latency_ms` is the median chat latency; transcriptions use
+    `whisper_latency_ms` (default: the same) plus `whisper_ms_per_mb`.
+    Returns (server, stub, base_url). Call server.shutdown() to stop.
+    """
+    stub = StubOpenAI(
+        chat_latency=Latency(latency_ms, spread, distribution),
+        whisper_latency=Latency(
+            latency_ms if whisper_latency_ms is None else whisper_latency_ms,
+            spread, distribution, whisper_ms_per_mb,
+        ),
+        **options
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(stub))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, bound_port = server.server_address
+    return server, stub, f"http://{host}:{bound_port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="median chat latency")
+    parser.add_argument("--spread", type=float, default=0.0, help="latency spread (sigma for lognormal)")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--whisper-latency-ms", type=float, default=None, help="median transcription latency")
+    parser.add_argument("--whisper-ms-per-mb", type=float, default=0.0, help="extra transcription latency per MB")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s (0 = unlimited)")
+    args = parser.parse_args()
+
+    server, _stub, base_url = start_server(
+        args.port, args.latency_ms, spread=args.spread, distribution=args.distribution,
+        whisper_latency_ms=args.whisper_latency_ms, whisper_ms_per_mb=args.whisper_ms_per_mb,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, rpm=args.rpm,
+    )
+    print(f"Stub OpenAI API at {base_url}  (export OPENAI_BASE_URL={base_url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
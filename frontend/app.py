@@ -1,9 +1,14 @@
 import sys, os
+import hashlib
+import threading
+from collections import OrderedDict
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import streamlit as st
-from backend.main import handle_audio_upload
 from backend.routes import add_reminders_to_calendar
-from backend.database import get_all_meetings, get_meeting_by_id, delete_meeting, search_meetings, get_meeting_statistics
+from backend.database import (
+    list_meetings, get_meeting_summary, delete_meeting, search_meetings, get_meeting_statistics,
+    get_meeting_by_audio_hash,
+)
 
 # Page configuration
 st.set_page_config(
@@ -77,6 +82,96 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Cached reads: reruns are served from memory until a save or delete here
+# invalidates them; the TTL bounds staleness from changes made elsewhere
+# (the Flask API, batch ingest, other Streamlit processes).
+HISTORY_CACHE_TTL = 60
+# Upload results kept in memory for other sessions; older ones are found by
+# audio hash in MongoDB
+UPLOAD_RESULTS_MAX = 32
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def cached_list_meetings(limit, cursor):
+    return list_meetings(limit=limit, cursor=cursor)
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def cached_search_meetings(query, page):
+    return search_meetings(query, page=page)
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def cached_semantic_search(query):
+    # numpy and the vector index load only when semantic search is used
+    from backend.semantic_search import semantic_search_meetings
+    return semantic_search_meetings(query)
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def cached_meeting_summary(meeting_id):
+    return get_meeting_summary(meeting_id)
+
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def cached_meeting_statistics():
+    return get_meeting_statistics()
+
+@st.cache_resource
+def upload_registry():
+    """Process-wide results and per-hash locks shared by every session, so
+    two tabs uploading the same file run the pipeline once. A hash's lock
+    is dropped once no session holds it; results are bounded LRU."""
+    return {"lock": threading.Lock(), "locks": {}, "results": OrderedDict()}
+
+def registry_result(registry, upload_hash):
+    with registry["lock"]:
+        result = registry["results"].get(upload_hash)
+        if result is not None:
+            registry["results"].move_to_end(upload_hash)
+        return result
+
+def remember_upload_result(registry, upload_hash, result):
+    with registry["lock"]:
+        registry["results"][upload_hash] = result
+        registry["results"].move_to_end(upload_hash)
+        while len(registry["results"]) > UPLOAD_RESULTS_MAX:
+            registry["results"].popitem(last=False)
+
+def forget_upload_results(meeting_id):
+    """Drop remembered upload results that point at a deleted meeting."""
+    registry = upload_registry()
+    with registry["lock"]:
+        for results in (registry["results"], st.session_state.get("upload_results", {})):
+            for upload_hash in [h for h, r in results.items() if r.get("meeting_id") == meeting_id]:
+                results.pop(upload_hash, None)
+
+def process_upload(audio, status_box, summary_box):
+    """Run the pipeline on an upload, streaming stages and summary tokens into the page."""
+    stage_labels = {
+        "transcribing": "🔄 Transcribing audio...",
+        "summarizing": "🔄 Writing summary...",
+        "extracting": "🔄 Extracting deadlines...",
+        "saving": "🔄 Saving to database...",
+    }
+    summary_text = ""
+    result = None
+    # Imported on first upload: pulls in Flask and the job queue
+    from backend.main import handle_audio_upload_stream
+    for event, data in handle_audio_upload_stream(audio):
+        if event == "stage" and data["state"] == "running":
+            status_box.info(stage_labels.get(data["stage"], "🔄 Processing..."))
+        elif event == "token":
+            summary_text += data["text"]
+            summary_box.markdown(f'<div class="summary-box">{summary_text}</div>', unsafe_allow_html=True)
+        elif event == "done":
+            result = {k: v for k, v in data.items() if k != "transcript"}
+
+    if result is None:
+        raise RuntimeError("Processing ended without a result")
+    return result
+
+def invalidate_meeting_caches():
+    """Drop cached reads after a meeting is saved or deleted."""
+    for cached in (cached_list_meetings, cached_search_meetings, cached_semantic_search,
+                   cached_meeting_summary, cached_meeting_statistics):
+        cached.clear()
+
 # Sidebar for navigation
 with st.sidebar:
     st.title("📂 Navigation")
@@ -85,6 +180,8 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("### 🔍 Quick Search")
     search_query = st.text_input("Search meetings", placeholder="Enter keywords...")
+    search_mode = st.radio("Match", ["Keywords", "Meaning"], horizontal=True,
+                           help="Meaning finds related wording, e.g. 'budget' for 'cost overruns'")
 
 # Main content based on selected page
 if page == "Upload New Meeting":
@@ -105,16 +202,45 @@ if page == "Upload New Meeting":
 
     if audio:
         try:
-            with st.spinner("🔄 Processing your meeting... This may take a moment."):
-                result = handle_audio_upload(audio)
-            
-            # Success message
-            st.success("✅ Meeting processed and saved to database!")
+            status_box = st.empty()
             
-            # Summary Section
+            # Summary Section, filled in as tokens stream in
             st.markdown("---")
             st.markdown("## 📋 Summary & Action Items")
-            st.markdown(f'<div class="summary-box">{result["summary"]}</div>', unsafe_allow_html=True)
+            summary_box = st.empty()
+            
+            # Results are kept per upload content hash, so reruns (button
+            # clicks, navigation) never process or save the same file twice.
+            # The session entry is the fast path; other sessions and earlier
+            # runs are found in the process-wide registry or, by audio hash,
+            # in MongoDB. The hash lock makes a concurrent upload of the same
+            # file wait for the first one instead of processing it again.
+            upload_hash = hashlib.sha256(audio.getvalue()).hexdigest()
+            upload_results = st.session_state.setdefault("upload_results", {})
+            result = upload_results.get(upload_hash)
+            
+            if result is None:
+                registry = upload_registry()
+                with registry["lock"]:
+                    entry = registry["locks"].setdefault(upload_hash, {"lock": threading.Lock(), "users": 0})
+                    entry["users"] += 1
+                try:
+                    with entry["lock"]:
+                        result = registry_result(registry, upload_hash) or get_meeting_by_audio_hash(upload_hash)
+                        if result is None:
+                            result = process_upload(audio, status_box, summary_box)
+                            invalidate_meeting_caches()
+                        remember_upload_result(registry, upload_hash, result)
+                finally:
+                    with registry["lock"]:
+                        entry["users"] -= 1
+                        if not entry["users"]:
+                            registry["locks"].pop(upload_hash, None)
+                upload_results[upload_hash] = result
+            
+            # Success message
+            status_box.success("✅ Meeting processed and saved to database!")
+            summary_box.markdown(f'<div class="summary-box">{result["summary"]}</div>', unsafe_allow_html=True)
             
             # Deadlines Section
             deadlines = result.get("deadlines", [])
@@ -141,7 +267,7 @@ if page == "Upload New Meeting":
                 with col2:
                     if st.button("📅 Add All Deadlines to Google Calendar"):
                         with st.spinner("🔄 Adding reminders to your Google Calendar..."):
-                            calendar_result = add_reminders_to_calendar(deadlines)
+                            calendar_result = add_reminders_to_calendar(deadlines, meeting_id=result.get("meeting_id"))
                         
                         if calendar_result['success']:
                             st.success(f"✅ {calendar_result['message']}")
@@ -162,11 +288,29 @@ elif page == "Meeting History":
     st.markdown("View and manage your previous meeting summaries")
     
     # Search functionality
-    if search_query:
-        meetings = search_meetings(search_query)
-        st.info(f"🔍 Found {len(meetings)} meeting(s) matching '{search_query}'")
+    if search_query and search_mode == "Meaning":
+        meetings = cached_semantic_search(search_query)
+        st.info(f"🔍 Found {len(meetings)} meeting(s) related to '{search_query}'")
+    elif search_query:
+        search_page = st.number_input("Results page", min_value=1, value=1, step=1)
+        meetings = cached_search_meetings(search_query, search_page)
+        st.info(f"🔍 Found {len(meetings)} meeting(s) matching '{search_query}' on page {search_page}")
     else:
-        meetings = get_all_meetings(limit=20)
+        # Keyset pagination: keep the cursors of the pages visited so far
+        cursors = st.session_state.setdefault("history_cursors", [None])
+        meetings, next_cursor = cached_list_meetings(20, cursors[-1])
+        
+        nav1, nav2, nav3 = st.columns([1, 2, 1])
+        with nav1:
+            if len(cursors) > 1 and st.button("⬅️ Newer"):
+                cursors.pop()
+                st.rerun()
+        with nav2:
+            st.markdown(f"<p style='text-align: center; color: #6B7280;'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+        with nav3:
+            if next_cursor and st.button("Older ➡️"):
+                cursors.append(next_cursor)
+                st.rerun()
     
     if meetings:
         for meeting in meetings:
@@ -180,6 +324,9 @@ elif page == "Meeting History":
                     </div>
                 """, unsafe_allow_html=True)
                 
+                if meeting.get('snippet'):
+                    st.caption(f"…{meeting['snippet']}…")
+                
                 col1, col2, col3 = st.columns([2, 1, 1])
                 
                 with col1:
@@ -187,12 +334,13 @@ elif page == "Meeting History":
                         st.session_state[f"show_{meeting['_id']}"] = not st.session_state.get(f"show_{meeting['_id']}", False)
                 
                 with col2:
-                    deadlines_count = len(meeting.get('deadlines', []))
-                    st.metric("Deadlines", deadlines_count)
+                    st.metric("Deadlines", meeting.get('deadline_count', 0))
                 
                 with col3:
                     if st.button(f" Delete", key=f"delete_{meeting['_id']}"):
                         if delete_meeting(meeting['_id']):
+                            invalidate_meeting_caches()
+                            forget_upload_results(meeting['_id'])
                             st.success("Deleted successfully!")
                             st.rerun()
                         else:
@@ -200,12 +348,13 @@ elif page == "Meeting History":
                 
                 # Show summary if toggled
                 if st.session_state.get(f"show_{meeting['_id']}", False):
+                    details = cached_meeting_summary(meeting['_id']) or {}
                     st.markdown("**Summary:**")
-                    st.markdown(f'<div class="summary-box">{meeting.get("summary", "No summary available")}</div>', unsafe_allow_html=True)
+                    st.markdown(f'<div class="summary-box">{details.get("summary", "No summary available")}</div>', unsafe_allow_html=True)
                     
-                    if meeting.get('deadlines'):
+                    if details.get('deadlines'):
                         st.markdown("**Deadlines:**")
-                        for deadline in meeting['deadlines']:
+                        for deadline in details['deadlines']:
                             st.write(f"• **{deadline.get('title')}** - Due: {deadline.get('date')}")
                 
                 st.markdown("---")
@@ -216,7 +365,7 @@ elif page == "Statistics":
     st.markdown("# 📊 Statistics")
     st.markdown("Overview of your meeting summaries")
     
-    stats = get_meeting_statistics()
+    stats = cached_meeting_statistics()
     
     col1, col2, col3 = st.columns(3)
     
@@ -228,6 +377,16 @@ elif page == "Statistics":
     
     with col3:
         st.metric("Avg Deadlines/Meeting", f"{stats['average_deadlines_per_meeting']:.1f}")
+    
+    import pandas as pd
+
+    if stats.get('meetings_per_day'):
+        st.markdown("### Meetings per Day")
+        st.bar_chart(pd.Series(stats['meetings_per_day'], name="Meetings"))
+    
+    if stats.get('deadlines_per_week'):
+        st.markdown("### Deadlines per Week")
+        st.bar_chart(pd.Series(stats['deadlines_per_week'], name="Deadlines"))
 
 # Footer
 st.markdown("---")